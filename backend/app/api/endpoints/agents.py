@@ -4,6 +4,7 @@ from typing import List
 from app.core import database
 from app.models import agent as models
 from app.schemas import agent as schemas
+from app.services.agent_config_cache import agent_config_cache
 import uuid
 
 router = APIRouter()
@@ -58,6 +59,7 @@ def update_agent(agent_id: str, agent_update: schemas.AgentUpdate, db: Session =
     
     db.commit()
     db.refresh(db_agent)
+    agent_config_cache.invalidate(agent_id)
     return db_agent
 
 @router.delete("/{agent_id}")
@@ -68,6 +70,7 @@ def delete_agent(agent_id: str, db: Session = Depends(database.get_db)):
     
     db.delete(db_agent)
     db.commit()
+    agent_config_cache.invalidate(agent_id)
     return {"ok": True}
 
 @router.post("/{agent_id}/versions", response_model=schemas.AgentVersion)
@@ -98,6 +101,7 @@ def create_agent_version(
     db.add(db_version)
     db.commit()
     db.refresh(db_version)
+    agent_config_cache.invalidate(agent_id)
     return db_version
 
 @router.get("/{agent_id}/versions", response_model=List[schemas.AgentVersion])
@@ -116,4 +120,5 @@ def pin_agent_version(agent_id: str, version_id: str, db: Session = Depends(data
         
     db_agent.active_version_id = version_id
     db.commit()
+    agent_config_cache.invalidate(agent_id)
     return {"status": "pinned", "version": db_version.version_number}
@@ -2,7 +2,8 @@
 Analytics API endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
 
 from app.core import database
@@ -15,7 +16,7 @@ router = APIRouter()
 @router.get("/overview")
 async def get_analytics_overview(
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = AnalyticsService(db)
     return await service.get_overview_stats()
@@ -24,7 +25,7 @@ async def get_analytics_overview(
 async def get_daily_trends(
     days: int = 7,
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = AnalyticsService(db)
     return await service.get_calls_over_time(days)
@@ -32,7 +33,7 @@ async def get_daily_trends(
 @router.get("/agent-performance")
 async def get_agent_analytics(
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = AnalyticsService(db)
     return await service.get_agent_performance()
@@ -40,7 +41,7 @@ async def get_agent_analytics(
 @router.get("/shadow-stats")
 async def get_shadow_stats(
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = AnalyticsService(db)
     return await service.get_shadow_stats()
@@ -50,18 +51,20 @@ async def get_logs(
     skip: int = 0,
     limit: int = 50,
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     from app.models.analytics import CallLog
     from app.models.agent import Agent
     
     # Query logs with agent names
-    logs = db.query(
-        CallLog,
-        Agent.name.label("agent_name")
-    ).outerjoin(Agent, CallLog.agent_id == Agent.id)\
-     .order_by(CallLog.start_time.desc())\
-     .offset(skip).limit(limit).all()
+    logs = (await db.execute(
+        select(
+            CallLog,
+            Agent.name.label("agent_name")
+        ).outerjoin(Agent, CallLog.agent_id == Agent.id)
+        .order_by(CallLog.start_time.desc())
+        .offset(skip).limit(limit)
+    )).all()
     
     # Format response
     result = []
@@ -76,8 +79,8 @@ async def get_logs(
 async def get_recent_calls(
     limit: int = 10,
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     from app.models.analytics import CallLog
-    calls = db.query(CallLog).order_by(CallLog.start_time.desc()).limit(limit).all()
+    calls = (await db.execute(select(CallLog).order_by(CallLog.start_time.desc()).limit(limit))).scalars().all()
     return calls
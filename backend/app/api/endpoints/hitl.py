@@ -2,7 +2,7 @@
 HITL API endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
@@ -26,7 +26,7 @@ class HumanResponse(BaseModel):
 @router.get("/pending")
 async def get_pending_actions(
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = HITLService(db)
     return await service.list_pending_actions()
@@ -36,7 +36,7 @@ async def decide_action(
     action_id: str,
     data: ActionDecision,
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = HITLService(db)
     action = await service.process_action(
@@ -55,7 +55,7 @@ async def start_takeover(
     session_id: str,
     data: InterventionRequest,
     current_user: User = Depends(get_current_user_required),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = HITLService(db)
     intervention = await service.start_intervention(
@@ -68,7 +68,7 @@ async def start_takeover(
 @router.post("/sessions/{session_id}/release")
 async def stop_takeover(
     session_id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     current_user: User = Depends(get_current_user_required)
 ):
     service = HITLService(db)
@@ -79,7 +79,7 @@ async def stop_takeover(
 async def send_human_response(
     session_id: str,
     data: HumanResponse,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     current_user: User = Depends(get_current_user_required)
 ):
     """Send text from human agent to user via session Redis channel."""
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.core import database
 from app.schemas import knowledge as schemas
 from app.services.knowledge_service import KnowledgeService
+from app.services.agent_config_cache import agent_config_cache
 from app.models.agent import Agent
+from app.models.knowledge import AgentKnowledge
 
 router = APIRouter()
 
@@ -12,36 +15,39 @@ router = APIRouter()
 async def add_knowledge(
     agent_id: str,
     knowledge: schemas.KnowledgeCreate,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     # Verify agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = await db.get(Agent, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
         
     service = KnowledgeService(db)
-    return await service.add_knowledge(
+    created = await service.add_knowledge(
         agent_id=agent_id,
         title=knowledge.title,
         content=knowledge.content,
         data_metadata=knowledge.data_metadata,
         organization_id=agent.organization_id
     )
+    # Cached answers of this agent were built without the new knowledge (all workers)
+    await agent_config_cache.invalidate_async(agent_id)
+    return created
 
 @router.get("/{agent_id}", response_model=List[schemas.Knowledge])
 async def list_knowledge(
     agent_id: str,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
-    from app.models.knowledge import AgentKnowledge
-    return db.query(AgentKnowledge).filter(AgentKnowledge.agent_id == agent_id).all()
+    result = await db.execute(select(AgentKnowledge).filter(AgentKnowledge.agent_id == agent_id))
+    return result.scalars().all()
 
 @router.get("/{agent_id}/query", response_model=List[schemas.KnowledgeQueryResult])
 async def query_knowledge(
     agent_id: str,
     q: str = Query(...),
     limit: int = 3,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     service = KnowledgeService(db)
     return await service.query_knowledge(agent_id, q, limit=limit)
@@ -49,8 +55,12 @@ async def query_knowledge(
 @router.delete("/{knowledge_id}")
 async def delete_knowledge(
     knowledge_id: str,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
+    knowledge = await db.get(AgentKnowledge, knowledge_id)
     service = KnowledgeService(db)
     await service.delete_knowledge(knowledge_id)
+    if knowledge:
+        # Cached answers may quote the deleted knowledge (all workers)
+        await agent_config_cache.invalidate_async(knowledge.agent_id)
     return {"status": "deleted"}
@@ -2,7 +2,8 @@
 API endpoints for memory management.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
 from app.core import database
@@ -45,7 +46,7 @@ class UserContextResponse(BaseModel):
 @router.post("/memorize", response_model=MemoryResponse)
 async def create_memory(
     memory: MemoryCreate,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Store a memory fact for a user."""
     service = get_memory_service(db)
@@ -70,7 +71,7 @@ async def create_memory(
 @router.post("/retrieve", response_model=List[MemoryResponse])
 async def retrieve_memories(
     request: MemorySearchRequest,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Semantic search across memories."""
     service = get_memory_service(db)
@@ -99,7 +100,7 @@ async def retrieve_memories(
 async def get_user_memories(
     user_id: str,
     categories: Optional[str] = Query(None, description="Comma-separated categories"),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Get all memories for a user, grouped by category."""
     service = get_memory_service(db)
@@ -118,7 +119,7 @@ async def get_user_memories(
 @router.get("/context/{user_id}", response_model=UserContextResponse)
 async def get_user_context(
     user_id: str,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Get context string for a user (for agent prompts)."""
     service = get_memory_service(db)
@@ -136,17 +137,17 @@ async def get_user_context(
 @router.delete("/user/{user_id}")
 async def delete_user_memories(
     user_id: str,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Delete all memories for a user (GDPR compliance)."""
     from app.models.memory import MemoryItem, ConversationSummary, UserProfile
     
     # Delete all user data
-    db.query(MemoryItem).filter(MemoryItem.user_id == user_id).delete()
-    db.query(ConversationSummary).filter(ConversationSummary.user_id == user_id).delete()
-    db.query(UserProfile).filter(UserProfile.user_id == user_id).delete()
+    await db.execute(delete(MemoryItem).where(MemoryItem.user_id == user_id))
+    await db.execute(delete(ConversationSummary).where(ConversationSummary.user_id == user_id))
+    await db.execute(delete(UserProfile).where(UserProfile.user_id == user_id))
     
-    db.commit()
+    await db.commit()
     
     logger.info(f"Deleted all memories for user {user_id}")
     
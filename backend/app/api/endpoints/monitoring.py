@@ -5,7 +5,14 @@ Provides real-time call tracking and supervisor tools.
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException
 from typing import List, Dict, Any
 import asyncio
+from app.core import database
 from app.orchestration.session_manager import session_manager
+from app.orchestration.speculation import speculation_metrics
+from app.orchestration.task_supervisor import task_supervisor
+from app.services.response_cache import response_cache
+from app.services.tts.cache import tts_audio_cache
+from app.services.tts.scheduler import tts_scheduler
+from app.services.voice_ux_service import voice_ux_clips
 from app.services.monitoring_service import monitoring_service
 from app.core.deps import require_manager, get_current_user_required
 from app.models.user import User
@@ -30,6 +37,55 @@ async def get_session_details(
         raise HTTPException(status_code=404, detail="Session not found")
     return session
 
+@router.get("/db-pool")
+async def get_db_pool_status(
+    current_user: User = Depends(require_manager)
+):
+    """Connection pool usage of this worker (checked out / overflow / peak)."""
+    return database.pool_status()
+
+@router.get("/background-tasks")
+async def get_background_task_status(
+    current_user: User = Depends(require_manager)
+):
+    """Background side-work queues of this worker (depth, running, dropped, failed per kind)."""
+    return task_supervisor.stats()
+
+@router.get("/response-cache")
+async def get_response_cache_status(
+    current_user: User = Depends(require_manager)
+):
+    """Semantic response cache of this worker (entries, audio size, hit rate)."""
+    return response_cache.stats()
+
+@router.get("/tts-cache")
+async def get_tts_cache_status(
+    current_user: User = Depends(require_manager)
+):
+    """TTS audio cache of this worker (memory/disk tiers, hits, bytes served)."""
+    return tts_audio_cache.stats()
+
+@router.get("/tts-scheduler")
+async def get_tts_scheduler_status(
+    current_user: User = Depends(require_manager)
+):
+    """Upstream TTS slots per provider: active, waiting, per-priority waits and stale drops."""
+    return tts_scheduler.stats()
+
+@router.get("/speculation")
+async def get_speculation_status(
+    current_user: User = Depends(require_manager)
+):
+    """Speculative generation on streaming partials: hit rate, restarts, committed and wasted tokens."""
+    return speculation_metrics.to_dict()
+
+@router.get("/voice-ux-clips")
+async def get_voice_ux_clip_status(
+    current_user: User = Depends(require_manager)
+):
+    """Shared backchannel/filler clips of this worker (voices warmed, joined warm-ups)."""
+    return voice_ux_clips.stats()
+
 @router.websocket("/stream/all")
 async def stream_all_sessions(
     websocket: WebSocket
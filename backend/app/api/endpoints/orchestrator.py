@@ -1,22 +1,28 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.websockets import WebSocketState
 from app.core import database
 from app.core.config import settings
 
 from app.services.llm.groq_provider import GroqLLM
 from app.services.llm.enterprise_llm import EnterpriseLLM
-# from app.services.stt.deepgram_provider import DeepgramSTT
+from app.services.stt.deepgram_provider import DeepgramSTT
 from app.services.tts.deepgram_provider import DeepgramTTS
 from app.services.tts.qwen_provider import QwenTTS
 from app.services.stt.mock_provider import MockSTT
+from app.services.stt.base import TranscriptionResult
 from app.services.tts.mock_provider import MockTTS
+from app.services.stt.streaming import STT_MODE_STREAMING, STT_MODE_UTTERANCE, StreamingTranscriber
+from app.services.tts.scheduler import TTSPriority, bind_tts_session, tts_request
+from app.services.tts.segmenter import SegmenterSettings, SentenceSegmenter
+from app.services.tts.synthesizer import synthesizer_for
 from app.services.ultravox_service import UltravoxService
-from app.services.tools.registry import get_tool_schemas, AVAILABLE_TOOLS
+from app.services.tools.registry import AVAILABLE_TOOLS
+from app.services.agent_config_cache import agent_config_cache
+from app.services.response_cache import response_cache, normalize_utterance, tone_for_sentiment
 from app.services.memory import get_memory_service
 from app.orchestration.agent_swarm import SwarmOrchestrator
-import random
 from app.models import agent as models
 from app.orchestration.session_manager import session_manager
 from app.orchestration.agent_orchestrator import (
@@ -24,11 +30,21 @@ from app.orchestration.agent_orchestrator import (
     ConversationState, ConfidenceScores, MemoryItem, MemoryType
 )
 from app.orchestration.langgraph_orchestrator import LangGraphOrchestrator
+from app.orchestration.latency_tracker import CallLatencyStats, TurnLatency, LatencyStage
+from app.orchestration.stage_runner import StageRunner
+from app.orchestration.speculation import Speculation, SpeculationSettings, Speculator, speculation_metrics
+from app.orchestration.task_supervisor import (
+    task_supervisor, COMPLIANCE_AUDIT, SHADOW_COMPARISON, VOICE_UX_PRECOMPUTE, MONITORING_EVENT
+)
+from app.orchestration.speech_pipeline import SpeechPipeline
 from app.services.monitoring_service import monitoring_service
 from app.services.analytics_service import AnalyticsService
 from app.services.hitl_service import HITLService
 from app.services.compliance_service import compliance_validator, redactor, get_baseline_rules
 from app.services.voice_ux_service import VoiceUXService
+from app.services.audio import AudioRingBuffer, AudioTransport, pcm16_to_wav
+from app.services.audio.transport import AUDIO_TRANSPORT_JSON
+from app.services.audio.vad import VADEventType, VADSettings, VoiceActivityDetector
 from app.services.shadow_service import ShadowComparisonService
 from app.services.knowledge_service import KnowledgeService
 from app.services.tools.mcp_service import mcp_client
@@ -41,10 +57,8 @@ import base64
 import uuid
 import time
 import asyncio
-import io
-import wave
 from datetime import datetime
-import inspect
+from functools import partial
 import websockets
 from app.schemas.policy import ConversationPolicy, State, Transition, Guardrail
 from app.schemas.orchestrator import ChatRequest, ChatResponse
@@ -107,42 +121,35 @@ else:
     # You might want a different fallback or raise an error
     llm_service = GroqLLM() 
 
-# Use Deepgram if key exists, otherwise Mock
-if settings.DEEPGRAM_API_KEY:
-    logger.info("Using Real Deepgram Services")
-    # stt_service = DeepgramSTT() # Switched to Frontend Web Speech API
-    stt_service = MockSTT()
-    # tts_service = DeepgramTTS() # Replaced by QwenTTS
-    tts_service = QwenTTS()
-    logger.info("Using QwenTTS Service & Frontend STT")
+# Server-side STT, chosen by STT_PROVIDER ("auto": Deepgram if key exists, otherwise Mock)
+# Browser clients using the Web Speech API send text and never reach it;
+# audio they send, and every Twilio call (streaming STT), is recognized here.
+stt_provider = settings.STT_PROVIDER.lower()
+if stt_provider == "auto":
+    stt_provider = "deepgram" if settings.DEEPGRAM_API_KEY else "mock"
+elif stt_provider == "deepgram" and not settings.DEEPGRAM_API_KEY:
+    logger.error("STT_PROVIDER=deepgram but no DEEPGRAM_API_KEY found: falling back to Mock STT")
+    stt_provider = "mock"
+elif stt_provider != "mock":
+    logger.error(f"Unknown STT_PROVIDER {settings.STT_PROVIDER!r}: falling back to Mock STT")
+    stt_provider = "mock"
+
+if stt_provider == "deepgram":
+    logger.info("Using Real Deepgram STT (server-side audio and phone calls)")
+    stt_service = DeepgramSTT()
 else:
-    logger.warning("Using MOCK Services (No DEEPGRAM_API_KEY)")
+    logger.warning("Using MOCK STT: server-side audio and phone calls get the mock transcript")
     stt_service = MockSTT()
-    # tts_service = MockTTS() # Replaced by QwenTTS for testing if local server is up
-    tts_service = QwenTTS()
-    logger.info("Using QwenTTS Service (with Mock STT)")
+# tts_service = DeepgramTTS() # Replaced by QwenTTS
+# tts_service = MockTTS() # Replaced by QwenTTS for testing if local server is up
+tts_service = QwenTTS()
+logger.info("Using QwenTTS Service")
 
 
 def _use_ultravox_runtime() -> bool:
     return settings.USE_ULTRAVOX_RUNTIME and ultravox_service.enabled
 
 
-def _pcm16le_to_wav_bytes(
-    pcm_bytes: bytes,
-    sample_rate: int,
-    channels: int = 1,
-    sample_width: int = 2,
-) -> bytes:
-    """Wraps raw PCM audio into WAV for browser-friendly playback."""
-    with io.BytesIO() as wav_buffer:
-        with wave.open(wav_buffer, "wb") as wav_file:
-            wav_file.setnchannels(channels)
-            wav_file.setsampwidth(sample_width)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(pcm_bytes)
-        return wav_buffer.getvalue()
-
-
 def _extract_agent_tool_names(tools: Optional[List[Any]]) -> List[str]:
     names: List[str] = []
     seen = set()
@@ -213,7 +220,6 @@ def _build_ultravox_selected_tools(tools: Optional[List[Any]]) -> List[Dict[str,
 
 
 async def _run_ultravox_compliance_audit(
-    db: Session,
     session_id: str,
     agent_id: str,
     organization_id: Optional[str],
@@ -225,7 +231,8 @@ async def _run_ultravox_compliance_audit(
     if not user_input or not ai_response:
         return
 
-    rules = get_baseline_rules(db=db, organization_id=organization_id)
+    async with database.async_session_scope() as db:
+        rules = await get_baseline_rules(db=db, organization_id=organization_id)
     audit_result = await compliance_validator.validate_turn(
         user_input,
         ai_response,
@@ -245,8 +252,9 @@ async def _run_ultravox_compliance_audit(
         organization_id=organization_id,
         state_name=state_name,
     )
-    db.add(audit_log)
-    db.commit()
+    async with database.async_session_scope() as db:
+        db.add(audit_log)
+        await db.commit()
 
     if not audit_result.is_compliant:
         await monitoring_service.broadcast_event(
@@ -260,7 +268,7 @@ async def _run_ultravox_compliance_audit(
         )
 
 
-async def execute_tool(tool_name: str, arguments: dict, db: Session, agent_id: str, session_id: str = None) -> str:
+async def execute_tool(tool_name: str, arguments: dict, agent_id: str, session_id: str = None) -> str:
     """Execute a tool and return the result."""
     if tool_name not in AVAILABLE_TOOLS:
         # Fallback to MCP (Model Context Protocol) Tools
@@ -275,14 +283,15 @@ async def execute_tool(tool_name: str, arguments: dict, db: Session, agent_id: s
     
     # Check if tool requires human approval
     if tool.requires_approval:
-        hitl_service = HITLService(db)
-        action = await hitl_service.create_pending_action(
-            session_id=session_id,
-            agent_id=agent_id,
-            action_type=tool.name,
-            description=f"Action requested by AI: {tool.name} with args {arguments}",
-            payload=arguments
-        )
+        async with database.async_session_scope() as db:
+            hitl_service = HITLService(db)
+            action = await hitl_service.create_pending_action(
+                session_id=session_id,
+                agent_id=agent_id,
+                action_type=tool.name,
+                description=f"Action requested by AI: {tool.name} with args {arguments}",
+                payload=arguments
+            )
         return f"The tool '{tool_name}' requires human authorization. I've submitted a request for approval (ID: {action.id[:8]}). I will continue once authorized."
 
     # Normal execution
@@ -296,8 +305,8 @@ async def execute_tool(tool_name: str, arguments: dict, db: Session, agent_id: s
     return result
 
 
-async def send_with_tts(websocket: WebSocket, text: str, language: str = "en-US", voice: str = None, sentiment_score: float = None):
-    """Send text response with TTS audio (sentiment-aware)."""
+async def send_with_tts(websocket: AudioTransport, text: str, language: str = "en-US", voice: str = None, sentiment_score: float = None, latency: Optional[TurnLatency] = None, audio_sink: Optional[List[bytes]] = None):
+    """Send text response with TTS audio (sentiment-aware). Sent audio is also appended to `audio_sink`."""
     await websocket.send_json({"type": "text_chunk", "text": text})
     
     # Infer instruction from sentiment
@@ -310,62 +319,96 @@ async def send_with_tts(websocket: WebSocket, text: str, language: str = "en-US"
         else:
             instruct = "professional, calm"
 
-    # Check support
-    sig = inspect.signature(tts_service.synthesize)
-    if 'instruct' in sig.parameters:
-        audio_bytes = await tts_service.synthesize(text, language=language, voice=voice, instruct=instruct)
-    else:
-        audio_bytes = await tts_service.synthesize(text, language=language, voice=voice)
+    # Instructions are dropped for providers that do not support them
+    with tts_request(TTSPriority.FIRST_SENTENCE, deadline_ms=settings.TTS_QUEUE_DEADLINE_MS):
+        audio_bytes = await synthesizer_for(tts_service).synthesize(text, language=language, voice=voice, instruct=instruct)
 
     if audio_bytes:
-        audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-        await websocket.send_json({"type": "audio", "data": audio_b64})
+        if latency:
+            latency.mark(LatencyStage.TTS_FIRST_BYTE)
+        await websocket.send_audio(audio_bytes)
+        if latency:
+            latency.mark(LatencyStage.FIRST_AUDIO_SENT)
+        if audio_sink is not None:
+            audio_sink.append(audio_bytes)
 
 
-async def stream_response_with_tts(websocket: WebSocket, llm_stream, session_id: str = None, language: str = "en-US", voice: str = None, sentiment_score: float = None):
-    """Stream LLM response with sentence-buffered TTS."""
+async def stream_response_with_tts(websocket: AudioTransport, llm_stream, session_id: str = None, language: str = "en-US", voice: str = None, sentiment_score: float = None, latency: Optional[TurnLatency] = None, audio_sink: Optional[List[bytes]] = None, segmenter_settings: Optional[SegmenterSettings] = None):
+    """Stream LLM response with pipelined, sentence-segmented TTS. Sent audio is also appended to `audio_sink`."""
     full_response = ""
-    current_sentence = ""
-    
-    async for chunk in llm_stream:
-        full_response += chunk
-        current_sentence += chunk
-        await websocket.send_json({"type": "text_chunk", "text": chunk})
-        
-        # Broadcast chunk to monitoring
-        if session_id:
-            await monitoring_service.broadcast_event(session_id, "text_chunk", {"text": chunk})
-        
-        # TTS on sentence boundaries
-        if any(punct in chunk for punct in [".", "?", "!", "\n"]):
-            if len(current_sentence.strip()) > 5:
-                # Infer instruction
-                instruct = None
-                if sentiment_score is not None:
-                    if sentiment_score < 0.3: instruct = "empathetic, soft"
-                    elif sentiment_score > 0.8: instruct = "excited"
-                    else: instruct = "professional"
-
-                if 'instruct' in inspect.signature(tts_service.synthesize).parameters:
-                    audio_bytes = await tts_service.synthesize(current_sentence, language=language, voice=voice, instruct=instruct)
-                else:
-                    audio_bytes = await tts_service.synthesize(current_sentence, language=language, voice=voice)
-                    
-                if audio_bytes:
-                    audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-                    await websocket.send_json({"type": "audio", "data": audio_b64})
-                current_sentence = ""
-    
-    # Flush remaining
-    if len(current_sentence.strip()) > 2:
-        if 'instruct' in inspect.signature(tts_service.synthesize).parameters:
-            audio_bytes = await tts_service.synthesize(current_sentence, language=language, voice=voice, instruct=instruct if 'instruct' in locals() else None)
-        else:
-            audio_bytes = await tts_service.synthesize(current_sentence, language=language, voice=voice)
+    segmenter = SentenceSegmenter(segmenter_settings)
+
+    # Infer instruction
+    instruct = None
+    if sentiment_score is not None:
+        if sentiment_score < 0.3: instruct = "empathetic, soft"
+        elif sentiment_score > 0.8: instruct = "excited"
+        else: instruct = "professional"
+
+    tts = synthesizer_for(tts_service)
+    segments_started = 0
+
+    async def synthesize(segment: str):
+        nonlocal segments_started
+        # The first segment decides time-to-first-audio; the rest only has to keep up with playback
+        priority = TTSPriority.FIRST_SENTENCE if segments_started == 0 else TTSPriority.CONTINUATION
+        segments_started += 1
+        with tts_request(priority, deadline_ms=settings.TTS_QUEUE_DEADLINE_MS):
+            async for audio_chunk in tts.stream(segment, language=language, voice=voice, instruct=instruct):
+                if latency:
+                    latency.mark(LatencyStage.TTS_FIRST_BYTE)
+                yield audio_chunk
+
+    # Elite Feature: Early audio forwarding
+    # Binary clients get each chunk as it leaves the TTS provider; JSON clients
+    # (one self-contained clip per message) get the segment once it is complete.
+    segment_audio: List[bytes] = []
+
+    async def send_audio(audio_chunk: bytes, end: bool):
+        if audio_chunk:
+            segment_audio.append(audio_chunk)
+            if websocket.binary:
+                await websocket.send_audio(audio_chunk, end=False)
+                if latency:
+                    latency.mark(LatencyStage.FIRST_AUDIO_SENT)
+        if not end:
+            return
+        clip = b"".join(segment_audio)
+        segment_audio.clear()
+        await websocket.send_audio(b"" if websocket.binary else clip, end=True)
+        if latency:
+            latency.mark(LatencyStage.FIRST_AUDIO_SENT)
+        if audio_sink is not None:
+            audio_sink.append(clip)
+
+    # Tokens keep flowing while earlier segments are synthesized and sent
+    async with SpeechPipeline(
+        synthesize,
+        send_audio,
+        max_pending=settings.TTS_PIPELINE_MAX_PENDING,
+        max_concurrent_synthesis=settings.TTS_PIPELINE_SYNTHESIS_CONCURRENCY,
+    ) as pipeline:
+        async for chunk in llm_stream:
+            if latency:
+                latency.mark(LatencyStage.LLM_FIRST_TOKEN)
+            full_response += chunk
+            await websocket.send_json({"type": "text_chunk", "text": chunk})
+            
+            # Broadcast chunk to monitoring
+            if session_id:
+                await monitoring_service.broadcast_event(session_id, "text_chunk", {"text": chunk})
+            
+            # TTS on sentence boundaries
+            for segment in segmenter.push(chunk):
+                await pipeline.submit(segment)
 
-        if audio_bytes:
-            audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-            await websocket.send_json({"type": "audio", "data": audio_b64})
+        if latency:
+            latency.mark(LatencyStage.LLM_COMPLETE)
+        
+        # Flush remaining
+        remaining = segmenter.flush()
+        if remaining:
+            await pipeline.submit(remaining)
     
     # Broadcast full response completion
     if session_id:
@@ -378,10 +421,9 @@ async def stream_response_with_tts(websocket: WebSocket, llm_stream, session_id:
 
 
 async def run_ultravox_proxy_session(
-    websocket: WebSocket,
+    websocket: AudioTransport,
     agent: models.Agent,
     agent_id: str,
-    db: Session,
     active_persona: Optional[str] = None,
     active_tools: Optional[List[Any]] = None,
     language: Optional[str] = None,
@@ -452,16 +494,16 @@ async def run_ultravox_proxy_session(
             nonlocal closed_by_client
             while True:
                 try:
-                    client_message = await websocket.receive_text()
+                    payload = await websocket.receive_message()
                 except WebSocketDisconnect:
                     closed_by_client = True
                     break
-
-                try:
-                    payload = json.loads(client_message)
                 except json.JSONDecodeError:
                     continue
 
+                if payload is None:
+                    continue
+
                 if "text" in payload and payload["text"]:
                     user_text = str(payload["text"])
                     await uvx_ws.send(json.dumps({
@@ -471,6 +513,10 @@ async def run_ultravox_proxy_session(
                     }))
                     continue
 
+                if "audio_bytes" in payload:
+                    await uvx_ws.send(bytes(payload["audio_bytes"]))
+                    continue
+
                 if "audio" in payload:
                     try:
                         raw_audio = base64.b64decode(payload["audio"])
@@ -483,14 +529,11 @@ async def run_ultravox_proxy_session(
             nonlocal turn_count
             async for uvx_message in uvx_ws:
                 if isinstance(uvx_message, (bytes, bytearray)):
-                    wav_audio = _pcm16le_to_wav_bytes(
-                        bytes(uvx_message),
+                    wav_audio = pcm16_to_wav(
+                        uvx_message,
                         sample_rate=settings.ULTRAVOX_OUTPUT_SAMPLE_RATE,
                     )
-                    await websocket.send_json({
-                        "type": "audio",
-                        "data": base64.b64encode(wav_audio).decode("utf-8"),
-                    })
+                    await websocket.send_audio(wav_audio)
                     continue
 
                 try:
@@ -541,7 +584,6 @@ async def run_ultravox_proxy_session(
                                     turn_count += 1
                                     try:
                                         await _run_ultravox_compliance_audit(
-                                            db=db,
                                             session_id=session_id,
                                             agent_id=agent_id,
                                             organization_id=org_id,
@@ -612,7 +654,6 @@ async def run_ultravox_proxy_session(
                         result = await execute_tool(
                             tool_name,
                             tool_arguments,
-                            db,
                             agent_id,
                             session_id,
                         )
@@ -694,65 +735,57 @@ async def run_ultravox_proxy_session(
 async def websocket_endpoint(
     websocket: WebSocket, 
     agent_id: str, 
-    db: Session = Depends(database.get_db),
     language: str = Query(None),
     voice: str = Query(None),
-    caller_id: str = Query(None)
+    caller_id: str = Query(None),
+    audio_transport: str = Query(AUDIO_TRANSPORT_JSON),
+    stt: str = Query(STT_MODE_UTTERANCE)
 ):
     await websocket.accept()
-    
-    # Fetch agent configuration
-    agent = db.query(models.Agent).filter(models.Agent.id == agent_id).first()
-    if not agent:
-        await websocket.close(code=4004, reason="Agent not found")
+    # Negotiated audio encoding: raw binary frames or legacy base64-in-JSON
+    transport = AudioTransport(websocket, mode=audio_transport)
+    await run_voice_session(transport, agent_id, language=language, voice=voice, caller_id=caller_id, stt=stt)
+
+
+async def run_voice_session(
+    transport,
+    agent_id: str,
+    language: Optional[str] = None,
+    voice: Optional[str] = None,
+    caller_id: Optional[str] = None,
+    stt: str = STT_MODE_UTTERANCE,
+    channel: str = "websocket",
+    allow_ultravox: bool = True,
+):
+    """
+    Native voice session (turn engine) over an accepted audio transport:
+    `AudioTransport` for browser websockets, `TwilioMediaTransport` for phone calls.
+    """
+    # Fetch agent configuration (cached per worker; A/B version rolled per call)
+    async with database.async_session_scope() as db:
+        resolved = await agent_config_cache.resolve(db, agent_id)
+    if not resolved:
+        await transport.close(code=4004, reason="Agent not found")
         return
+    agent, agent_config = resolved
 
     # Multi-tenancy Isolation (Moved up to use for version queries if needed, though agent is already fetched)
     org_id = agent.organization_id
     
-    active_persona = agent.persona
-    active_tools = agent.tools or []
-    active_policy = None
-    
-    # Canary / A/B Routing Logic
-    versions = db.query(models.AgentVersion).filter(models.AgentVersion.agent_id == agent_id, models.AgentVersion.weight > 0).all()
-    if versions:
-        # Weighted selection
-        total_weight = sum(v.weight for v in versions)
-        if total_weight > 0:
-            rand_val = random.randint(1, 100)
-            cumulative = 0
-            for v in versions:
-                cumulative += v.weight
-                if rand_val <= cumulative:
-                    logger.info(f"A/B Route: Using Version {v.version_number} (Weight: {v.weight}%)")
-                    active_persona = v.persona
-                    active_tools = v.tools
-                    if v.policy:
-                        from app.schemas.policy import ConversationPolicy
-                        active_policy = ConversationPolicy.parse_obj(v.policy)
-                    break
-
-    # Manual Pinning overrides A/B
-    elif agent.active_version_id:
-        version = db.query(models.AgentVersion).filter(models.AgentVersion.id == agent.active_version_id).first()
-        if version:
-            logger.info(f"Using pinned Version {version.version_number} for agent {agent.name}")
-            active_persona = version.persona
-            active_tools = version.tools
-            if version.policy:
-                from app.schemas.policy import ConversationPolicy
-                active_policy = ConversationPolicy.parse_obj(version.policy)
+    active_persona = agent_config.persona
+    active_tools = agent_config.tools
+    active_policy = agent_config.policy
+    if agent_config.version_id:
+        logger.info(f"Using Version {agent_config.version_number} for agent {agent.name}")
 
     # Medium scope runtime switch:
     # Keep control-plane in this backend but route realtime speech path through Ultravox.
-    if _use_ultravox_runtime():
+    if allow_ultravox and _use_ultravox_runtime():
         try:
             await run_ultravox_proxy_session(
-                websocket=websocket,
+                websocket=transport,
                 agent=agent,
                 agent_id=agent_id,
-                db=db,
                 active_persona=active_persona,
                 active_tools=active_tools,
                 language=language,
@@ -761,9 +794,9 @@ async def websocket_endpoint(
             )
         except Exception as e:
             logger.error(f"Ultravox proxy session failed: {e}")
-            if websocket.client_state != WebSocketState.DISCONNECTED:
-                await websocket.send_json({"type": "error", "message": f"Ultravox runtime error: {str(e)}"})
-                await websocket.close(code=1011, reason="Ultravox runtime error")
+            if transport.client_state != WebSocketState.DISCONNECTED:
+                await transport.send_json({"type": "error", "message": f"Ultravox runtime error: {str(e)}"})
+                await transport.close(code=1011, reason="Ultravox runtime error")
         return
 
     logger.info(f"Session isolation active for organization: {org_id}")
@@ -771,14 +804,17 @@ async def websocket_endpoint(
     # Use requested language or fallback to agent default
     session_language = language or agent.language or "en-US"
     session_voice = voice or "auto"
+    stt_mode = STT_MODE_STREAMING if stt == STT_MODE_STREAMING else STT_MODE_UTTERANCE
 
     # Create session
     session_id = str(uuid.uuid4())
+    # Turn tasks created below inherit it: the TTS scheduler balances work per session
+    bind_tts_session(session_id)
     await session_manager.create_session(
         session_id=session_id,
         agent_id=agent_id,
         caller_id=None,
-        metadata={"channel": "websocket"}
+        metadata={"channel": channel}
     )
     
     # Broadcast session start
@@ -790,25 +826,31 @@ async def websocket_endpoint(
     
     # Initialize services
     session_policy = active_policy or get_sample_policy()
-    orchestrator = AgentOrchestrator(db, policy=session_policy)
+    orchestrator = AgentOrchestrator(policy=session_policy)
     llm_service = EnterpriseLLM(primary_model="llama-3.3-70b-versatile") # Use Enhanced Enterprise LLM
     # flow = ConversationFlow(session_id=session_id) # Replaced by PolicyEngine via Orchestrator
-    memory_service = get_memory_service(db)
+    # No session is held for the call: every lookup/write below opens its own unit of work
     user_context = ""
     if caller_id:
-        user_context = await memory_service.get_context_for_call(caller_id, organization_id=org_id)
+        async with database.async_session_scope() as db:
+            user_context = await get_memory_service(db).get_context_for_call(caller_id, organization_id=org_id)
         logger.info(f"Loaded memory context for user {caller_id} (Org: {org_id})")
     
-    analytics_service = AnalyticsService(db)
-    voice_ux = VoiceUXService(tts_service)
-    shadow_service = ShadowComparisonService(db)
-
-    # Pre-cache UX tokens (Non-blocking)
-    asyncio.create_task(voice_ux.precompute_tokens(voice=session_voice))
+    voice_ux = VoiceUXService(tts_service, voice=session_voice)
+    shadow_service = ShadowComparisonService()
+
+    # Pre-cache UX tokens (Non-blocking; joins the shared warm-up, no-op once the voice is warm)
+    task_supervisor.submit(
+        VOICE_UX_PRECOMPUTE,
+        partial(voice_ux.precompute_tokens, voice=session_voice),
+        group=session_id,
+        name=f"{session_id}:ux_tokens",
+    )
     
     # Tracking
     session_start_dt = datetime.utcnow()
     latencies = []
+    call_latency = CallLatencyStats()
     turn_count = 0
     token_count = 0
     
@@ -829,24 +871,154 @@ async def websocket_endpoint(
     logger.info(f"Session {session_id} started for agent: {agent.name}")
     
     # Load Tools
-    agent_tool_names = active_tools if active_tools else []
-    tool_schemas = get_tool_schemas(agent_tool_names) if agent_tool_names else None
+    tool_schemas = agent_config.tool_schemas
+
+    # Semantic Response Cache (opt-in per agent)
+    # Answers that depend on tools, multi-agent reasoning or the caller's memory are never cached
+    response_cache_settings = response_cache.settings_for(agent)
+    if response_cache_settings and (tool_schemas or user_context or "multi-agent" in (agent.description or "").lower()):
+        response_cache_settings = None
+
+    # Per-agent TTS chunking (first-clause length, sentence merging)
+    segmenter_settings = SegmenterSettings.from_config(getattr(agent, "config", None))
+    # Per-agent endpointing thresholds (server VAD on raw PCM / μ-law streaming audio)
+    vad_settings = VADSettings.from_config(getattr(agent, "config", None))
+    # Per-agent speculative generation on stable streaming partials (opt-in)
+    speculation_settings = SpeculationSettings.from_config(getattr(agent, "config", None))
     
-    await websocket.send_json({
+    await transport.send_json({
         "type": "session_start",
         "session_id": session_id,
-        "agent_name": agent.name
+        "agent_name": agent.name,
+        "stt_mode": stt_mode,
+        **transport.describe()
     })
     
     # Queues and Tasks
     input_queue = asyncio.Queue()
     current_response_task: asyncio.Task = None
+
+    # Elite Feature: Streaming STT
+    # Caller audio is recognized while it arrives; partials become live captions and
+    # each final hypothesis is queued as a "transcript" message that starts a turn.
+    transcriber: Optional[StreamingTranscriber] = None
+    speculator: Optional[Speculator] = None
+    if stt_mode == STT_MODE_STREAMING:
+        async def relay_partial(hypothesis):
+            await transport.send_json({"type": "transcript_partial", "text": hypothesis.text, "confidence": hypothesis.confidence})
+            if speculator:
+                speculator.on_partial(hypothesis.text)
+
+        async def queue_final(hypothesis):
+            await transport.send_json({"type": "transcript_final", "text": hypothesis.text, "confidence": hypothesis.confidence})
+            await input_queue.put({"type": "transcript", "text": hypothesis.text, "transcription": hypothesis.to_result()})
+
+        transcriber = StreamingTranscriber(stt_service, session_language, on_partial=relay_partial, on_final=queue_final)
+        logger.info(f"Session {session_id} streaming STT via {type(stt_service).__name__} ({channel})")
+
+    async def query_knowledge(knowledge_agent_id: str, text: str):
+        async with database.async_session_scope() as stage_db:
+            knowledge_service = KnowledgeService(stage_db)
+            return await knowledge_service.query_knowledge(knowledge_agent_id, text, limit=2)
+
+    def knowledge_context_for(relevant_chunks) -> str:
+        if not relevant_chunks:
+            return ""
+        return "\n\nUSE THESE FACTS FROM YOUR KNOWLEDGE BASE IF RELEVANT:\n" + \
+               "\n".join([f"- {c['content']}" for c in relevant_chunks])
+
+    def response_system_prompt(knowledge_context: str) -> str:
+        return f"{active_persona}{knowledge_context}\n\nIMPORTANT: Respond only in {session_language}."
+
+    def speculation_key():
+        # A speculative LLM call is only reusable if the turn would make the same call
+        return (agent.id, len(context.history), llm_service.model)
+
+    # Elite Feature: Speculative Generation
+    # A partial that stays unchanged starts RAG and the LLM stream before the caller has
+    # finished; the turn commits that stream if the final transcript matches. Only text is
+    # generated ahead of time: nothing is synthesized or sent until the turn commits it.
+    if stt_mode == STT_MODE_STREAMING and speculation_settings.enabled:
+        def start_speculation(text: str) -> Speculation:
+            speculating_agent_id = agent.id
+            history = list(context.history)
+
+            def generate(partial_text: str, relevant_chunks):
+                system_prompt = response_system_prompt(knowledge_context_for(relevant_chunks))
+                return system_prompt, llm_service.generate_stream(partial_text, system_prompt, history)
+
+            return Speculation(
+                text,
+                speculation_key(),
+                retrieve=lambda partial_text: query_knowledge(speculating_agent_id, partial_text),
+                generate=generate,
+            )
+
+        speculator = Speculator(
+            speculation_settings,
+            start=start_speculation,
+            can_start=lambda: not (current_response_task and not current_response_task.done()),
+            metrics=speculation_metrics,
+        )
+
+    # Elite Feature: Server-side VAD
+    # Caller speech starts barge-in without a client "interrupt", and the end of speech
+    # (after the hangover) finalizes the utterance instead of waiting for a client timeout.
+    vad: Optional[VoiceActivityDetector] = None
+    # Raw caller audio (PCM16 / μ-law) is kept in one preallocated ring per session: STT gets
+    # each frame as a view of it, VAD reads whole frames from it, and the last utterance stays
+    # available (by VAD stream time) for a second, batch recognition pass.
+    caller_audio: Optional[AudioRingBuffer] = None
+    utterance_start_ms: Optional[float] = None
+    last_utterance_ms: Optional[tuple] = None  # (start, end) of the last utterance VAD closed
+
+    async def handle_vad_events(audio_data, mimetype: Optional[str]):
+        nonlocal vad, utterance_start_ms, last_utterance_ms
+        if vad is None:
+            vad = VoiceActivityDetector.for_mimetype(vad_settings, mimetype)
+            if vad is None:
+                return  # Compressed audio: endpointing stays with the client / STT provider
+        events = vad.process_buffered(caller_audio) if caller_audio is not None else vad.process_input(audio_data, mimetype)
+        for event in events:
+            await transport.send_json({"type": "vad", **event.to_dict()})
+            if event.kind == VADEventType.SPEECH_START:
+                utterance_start_ms, last_utterance_ms = event.at_ms, None
+                if current_response_task and not current_response_task.done():
+                    current_response_task.cancel()
+                    logger.info("Caller speech detected: interrupting current response task")
+                # Audio already handed to the transport may still be playing
+                await transport.interrupt()
+            else:
+                if utterance_start_ms is not None:
+                    last_utterance_ms = (utterance_start_ms, event.at_ms)
+                await transcriber.push(b"", end_of_utterance=True)
+
+    async def rerecognize_utterance(transcription: TranscriptionResult) -> Optional[TranscriptionResult]:
+        """Batch recognition of the caller's last utterance, read back from the ring."""
+        if caller_audio is None or not settings.STT_RERECOGNIZE_UNRELIABLE:
+            return None
+        if last_utterance_ms:
+            start_ms, end_ms = last_utterance_ms
+            window = caller_audio.window_ms(max(0.0, start_ms - 200), end_ms)  # With some lead-in
+        elif transcription.duration:
+            window = caller_audio.last_ms(transcription.duration * 1000 + settings.STT_ENDPOINTING_MS + 200)
+        else:
+            return None
+        if not window:
+            return None
+        wav = caller_audio.to_wav(window)  # Copy now: the ring keeps being written while we wait
+        try:
+            return await stt_service.transcribe(wav, language=session_language, mimetype="audio/wav")
+        except Exception as e:
+            logger.warning(f"Re-recognition failed: {e}")
+            return None
     
     async def read_websocket():
         try:
             while True:
-                data = await websocket.receive_text()
-                await input_queue.put(json.loads(data))
+                message = await transport.receive_message()
+                if message is not None:
+                    await input_queue.put(message)
         except WebSocketDisconnect:
             await input_queue.put({"type": "disconnect"})
         except Exception as e:
@@ -893,42 +1065,139 @@ async def websocket_endpoint(
         }
         return acknowledgements.get(text_lower)
 
-    async def process_turn(user_input: str):
+    async def process_turn(user_input: str, transcription: Optional[TranscriptionResult] = None):
         nonlocal turn_count, agent, token_count
+        turn_latency: Optional[TurnLatency] = None
+        stages: Optional[StageRunner] = None
+        speculation: Optional[Speculation] = None
         try:
             # 1. Track Metrics & Sentiment
             turn_count += 1
             turn_start_time = time.time()
+            turn_latency = call_latency.start_turn(turn_count)
+            if speculator:
+                # RAG and the LLM stream may already be running on the caller's last stable partial
+                speculation = speculator.take(user_input, speculation_key())
+
+            # Confidence Check (Elite Feature)
+            # Scores come from the STT provider (typed text is certain). Noise and misrecognitions
+            # get a scripted clarification before any retrieval, LLM or reflection work.
+            context.confidence.transcription = transcription
+            stt_score = transcription.score if transcription else None
+            context.confidence.stt = 1.0 if stt_score is None else stt_score
+            clarification = orchestrator.clarify_transcription(
+                context, min_confidence=settings.STT_MIN_CONFIDENCE, min_word_confidence=settings.STT_MIN_WORD_CONFIDENCE
+            )
+            if clarification and transcription is not None:
+                # The streamed audio is still buffered: one more pass before asking the caller to repeat
+                retry = await rerecognize_utterance(transcription)
+                if retry and retry.text.strip() and not retry.is_unreliable(settings.STT_MIN_CONFIDENCE, settings.STT_MIN_WORD_CONFIDENCE):
+                    logger.info(f"Re-recognized unreliable transcript: {user_input!r} -> {retry.text!r}")
+                    user_input, transcription = retry.text, retry
+                    context.confidence.transcription = retry
+                    context.confidence.stt = 1.0 if retry.score is None else retry.score
+                    clarification = None
+                    if speculator:
+                        # The speculation ran on the old text
+                        speculator.release(speculation)
+                        speculation = None
+            if clarification:
+                logger.warning(f"Unreliable transcription (confidence {context.confidence.stt:.2f}): {user_input!r}")
+                await send_with_tts(transport, clarification, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
+                await transport.send_json({"type": "end_response"})
+                return
             
             # Update Sentiment Slope (Moving Average)
-            current_sentiment = orchestrator.analyze_sentiment(user_input)
+            with turn_latency.measure(LatencyStage.SENTIMENT_INTENT):
+                current_sentiment = orchestrator.analyze_sentiment(user_input)
             context.sentiment_slope = (context.sentiment_slope * 0.7) + (current_sentiment * 0.3)
 
             # 2. Fast Path Check (Elite Feature)
             fast_response = is_fast_path_turn(user_input)
             if fast_response:
                 logger.info("Fast Path Triggered")
-                await send_with_tts(websocket, fast_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
+                await send_with_tts(transport, fast_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
                 await session_manager.add_to_history(session_id, "user", user_input)
                 await session_manager.add_to_history(session_id, "assistant", fast_response)
-                await websocket.send_json({"type": "end_response"})
+                await transport.send_json({"type": "end_response"})
                 return
 
-            # 3. Check for HITL Intervention
-            hitl_service = HITLService(db)
-            intervention = await hitl_service.get_intervention_status(session_id)
-            
+            # 3. Pre-LLM lookups
+            # Independent lookups start concurrently; each is joined only where its result is needed.
+            with turn_latency.measure(LatencyStage.SENTIMENT_INTENT):
+                context.current_intent = orchestrator.detect_intent(user_input)
+
+            routing_agent = agent
+            is_swarm_supervisor = agent.role == "supervisor" or "swarm" in (agent.description or "").lower()
+
+            async def lookup_intervention():
+                with turn_latency.measure(LatencyStage.HITL_LOOKUP):
+                    async with database.async_session_scope() as stage_db:
+                        hitl_service = HITLService(stage_db)
+                        return await hitl_service.get_intervention_status(session_id)
+
+            async def fetch_specialists():
+                with turn_latency.measure(LatencyStage.SWARM_ROUTING):
+                    return await orchestrator.get_agents_by_role("specialist")
+
+            async def route_agent(specialists: Optional[List[models.Agent]] = None):
+                """Returns (selected_agent, discovered_agent)."""
+                with turn_latency.measure(LatencyStage.SWARM_ROUTING):
+                    if not is_swarm_supervisor:
+                        # Standard routing
+                        return await orchestrator.select_agent(context, agent_id), None
+
+                    # Elite feature: if supervisor, route to specialist
+                    swarm = SwarmOrchestrator(routing_agent)
+                    selected = await swarm.route_task(user_input, context.history, specialists)
+
+                    # PEAK AGENTIC FEATURE: Autonomous Discovery
+                    # If pool selection failed to find a worker, search the whole Org dynamically
+                    if selected.id == routing_agent.id:
+                        discovered = await swarm.discover_and_hire(user_input)
+                        if discovered:
+                            return discovered, discovered
+                    return selected, None
+
+            async def retrieve_knowledge(knowledge_agent_id: str):
+                with turn_latency.measure(LatencyStage.RAG):
+                    return await query_knowledge(knowledge_agent_id, user_input)
+
+            stages = StageRunner(name=f"{session_id}:turn-{turn_count}")
+            stages.add("intervention", lookup_intervention)
+            if is_swarm_supervisor:
+                stages.add("specialists", fetch_specialists)
+                stages.add("routing", route_agent, depends_on=["specialists"])
+            else:
+                stages.add("routing", route_agent)
+            # RAG is fetched speculatively for the current agent and only re-queried if routing switches agents
+            if speculation:
+                stages.add("knowledge", speculation.knowledge)
+            else:
+                stages.add("knowledge", lambda: retrieve_knowledge(routing_agent.id))
+
+            # The utterance embedding for the response cache is computed alongside the other lookups
+            cache_utterance = normalize_utterance(user_input) if response_cache_settings else ""
+            use_response_cache = bool(cache_utterance) and response_cache.is_cacheable_utterance(cache_utterance)
+            if use_response_cache:
+                async def embed_utterance():
+                    with turn_latency.measure(LatencyStage.RESPONSE_CACHE):
+                        return await response_cache.embed(cache_utterance)
+                stages.add("cache_embedding", embed_utterance)
+
             # CASE A: HUMAN TAKEOVER
+            intervention = await stages.result("intervention")
             if intervention and intervention.mode == "takeover":
                 logger.info(f"Session {session_id} in TAKEOVER mode.")
+                await stages.cancel()
                 await monitoring_service.broadcast_event(session_id, "hitl_takeover", {"active": True, "agent": intervention.user_id})
                 
                 try:
                     human_text = await asyncio.wait_for(human_input_queue.get(), timeout=60.0)
-                    await send_with_tts(websocket, human_text, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
+                    await send_with_tts(transport, human_text, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
                     await session_manager.add_to_history(session_id, "user", user_input)
                     await session_manager.add_to_history(session_id, "assistant", human_text)
-                    await websocket.send_json({"type": "end_response"})
+                    await transport.send_json({"type": "end_response"})
                     return
                 except asyncio.TimeoutError:
                     return
@@ -942,14 +1211,10 @@ async def websocket_endpoint(
             # Voice UX: Micro-acknowledgement for longer inputs (Elite Feature)
             if len(user_input.split()) > 10:
                 # Send a quick "mm-hm" or "Right" to signal the user was heard
-                await voice_ux.send_backchannel(websocket)
+                await voice_ux.send_backchannel(transport)
             
             # 3. Policy Engine: Input Guard & State Transition
-            context.current_intent = orchestrator.detect_intent(user_input)
-            
-            # Confidence Check (Elite Feature)
-            # In production, these scores come from STT (Deepgram/OpenAI) and LLM logprobs
-            context.confidence.stt = 0.95 # Mocked for demo
+            # Intent confidence joins the STT score set at the start of the turn
             context.confidence.intent = 0.9 if context.current_intent else 0.7
             context.confidence.overall = (context.confidence.stt + context.confidence.intent) / 2
             
@@ -957,8 +1222,9 @@ async def websocket_endpoint(
             confidence_response = orchestrator.handle_low_confidence(context)
             if confidence_response:
                 logger.warning(f"Low Confidence handoff triggered: {context.confidence.overall}")
-                await send_with_tts(websocket, confidence_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
-                await websocket.send_json({"type": "end_response"})
+                await stages.cancel()
+                await send_with_tts(transport, confidence_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
+                await transport.send_json({"type": "end_response"})
                 return
 
             if orchestrator.policy_engine:
@@ -966,8 +1232,9 @@ async def websocket_endpoint(
                     context.current_state, user_input, context.current_intent
                 )
                 if not is_allowed:
-                    await send_with_tts(websocket, f"I'm sorry, I cannot process that request. {reason}", language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
-                    await websocket.send_json({"type": "end_response"})
+                    await stages.cancel()
+                    await send_with_tts(transport, f"I'm sorry, I cannot process that request. {reason}", language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
+                    await transport.send_json({"type": "end_response"})
                     return
                 
                 context.current_state = orchestrator.policy_engine.get_next_state(context.current_state, "user_spoke")
@@ -975,52 +1242,82 @@ async def websocket_endpoint(
                     context.current_state = orchestrator.policy_engine.get_next_state(context.current_state, f"{context.current_intent}_intent")
 
             # 4. Agent Selection (Dynamic Swarm Routing)
-            swarm = SwarmOrchestrator(db, agent)
-            available_specialists = orchestrator.get_agents_by_role("specialist")
-            
-            # Elite feature: if supervisor, route to specialist
-            if agent.role == "supervisor" or "swarm" in (agent.description or "").lower():
-                selected_agent = await swarm.route_task(user_input, context.history, available_specialists)
-                
-                # PEAK AGENTIC FEATURE: Autonomous Discovery
-                # If pool selection failed to find a worker, search the whole Org dynamically
-                if selected_agent.id == agent.id:
-                    discovered_agent = await swarm.discover_and_hire(user_input)
-                    if discovered_agent:
-                        selected_agent = discovered_agent
-                        await websocket.send_json({
-                            "type": "agent_discovery",
-                            "name": discovered_agent.name,
-                            "capability": user_input[:50]
-                        })
+            selected_agent, discovered_agent = await stages.result("routing")
+            if discovered_agent:
+                await transport.send_json({
+                    "type": "agent_discovery",
+                    "name": discovered_agent.name,
+                    "capability": user_input[:50]
+                })
 
-                if selected_agent.id != agent.id:
-                    await websocket.send_json({
+            if selected_agent.id != agent.id:
+                if is_swarm_supervisor:
+                    await transport.send_json({
                         "type": "agent_switch",
                         "from": agent.name, "to": selected_agent.name,
                         "reason": "Swarm Delegation"
                     })
-                    agent = selected_agent
-            else:
-                # Standard routing
-                selected_agent = await orchestrator.select_agent(context, agent_id)
-                if selected_agent.id != agent.id:
-                    agent = selected_agent
-            
+                agent = selected_agent
+
+            # Semantic Response Cache: a repeated question is answered without RAG, LLM or TTS
+            full_response = ""
+            response_sent = False
+            cache_scope = None
+            cached_answer = None
+            use_response_cache = (
+                use_response_cache
+                and agent.id == agent_id
+                and not (intervention and intervention.mode == "whisper")
+            )
+            if use_response_cache:
+                try:
+                    cache_embedding = await stages.result("cache_embedding")
+                    cache_scope = response_cache.scope_for(agent_id, agent_config.version_id, active_persona, context.current_state)
+                    with turn_latency.measure(LatencyStage.RESPONSE_CACHE):
+                        cached_answer = response_cache.lookup(cache_scope, cache_utterance, cache_embedding, response_cache_settings)
+                except Exception as e:
+                    logger.warning(f"Response cache lookup failed: {e}")
+                    use_response_cache = False
+
+            if cached_answer:
+                logger.info(f"Response cache hit ({cached_answer.hits} hits) for: {cache_utterance}")
+                await stages.cancel()
+                full_response = cached_answer.text
+                audio_key = (session_voice, session_language, tone_for_sentiment(context.sentiment_slope))
+                cached_audio = response_cache.audio_for(cached_answer, audio_key)
+                await transport.send_json({"type": "start_response"})
+                if cached_audio:
+                    await transport.send_json({"type": "text_chunk", "text": full_response})
+                    for audio_bytes in cached_audio:
+                        await transport.send_audio(audio_bytes)
+                        turn_latency.mark(LatencyStage.FIRST_AUDIO_SENT)
+                else:
+                    # First hit in this voice/tone: synthesize once and keep it with the answer
+                    spoken_audio: List[bytes] = []
+                    await send_with_tts(transport, full_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency, audio_sink=spoken_audio)
+                    response_cache.add_audio(cached_answer, audio_key, spoken_audio)
+                await monitoring_service.broadcast_event(session_id, "transcription", {
+                    "text": full_response,
+                    "role": "assistant"
+                })
+                response_sent = True
+                use_response_cache = False
+
             # PEAK AGENTIC FEATURE: Knowledge Retrieval (RAG)
             knowledge_context = ""
-            knowledge_service = KnowledgeService(db)
-            relevant_chunks = await knowledge_service.query_knowledge(agent.id, user_input, limit=2)
+            relevant_chunks = None
+            if not cached_answer:
+                relevant_chunks = await stages.result("knowledge")
+                if agent.id != routing_agent.id:
+                    relevant_chunks = await retrieve_knowledge(agent.id)
             
             if relevant_chunks:
                 logger.info(f"RAG: Found {len(relevant_chunks)} relevant knowledge chunks.")
-                knowledge_context = "\n\nUSE THESE FACTS FROM YOUR KNOWLEDGE BASE IF RELEVANT:\n" + \
-                                    "\n".join([f"- {c['content']}" for c in relevant_chunks])
-                await websocket.send_json({"type": "knowledge_hit", "count": len(relevant_chunks)})
+                knowledge_context = knowledge_context_for(relevant_chunks)
+                await transport.send_json({"type": "knowledge_hit", "count": len(relevant_chunks)})
 
             # 5. Response Generation (AI or Whisper)
-            full_response = ""
-            response_sent = False
+            cacheable_response = None  # Set only by the plain streamed LLM path
             LATENCY_BUDGET = 2.5 # Max seconds for reasoning path before we degrade UX
             
             # CASE B: WHISPER MODE
@@ -1030,6 +1327,8 @@ async def websocket_endpoint(
                 # Generate a quick suggestion (non-streaming for speed)
                 suggestion_prompt = f"{active_persona}{knowledge_context}\n\nSUGGESTION MODE: Provide a concise response for the supervisor to use."
                 suggestion = await llm_service.generate_response(user_input, suggestion_prompt, context.history)
+                turn_latency.mark(LatencyStage.LLM_FIRST_TOKEN)
+                turn_latency.mark(LatencyStage.LLM_COMPLETE)
                 
                 # Broadcast suggestion to supervisor console
                 await monitoring_service.broadcast_event(session_id, "whisper_suggestion", {
@@ -1046,8 +1345,8 @@ async def websocket_endpoint(
             
             # NORMAL AI RESPONSE
             if not full_response:
-                system_prompt = f"{active_persona}{knowledge_context}\n\nIMPORTANT: Respond only in {session_language}."
-                await websocket.send_json({"type": "start_response"})
+                system_prompt = response_system_prompt(knowledge_context)
+                await transport.send_json({"type": "start_response"})
                 
                 # elite cost awareness
                 if token_count > (agent.token_limit or 50000):
@@ -1059,7 +1358,7 @@ async def websocket_endpoint(
                     is_reasoning_path = "multi-agent" in (agent.description or "").lower() or tool_schemas is not None
                     if is_reasoning_path:
                         # Send a random filler to bridge the latency gap
-                        await voice_ux.send_filler(websocket)
+                        await voice_ux.send_filler(transport)
 
                     # Enforce Latency Budget per Step
                     # Check for LangGraph (Complex Reasoning Path)
@@ -1069,6 +1368,8 @@ async def websocket_endpoint(
                             lg_orchestrator.get_response(user_input, context.history),
                             timeout=LATENCY_BUDGET
                         )
+                        turn_latency.mark(LatencyStage.LLM_FIRST_TOKEN)
+                        turn_latency.mark(LatencyStage.LLM_COMPLETE)
                     
                     # Strategic Tool Planning (Elite Feature)
                     elif tool_schemas and hasattr(llm_service, 'generate_with_tools'):
@@ -1078,7 +1379,7 @@ async def websocket_endpoint(
                         
                         if plan_statement:
                             # Step 2 of 'agents.md': Explain the plan to the user immediately
-                            await send_with_tts(websocket, plan_statement, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
+                            await send_with_tts(transport, plan_statement, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
                             logger.info(f"Speaking Plan: {plan_statement}")
                         
                         # If planner didn't find tools, fallback to standard tool generation
@@ -1087,6 +1388,9 @@ async def websocket_endpoint(
                                 llm_service.generate_with_tools(user_input, system_prompt, context.history, tools=tool_schemas),
                                 timeout=LATENCY_BUDGET
                             )
+                            if not tool_calls:
+                                turn_latency.mark(LatencyStage.LLM_FIRST_TOKEN)
+                                turn_latency.mark(LatencyStage.LLM_COMPLETE)
                         
                         if tool_calls:
                             if orchestrator.policy_engine:
@@ -1094,8 +1398,8 @@ async def websocket_endpoint(
                             
                             tool_results = []
                             for tc in tool_calls:
-                                await websocket.send_json({"type": "tool_call", "arguments": tc["arguments"]})
-                                result = await execute_tool(tc["name"], tc["arguments"], db, agent_id, session_id)
+                                await transport.send_json({"type": "tool_call", "arguments": tc["arguments"]})
+                                result = await execute_tool(tc["name"], tc["arguments"], agent_id, session_id)
                                 tool_results.append({"tool": tc["name"], "result": result})
                             
                             if orchestrator.policy_engine:
@@ -1103,9 +1407,10 @@ async def websocket_endpoint(
                             
                             tool_context = "\n".join([f"[Tool: {tr['tool']}] Result: {tr['result']}" for tr in tool_results])
                             full_response = await stream_response_with_tts(
-                                websocket,
+                                transport,
                                 llm_service.generate_stream(f"Based on: {tool_context}", system_prompt, context.history),
-                                session_id, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope
+                                session_id, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency,
+                                segmenter_settings=segmenter_settings
                             )
                             response_sent = True
                         else:
@@ -1113,17 +1418,24 @@ async def websocket_endpoint(
                     
                     # Default Stream
                     else:
+                        streamed_audio: List[bytes] = []
+                        llm_stream = speculation.claim(system_prompt) if speculation and speculation.key == speculation_key() else None
+                        if llm_stream:
+                            logger.info(f"Committing speculative response ({speculation.head_start_ms:.0f} ms head start)")
                         full_response = await stream_response_with_tts(
-                            websocket,
-                            llm_service.generate_stream(user_input, system_prompt, context.history),
-                            session_id, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope
+                            transport,
+                            llm_stream or llm_service.generate_stream(user_input, system_prompt, context.history),
+                            session_id, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency,
+                            audio_sink=streamed_audio if use_response_cache else None,
+                            segmenter_settings=segmenter_settings
                         )
                         response_sent = True
+                        cacheable_response = full_response if use_response_cache else None
                         
                 except asyncio.TimeoutError:
                     logger.warning(f"LATENCY BUDGET EXCEEDED ({LATENCY_BUDGET}s). Entering Degradation Mode.")
                     full_response = "I'm looking into that for you. One moment please..."
-                    await send_with_tts(websocket, full_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
+                    await send_with_tts(transport, full_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
                     response_sent = True
 
             # 6. Policy Engine: Output Guard
@@ -1134,14 +1446,16 @@ async def websocket_endpoint(
                 state_config = session_policy.states.get(context.current_state)
                 if state_config and state_config.is_sensitive:
                     logger.info(f"Inline Compliance Audit triggered for sensitive state: {context.current_state}")
-                    rules = get_baseline_rules(db=db, organization_id=org_id) # In prod, fetch org-specific rules
-                    audit_result = await compliance_validator.validate_turn(user_input, validated_text, rules, turn_count)
+                    with turn_latency.measure(LatencyStage.COMPLIANCE):
+                        async with database.async_session_scope() as db:
+                            rules = await get_baseline_rules(db=db, organization_id=org_id) # In prod, fetch org-specific rules
+                        audit_result = await compliance_validator.validate_turn(user_input, validated_text, rules, turn_count)
                     
                     if not audit_result.is_compliant:
                         logger.warning(f"CRITICAL COMPLIANCE VIOLATION in sensitive state: {audit_result.risk_score}")
                         validated_text = "I'm sorry, I cannot fulfill that request due to regulatory constraints."
                         if any(v.severity == "critical" for v in audit_result.violations):
-                            await websocket.send_json({"type": "compliance_alert", "risk_score": audit_result.risk_score})
+                            await transport.send_json({"type": "compliance_alert", "risk_score": audit_result.risk_score})
                 
                 full_response = validated_text
 
@@ -1152,15 +1466,27 @@ async def websocket_endpoint(
                 full_response = await orchestrator.reflect_and_correct(
                     user_input, full_response, context, agent, llm_service
                 )
-                await send_with_tts(websocket, full_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
+                await send_with_tts(transport, full_response, language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
 
             # 8. Escalation & History
             should_escalate, reason = orchestrator.should_escalate(context, full_response, agent)
             if should_escalate:
                 await session_manager.escalate_session(session_id, reason)
-                await send_with_tts(websocket, "One moment, transferring you to a specialist.", language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope)
+                await send_with_tts(transport, "One moment, transferring you to a specialist.", language=session_language, voice=session_voice, sentiment_score=context.sentiment_slope, latency=turn_latency)
                 return "ESCALATED"
             
+            # Keep the answer for repeats only if the output guard left it untouched
+            if cacheable_response and cacheable_response == full_response:
+                try:
+                    cache_entry = response_cache.store(
+                        cache_scope, cache_utterance, cache_embedding, full_response, response_cache_settings
+                    )
+                    response_cache.add_audio(
+                        cache_entry, (session_voice, session_language, tone_for_sentiment(context.sentiment_slope)), streamed_audio
+                    )
+                except Exception as e:
+                    logger.warning(f"Response cache store failed: {e}")
+
             await session_manager.add_to_history(session_id, "user", user_input)
             await session_manager.add_to_history(session_id, "assistant", full_response)
             context.history.append({"role": "user", "content": user_input})
@@ -1176,17 +1502,21 @@ async def websocket_endpoint(
             
             # 9. Compliance & Audit (Shadow Audit)
             # Use Background task to not block the voice turn
-            async def run_compliance_audit():
+            # Queued audits may start after later turns: everything turn-specific is bound at submit time
+            async def run_compliance_audit(turn_latency: TurnLatency, turn_index: int, state_name: str):
                 # Get rules for current state or agent
-                rules = get_baseline_rules(db=db, organization_id=org_id) # Fetch baseline plus optional agent-specific rules
-                audit_result = await compliance_validator.validate_turn(
-                    user_input, full_response, rules, turn_count
-                )
+                with turn_latency.measure(LatencyStage.COMPLIANCE):
+                    async with database.async_session_scope() as audit_db:
+                        rules = await get_baseline_rules(db=audit_db, organization_id=org_id) # Fetch baseline plus optional agent-specific rules
+                    # The LLM audit runs without a connection checked out
+                    audit_result = await compliance_validator.validate_turn(
+                        user_input, full_response, rules, turn_index
+                    )
                 
                 # Save Audit Log
                 audit_log = AuditLog(
                     session_id=session_id,
-                    turn_index=turn_count,
+                    turn_index=turn_index,
                     user_message=redactor.redact_text(user_input),
                     ai_response=redactor.redact_text(full_response),
                     is_compliant=audit_result.is_compliant,
@@ -1194,10 +1524,11 @@ async def websocket_endpoint(
                     risk_score=audit_result.risk_score,
                     agent_id=agent_id,
                     organization_id=org_id,
-                    state_name=context.current_state
+                    state_name=state_name
                 )
-                db.add(audit_log)
-                db.commit()
+                async with database.async_session_scope() as audit_db:
+                    audit_db.add(audit_log)
+                    await audit_db.commit()
                 
                 # If critical violation, notify monitoring/supervisor
                 if not audit_result.is_compliant:
@@ -1206,32 +1537,53 @@ async def websocket_endpoint(
                         "violations": [v.rule_name for v in audit_result.violations]
                     })
 
-            asyncio.create_task(run_compliance_audit())
+            task_supervisor.submit(
+                COMPLIANCE_AUDIT,
+                partial(run_compliance_audit, turn_latency, turn_count, context.current_state),
+                group=session_id,
+                name=f"{session_id}:{turn_count}",
+            )
 
             # 10. Shadow Comparison (Elite Feature)
             # Compare with a cheaper model (Llama-3-8b via Groq)
-            asyncio.create_task(shadow_service.compare_turn(
+            task_supervisor.submit(SHADOW_COMPARISON, partial(
+                shadow_service.compare_turn,
                 session_id=session_id,
                 turn_index=turn_count,
                 user_input=user_input,
                 system_prompt=active_persona,
-                history=context.history,
+                history=list(context.history),
                 primary_response=full_response,
                 primary_model_name="groq-llama-3-3-70b", # Corrected name
                 primary_latency=latency,
                 organization_id=org_id,
                 tools=tool_schemas if 'is_reasoning_path' in locals() and is_reasoning_path else None
-            ))
+            ), group=session_id, name=f"{session_id}:{turn_count}")
             
-            await websocket.send_json({"type": "end_response"})
+            await transport.send_json({"type": "end_response"})
             logger.info(f"Turn {turn_count} complete. Latency: {latency:.2f}ms. Compliance: {len(latencies)}")
 
         except asyncio.CancelledError:
             logger.info("Response generation cancelled (Barge-In)")
+            if turn_latency:
+                turn_latency.cancelled = True
             raise
         except Exception as e:
             logger.error(f"Error in turn: {e}")
-            await websocket.send_json({"type": "error", "message": str(e)})
+            await transport.send_json({"type": "error", "message": str(e)})
+        finally:
+            if stages:
+                # Barge-in / early exit: stop any pre-LLM lookup still in flight
+                await stages.cancel()
+            if speculator:
+                speculator.release(speculation)
+            if turn_latency:
+                turn_latency.finish()
+                if not turn_latency.cancelled:
+                    # Per-stage breakdown for the supervisor dashboard
+                    task_supervisor.submit(MONITORING_EVENT, partial(
+                        monitoring_service.broadcast_event, session_id, "turn_latency", turn_latency.to_dict()
+                    ), group=session_id)
 
     try:
         # 0. Silence Detection Loop
@@ -1245,7 +1597,7 @@ async def websocket_endpoint(
                 # Handle Silence
                 logger.info(f"Silence detected in session {session_id}")
                 nudge_text = "Are you still there? I'm here to help if you have any more questions."
-                await send_with_tts(websocket, nudge_text, language=session_language, voice=session_voice)
+                await send_with_tts(transport, nudge_text, language=session_language, voice=session_voice)
                 # If it happens again, we might want to end the call, for now just nudge once per 30s
                 continue
 
@@ -1256,18 +1608,54 @@ async def websocket_endpoint(
                 if current_response_task and not current_response_task.done():
                     current_response_task.cancel()
                     logger.info("Interrupting current response task")
+                await transport.interrupt()
                 continue
                 
             user_input = ""
-            if "audio" in message:
+            transcription: Optional[TranscriptionResult] = None
+            if message.get("type") == "transcript":
+                # Final hypothesis from the streaming recognizer
+                user_input = message["text"]
+                transcription = message.get("transcription")
+            elif transcriber and ("audio" in message or "audio_bytes" in message or message.get("type") == "end_of_utterance"):
                 try:
-                    audio_data = base64.b64decode(message["audio"])
-                    # Use webm if capturing from browser
-                    user_input = await stt_service.transcribe(
+                    if "audio_bytes" in message:
+                        audio_data = message["audio_bytes"]
+                    elif "audio" in message:
+                        audio_data = base64.b64decode(message["audio"])
+                    else:
+                        audio_data = b""
+                    if audio_data:
+                        if caller_audio is None:
+                            caller_audio = AudioRingBuffer.for_mimetype(message.get("mimetype"), settings.CALLER_AUDIO_BUFFER_SECONDS)
+                        if caller_audio is not None:
+                            audio_data = caller_audio.write(audio_data)
+                    await transcriber.push(
+                        audio_data,
+                        mimetype=message.get("mimetype"),
+                        end_of_utterance=bool(message.get("final")) or message.get("type") == "end_of_utterance",
+                    )
+                    if audio_data and vad_settings.enabled:
+                        await handle_vad_events(audio_data, message.get("mimetype"))
+                except Exception as e:
+                    logger.error(f"STT Error: {e}")
+                continue
+            elif "audio" in message or "audio_bytes" in message:
+                try:
+                    if "audio_bytes" in message:
+                        # Binary frame: raw audio, no base64 round-trip
+                        audio_data = bytes(message["audio_bytes"])
+                        mimetype = message.get("mimetype") or "audio/webm"
+                    else:
+                        audio_data = base64.b64decode(message["audio"])
+                        # Use webm if capturing from browser
+                        mimetype = "audio/webm"
+                    transcription = await stt_service.transcribe(
                         audio_data, 
                         language=session_language,
-                        mimetype="audio/webm"
+                        mimetype=mimetype
                     )
+                    user_input = transcription.text
                 except Exception as e:
                     logger.error(f"STT Error: {e}")
                     continue
@@ -1278,65 +1666,87 @@ async def websocket_endpoint(
                 # Barge-in: Cancel any active response
                 if current_response_task and not current_response_task.done():
                     current_response_task.cancel()
+                    await transport.interrupt()
                 
                 # Start new response
-                current_response_task = asyncio.create_task(process_turn(user_input))
+                current_response_task = asyncio.create_task(process_turn(user_input, transcription))
 
     except Exception as e:
         logger.error(f"Orchestrator Loop Error: {e}")
     finally:
         reader_task.cancel()
         hitl_task.cancel()
+        if transcriber:
+            # Utterances recognized after the caller left get no turn, but belong in the call transcript
+            late_finals = []
+            while not input_queue.empty():
+                message = input_queue.get_nowait()
+                if message.get("type") == "transcript":
+                    late_finals.append(message["text"])
+            late_finals += [hypothesis.text for hypothesis in await transcriber.close()]
+            context.history.extend({"role": "user", "content": text} for text in late_finals)
+        if caller_audio is not None:
+            logger.info(f"Session {session_id} caller audio buffer: {caller_audio.stats()}")
+        if speculator:
+            speculator.cancel()
+            logger.info(f"Session {session_id} speculation: {speculator.metrics.to_dict()}")
         if current_response_task and not current_response_task.done():
             current_response_task.cancel()
+        # UX warm-up is useless once the caller is gone; audits and shadow comparisons still complete
+        task_supervisor.cancel_group(session_id, kinds=[VOICE_UX_PRECOMPUTE])
             
         # Cleanup & Logging (same as before)
         try:
             avg_lat = sum(latencies)/len(latencies) if latencies else 0
             duration = (datetime.utcnow() - session_start_dt).total_seconds()
-            await analytics_service.log_call_completion({
-                "session_id": session_id,
-                "agent_id": agent_id,
-                "caller_id": None,
-                "start_time": session_start_dt,
-                "duration": duration,
-                "avg_latency": avg_lat,
-                "turns": turn_count,
-                "tokens": token_count,
-                "org_id": org_id,
-                "status": "completed",
-                "transcript": context.history
-            }, agent=agent)
+            async with database.async_session_scope() as db:
+                await AnalyticsService(db).log_call_completion({
+                    "session_id": session_id,
+                    "agent_id": agent_id,
+                    "caller_id": None,
+                    "start_time": session_start_dt,
+                    "duration": duration,
+                    "avg_latency": avg_lat,
+                    "ttfap": call_latency.avg_ttfa_ms(),
+                    "turns": turn_count,
+                    "tokens": token_count,
+                    "org_id": org_id,
+                    "status": "completed",
+                    "transcript": context.history,
+                    "metadata": {"latency": call_latency.summary()}
+                }, agent=agent)
             
             # Post-Call Memory Governance
             if caller_id:
-                # 1. Summarize
-                await memory_service.summarize_conversation(
-                    session_id=session_id,
-                    user_id=caller_id,
-                    agent_id=agent_id,
-                    conversation=context.history,
-                    outcome=agent.success_criteria[0] if agent.success_criteria else "unknown",
-                    llm_service=llm_service,
-                    organization_id=org_id
-                )
-                # 2. Extract specific fact memories
-                await memory_service.memorize_from_conversation(
-                    user_id=caller_id,
-                    conversation=context.history,
-                    agent_id=agent_id,
-                    session_id=session_id,
-                    llm_service=llm_service,
-                    organization_id=org_id
-                )
+                async with database.async_session_scope() as db:
+                    memory_service = get_memory_service(db)
+                    # 1. Summarize
+                    await memory_service.summarize_conversation(
+                        session_id=session_id,
+                        user_id=caller_id,
+                        agent_id=agent_id,
+                        conversation=context.history,
+                        outcome=agent.success_criteria[0] if agent.success_criteria else "unknown",
+                        llm_service=llm_service,
+                        organization_id=org_id
+                    )
+                    # 2. Extract specific fact memories
+                    await memory_service.memorize_from_conversation(
+                        user_id=caller_id,
+                        conversation=context.history,
+                        agent_id=agent_id,
+                        session_id=session_id,
+                        llm_service=llm_service,
+                        organization_id=org_id
+                    )
 
             await session_manager.end_session(session_id, "client_disconnect")
         except Exception as e:
             logger.error(f"Cleanup Error: {e}")
 @router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest, db: Session = Depends(database.get_db)):
+async def chat_endpoint(request: ChatRequest, db: AsyncSession = Depends(database.get_async_db)):
     """Experimental: Stateless/REST Chat connector for Text Agents."""
-    agent = db.query(models.Agent).filter(models.Agent.id == request.agent_id).first()
+    agent = await db.get(models.Agent, request.agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
@@ -1345,7 +1755,7 @@ async def chat_endpoint(request: ChatRequest, db: Session = Depends(database.get
     
     # Initialize basic services
     memory_service = get_memory_service(db)
-    orchestrator = AgentOrchestrator(db, policy=get_sample_policy()) # Simple for now
+    orchestrator = AgentOrchestrator(policy=get_sample_policy()) # Simple for now
     llm_service = EnterpriseLLM()
     
     # 1. Update Session / History
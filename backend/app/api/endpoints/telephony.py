@@ -6,24 +6,27 @@ from urllib.parse import urlencode
 
 from fastapi import APIRouter, Depends, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.websockets import WebSocketState
 from twilio.twiml.voice_response import VoiceResponse
 from loguru import logger
 
-from app.api.endpoints.orchestrator import execute_tool, _run_ultravox_compliance_audit
+from app.api.endpoints.orchestrator import execute_tool, run_voice_session, _run_ultravox_compliance_audit
 from app.core import database
 from app.core.config import settings
 from app.models import agent as models
 from app.orchestration.session_manager import session_manager
+from app.services.audio.twilio_transport import TwilioMediaTransport
+from app.services.stt.streaming import STT_MODE_STREAMING
 from app.services.monitoring_service import monitoring_service
+from app.services.agent_config_cache import agent_config_cache
 from app.services.telephony_service import telephony_service
 from app.services.tools.registry import AVAILABLE_TOOLS
 from app.services.ultravox_service import UltravoxService
 
 import json
 import os
-import random
 import uuid
 
 router = APIRouter()
@@ -144,34 +147,12 @@ def _build_ultravox_selected_tools(
     return selected_tools
 
 
-def _resolve_active_agent_configuration(db: Session, agent: models.Agent) -> Dict[str, Any]:
-    active_persona = agent.persona
-    active_tools = agent.tools or []
-
-    versions = db.query(models.AgentVersion).filter(
-        models.AgentVersion.agent_id == agent.id,
-        models.AgentVersion.weight > 0,
-    ).all()
-    if versions:
-        total_weight = sum(v.weight for v in versions)
-        if total_weight > 0:
-            rand_val = random.randint(1, 100)
-            cumulative = 0
-            for version in versions:
-                cumulative += version.weight
-                if rand_val <= cumulative:
-                    active_persona = version.persona
-                    active_tools = version.tools
-                    break
-    elif agent.active_version_id:
-        pinned_version = db.query(models.AgentVersion).filter(
-            models.AgentVersion.id == agent.active_version_id
-        ).first()
-        if pinned_version:
-            active_persona = pinned_version.persona
-            active_tools = pinned_version.tools
-
-    return {"persona": active_persona, "tools": active_tools}
+async def _resolve_active_agent_configuration(db: AsyncSession, agent: models.Agent) -> Dict[str, Any]:
+    resolved = await agent_config_cache.resolve(db, agent.id)
+    if not resolved:
+        return {"persona": agent.persona, "tools": agent.tools or []}
+    _, agent_config = resolved
+    return {"persona": agent_config.persona, "tools": agent_config.tools}
 
 
 def _build_data_connection_url(token: str) -> str:
@@ -180,7 +161,7 @@ def _build_data_connection_url(token: str) -> str:
 
 
 async def _create_ultravox_twilio_call(
-    db: Session,
+    db: AsyncSession,
     agent: models.Agent,
     call_direction: str,
     caller_id: Optional[str],
@@ -189,7 +170,7 @@ async def _create_ultravox_twilio_call(
     outgoing_to: Optional[str] = None,
     outgoing_from: Optional[str] = None,
 ) -> Dict[str, Any]:
-    active_config = _resolve_active_agent_configuration(db, agent)
+    active_config = await _resolve_active_agent_configuration(db, agent)
     session_language = agent.language or "en-US"
     token = str(uuid.uuid4())
     org_id = agent.organization_id
@@ -286,7 +267,7 @@ async def _create_ultravox_twilio_call(
 
 async def _handle_inbound_voice_webhook(
     request: Request,
-    db: Session,
+    db: AsyncSession,
     agent_id: Optional[str],
 ) -> Response:
     form_data = await request.form()
@@ -295,12 +276,12 @@ async def _handle_inbound_voice_webhook(
     caller_id = form_data.get("From")
 
     if agent_id:
-        agent = db.query(models.Agent).filter(
+        agent = await db.scalar(select(models.Agent).filter(
             models.Agent.id == agent_id,
             models.Agent.is_active.is_(True),
-        ).first()
+        ).limit(1))
     else:
-        agent = db.query(models.Agent).filter(models.Agent.is_active.is_(True)).first()
+        agent = await db.scalar(select(models.Agent).filter(models.Agent.is_active.is_(True)).limit(1))
 
     if not agent:
         logger.error("No active agent found for inbound Twilio call")
@@ -336,6 +317,7 @@ async def _handle_inbound_voice_webhook(
     fallback_twiml = telephony_service.generate_twiml_stream(
         stream_url=legacy_stream_url,
         welcome_message=f"Hello, I am {agent.name}. How can I help you today?",
+        parameters={"caller_id": caller_id},
     )
     return Response(content=fallback_twiml, media_type="application/xml")
 
@@ -344,7 +326,7 @@ async def _handle_inbound_voice_webhook(
 async def twilio_voice_webhook(
     request: Request,
     agent_id: Optional[str] = Query(default=None),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Inbound Twilio voice webhook (optionally scoped by query param agent_id)."""
     return await _handle_inbound_voice_webhook(request, db, agent_id)
@@ -354,17 +336,14 @@ async def twilio_voice_webhook(
 async def twilio_voice_webhook_for_agent(
     agent_id: str,
     request: Request,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Inbound Twilio voice webhook scoped by path agent_id."""
     return await _handle_inbound_voice_webhook(request, db, agent_id)
 
 
 @router.websocket("/ultravox-data")
-async def ultravox_data_connection(
-    websocket: WebSocket,
-    db: Session = Depends(database.get_db),
-):
+async def ultravox_data_connection(websocket: WebSocket):
     """
     Data connection websocket consumed by Ultravox during Twilio calls.
     Handles tool execution and relays monitoring/compliance hooks.
@@ -436,7 +415,6 @@ async def ultravox_data_connection(
                             turn_count += 1
                             try:
                                 await _run_ultravox_compliance_audit(
-                                    db=db,
                                     session_id=session_id,
                                     agent_id=agent_id,
                                     organization_id=org_id,
@@ -498,7 +476,6 @@ async def ultravox_data_connection(
                     result = await execute_tool(
                         tool_name=tool_name,
                         arguments=tool_arguments,
-                        db=db,
                         agent_id=agent_id,
                         session_id=session_id,
                     )
@@ -586,40 +563,38 @@ async def ultravox_data_connection(
 async def twilio_media_stream(
     websocket: WebSocket,
     agent_id: str,
-    db: Session = Depends(database.get_db),
 ):
     """
-    Legacy Twilio media stream endpoint (non-Ultravox fallback path).
+    Twilio media stream on the native pipeline (non-Ultravox fallback path):
+    μ-law caller audio -> jitter buffer -> server VAD + streaming STT -> the
+    orchestrator turn engine -> TTS as paced 20 ms μ-law frames.
     """
     await websocket.accept()
     logger.info(f"Legacy Twilio media stream connected for agent {agent_id}")
 
-    agent = db.query(models.Agent).filter(models.Agent.id == agent_id).first()
-    if not agent:
-        await websocket.close(code=4004, reason="Agent not found")
-        return
-
-    stream_sid = None
+    transport = TwilioMediaTransport(
+        websocket,
+        playout_lead_ms=settings.TWILIO_PLAYOUT_LEAD_MS,
+        jitter_depth=settings.TWILIO_JITTER_BUFFER_FRAMES,
+    )
     try:
-        while True:
-            message = await websocket.receive_text()
-            data = json.loads(message)
-
-            if data.get("event") == "start":
-                stream_sid = data.get("start", {}).get("streamSid")
-                logger.info(f"Legacy Twilio stream started: {stream_sid}")
-                continue
-
-            if data.get("event") == "stop":
-                logger.info(f"Legacy Twilio stream stopped: {stream_sid}")
-                break
+        await transport.wait_for_start()
+        await run_voice_session(
+            transport,
+            agent_id,
+            caller_id=transport.parameters.get("caller_id"),
+            stt=STT_MODE_STREAMING,
+            channel="twilio",
+            allow_ultravox=False,  # This endpoint is the fallback when Ultravox is off or failing
+        )
     except WebSocketDisconnect:
         logger.info("Legacy Twilio media stream disconnected")
     except Exception as exc:
         logger.error(f"Legacy Twilio stream error: {exc}")
     finally:
+        transport.stop()
         if websocket.client_state != WebSocketState.DISCONNECTED:
-            await websocket.close()
+            await transport.close()
 
 
 @router.post("/outbound")
@@ -627,10 +602,10 @@ async def make_outbound_call(
     to_number: str,
     agent_id: str,
     from_number: Optional[str] = None,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Trigger an outbound call through Ultravox Twilio medium or legacy Twilio fallback."""
-    agent = db.query(models.Agent).filter(models.Agent.id == agent_id).first()
+    agent = await db.get(models.Agent, agent_id)
     if not agent:
         return {"status": "error", "error": "Agent not found"}
 
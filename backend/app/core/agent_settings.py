@@ -0,0 +1,75 @@
+"""
+Typed per-agent tuning read from `agent.config` (free-form JSON).
+
+Settings dataclasses declare their fields with `setting(default, minimum, maximum)`
+and read their section with `from_agent_config()`. A bad value never breaks
+call setup: keys that cannot be parsed are logged and keep their default,
+out-of-range numbers are clamped, unknown keys are ignored.
+"""
+import math
+from dataclasses import MISSING, field, fields
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+
+def setting(default: Any, minimum: Optional[float] = None, maximum: Optional[float] = None):
+    """Dataclass field with optional bounds for numeric values."""
+    return field(default=default, metadata={"minimum": minimum, "maximum": maximum})
+
+
+def _parse(value: Any, kind: type) -> Any:
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+        raise ValueError("expected a boolean")
+    if value is None or isinstance(value, bool):
+        raise ValueError("expected a number")
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError("expected a finite number")
+    if kind is int:
+        if number != int(number):
+            raise ValueError("expected a whole number")
+        return int(number)
+    return number
+
+
+def from_agent_config(cls: Type[T], config: Optional[Dict[str, Any]], section: str) -> T:
+    """Build `cls` from `config[section]`, keeping the default for every invalid key."""
+    overrides = (config or {}).get(section) or {}
+    if not isinstance(overrides, dict):
+        logger.warning(f"Ignoring agent config '{section}': expected an object, got {type(overrides).__name__}")
+        return cls()
+
+    values = {}
+    for f in fields(cls):
+        if f.name not in overrides:
+            continue
+        default = f.default if f.default is not MISSING else None
+        raw = overrides[f.name]
+        try:
+            value = _parse(raw, type(default))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring agent config {section}.{f.name}={raw!r}: {e}")
+            continue
+        minimum, maximum = f.metadata.get("minimum"), f.metadata.get("maximum")
+        clamped = value
+        if minimum is not None and clamped < minimum:
+            clamped = type(value)(minimum)
+        if maximum is not None and clamped > maximum:
+            clamped = type(value)(maximum)
+        if clamped != value:
+            logger.warning(f"Agent config {section}.{f.name}={raw!r} out of range, using {clamped}")
+        values[f.name] = clamped
+    return cls(**values)
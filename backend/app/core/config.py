@@ -36,6 +36,69 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_PHONE_NUMBER: Optional[str] = None
     SERVER_HOST: str = "localhost:8001"
+    TWILIO_PLAYOUT_LEAD_MS: int = 100  # Native media stream: audio sent ahead of the caller's playback
+    TWILIO_JITTER_BUFFER_FRAMES: int = 3  # 20 ms frames held back before a missing one is concealed
+
+    # Voice pipeline
+    TTS_PIPELINE_MAX_PENDING: int = 3  # Segments queued ahead of the audio sender
+    TTS_PIPELINE_SYNTHESIS_CONCURRENCY: int = 2  # Parallel TTS requests per response
+    TTS_STREAMING_ENABLED: bool = True  # Forward audio chunks as the provider produces them
+    AGENT_CONFIG_CACHE_TTL_SECONDS: int = 60  # Resolved agent/version config reuse across calls
+
+    # Streaming STT (clients opt in with ?stt=streaming)
+    STT_PROVIDER: str = "auto"  # Server-side recognizer: "deepgram", "mock", or "auto" (Deepgram when DEEPGRAM_API_KEY is set)
+    STT_DEEPGRAM_MODEL: str = "nova-2"
+    STT_ENDPOINTING_MS: int = 300  # Silence that ends an utterance on the provider side
+    STT_KEEPALIVE_SECONDS: float = 5.0  # Keeps the live stream open while the caller only listens
+    CALLER_AUDIO_BUFFER_SECONDS: float = 10.0  # Raw caller audio kept per session (VAD frames, re-recognition)
+    STT_RERECOGNIZE_UNRELIABLE: bool = True  # Batch pass over the buffered utterance before asking the caller to repeat
+    STT_MIN_CONFIDENCE: float = 0.5  # Utterances scored below this get a scripted "please repeat" instead of an LLM turn
+    STT_MIN_WORD_CONFIDENCE: float = 0.4  # ... as do utterances where most words score below this
+
+    # TTS HTTP clients (one keep-alive pool per TTS endpoint, per worker)
+    QWEN_TTS_BASE_URL: str = "http://127.0.0.1:8008"
+    TTS_HTTP2: bool = True  # Used when the h2 package is installed and the server supports it
+    TTS_HTTP_MAX_CONNECTIONS: int = 20
+    TTS_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    TTS_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    TTS_HTTP_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    TTS_HTTP_READ_TIMEOUT_SECONDS: float = 15.0
+    TTS_HTTP_POOL_TIMEOUT_SECONDS: float = 2.0  # Wait for a free pooled connection
+    TTS_HTTP_WARM_CONNECTIONS: int = 2  # Opened per endpoint at startup
+
+    # TTS audio cache (content-addressed; memory per worker, disk shared by the host)
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_MEMORY_MB: int = 64
+    TTS_CACHE_DIR: str = "/var/cache/openvoice/tts"  # Empty disables the disk tier
+    TTS_CACHE_DISK_MB: int = 2048
+    TTS_SINGLE_FLIGHT_ENABLED: bool = True  # Identical concurrent syntheses share one upstream call
+
+    # TTS scheduling: concurrent upstream requests per provider, per worker
+    TTS_QWEN_MAX_CONCURRENCY: int = 4  # Single GPU host
+    TTS_DEEPGRAM_MAX_CONCURRENCY: int = 16
+    TTS_DEFAULT_MAX_CONCURRENCY: int = 8
+    TTS_QUEUE_DEADLINE_MS: int = 4000  # Turn audio still waiting for a slot after this is dropped
+
+    # Voice UX clips (backchannels/fillers), shared by all sessions of a worker
+    VOICE_UX_WARM_VOICES: str = "auto"  # Comma-separated voices synthesized at startup
+    VOICE_UX_CLIP_MAX_VOICES: int = 64
+
+    # Semantic response cache (opt-in per agent via agent.config["response_cache"])
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_MAX_AUDIO_MB: int = 256  # Pre-synthesized answer audio kept per worker
+    RESPONSE_CACHE_TTL_SECONDS: int = 86400
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.92  # Cosine similarity of utterance embeddings
+    RESPONSE_CACHE_MIN_WORDS: int = 3  # Shorter turns depend on conversation history
+
+    # Background side work (audits, shadow comparisons, UX warm-up), per worker
+    BACKGROUND_TASK_MAX_CONCURRENCY: int = 12  # Across all kinds; per-kind limits live in task_supervisor
+    BACKGROUND_DRAIN_TIMEOUT_SECONDS: int = 20  # Grace period at shutdown before pending work is cancelled
+
+    # Database pool (per engine, per worker)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 10  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,12 +1,74 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from pgvector.asyncpg import register_vector
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Sync engine: admin/CRUD endpoints (run in FastAPI's threadpool), Alembic, scripts
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: realtime voice path (websocket/telephony handlers and the services they call).
+# Queries here never block the event loop that carries every live call's audio.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _register_pgvector(dbapi_connection, connection_record):
+    # asyncpg needs an explicit codec for the pgvector `vector` type
+    dbapi_connection.run_async(register_vector)
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's pool (current occupancy comes from the pool itself)."""
+
+    def __init__(self, sync_engine: Engine):
+        self.pool = sync_engine.pool
+        self.checkouts = 0
+        self.peak_checked_out = 0
+        event.listen(sync_engine, "checkout", self._on_checkout)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.pool.checkedout())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": self.pool.checkedout(),
+            "checked_in": self.pool.checkedin(),
+            "overflow": self.pool.overflow(),
+            "peak_checked_out": self.peak_checked_out,
+            "total_checkouts": self.checkouts,
+        }
+
+
+sync_pool_metrics = PoolMetrics(engine)
+async_pool_metrics = PoolMetrics(async_engine.sync_engine)
+
+
+def pool_status() -> Dict[str, Any]:
+    """Pool usage of both engines, for the monitoring API."""
+    return {"async": async_pool_metrics.snapshot(), "sync": sync_pool_metrics.snapshot()}
+
+
 Base = declarative_base()
 
 def get_db():
@@ -15,3 +77,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    One unit of work on the async engine.
+    Long-lived handlers (a call can last many minutes) open a scope per lookup/write
+    instead of holding a session, so a pooled connection is only checked out while it is used.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
@@ -7,9 +7,40 @@ from dataclasses import dataclass, field
 from enum import Enum
 from loguru import logger
 from app.models.agent import Agent
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.database import AsyncSessionLocal
 from app.orchestration.policy_engine import PolicyEngine
+from app.orchestration.keyword_matcher import KeywordAutomaton, keyword_automaton_cache, tokenize
 from app.schemas.policy import ConversationPolicy
+from app.services.stt.base import TranscriptionResult
+
+
+# Keyword lists for the per-utterance checks ("*" marks a stem, see keyword_matcher)
+POSITIVE_WORDS = ["thank*", "good", "great", "excellent", "happy", "yes", "correct", "perfect"]
+NEGATIVE_WORDS = ["bad", "angry", "frustrated", "wrong", "no", "stop", "terrible", "worst", "unhappy"]
+
+INTENT_KEYWORDS = {
+    "billing": ["bill*", "payment*", "charge*", "invoice*", "refund*", "money"],
+    "technical": ["error*", "not working", "broken", "bug*", "issue*", "problem*"],
+    "sales": ["buy*", "purchase*", "pricing", "cost*", "subscribe*", "plan*"],
+    "order": ["order*", "shipping", "delivery", "tracking", "package*"],
+    "account": ["account*", "login*", "password*", "profile*", "settings"],
+}
+
+ESCALATION_KEYWORDS = [
+    "speak to a human", "transfer to agent", "manager", "supervisor",
+    "not satisfied", "complaint", "human person"
+]
+
+# Every global category in one automaton: sentiment, intent and escalation come out of a single pass
+UTTERANCE_MATCHER = KeywordAutomaton({
+    "positive": POSITIVE_WORDS,
+    "negative": NEGATIVE_WORDS,
+    **{f"intent:{intent}": keywords for intent, keywords in INTENT_KEYWORDS.items()},
+    "escalation": ESCALATION_KEYWORDS,
+})
+INTENT_CATEGORIES = [f"intent:{intent}" for intent in INTENT_KEYWORDS]
 
 
 class AgentRole(str, Enum):
@@ -45,6 +76,7 @@ class ConfidenceScores:
     policy: float = 1.0
     llm_response: float = 1.0
     overall: float = 1.0
+    transcription: Optional[TranscriptionResult] = None  # Last utterance as recognized: word scores, language, timing
 
 
 @dataclass
@@ -77,22 +109,43 @@ class AgentOrchestrator:
     Handles routing, fallback, and escalation logic.
     """
     
-    def __init__(self, db: Session, policy: Optional[ConversationPolicy] = None):
-        self.db = db
+    def __init__(self, policy: Optional[ConversationPolicy] = None, session_factory: async_sessionmaker = AsyncSessionLocal):
+        # Lives for a whole call: each lookup uses a short session instead of pinning a connection
+        self.session_factory = session_factory
         self.agent_cache: Dict[str, Agent] = {}
         self.policy_engine = PolicyEngine(policy) if policy else None
+        # Sentiment, intent and escalation look at the same utterance: tokenize and scan it once
+        self._last_scan: tuple = (None, [], {})
+
+    def _scan_utterance(self, text: str) -> tuple:
+        """(tokens, global keyword matches) of the most recent utterance."""
+        if self._last_scan[0] != text:
+            tokens = tokenize(text)
+            self._last_scan = (text, tokens, UTTERANCE_MATCHER.scan(tokens=tokens))
+        return self._last_scan[1], self._last_scan[2]
+
+    @staticmethod
+    def _agent_matcher(agent: Agent) -> KeywordAutomaton:
+        """Agent-specific phrases, compiled once per distinct list and shared across sessions."""
+        return keyword_automaton_cache.get({
+            "failure": agent.failure_conditions or [],
+            "success": agent.success_criteria or [],
+        })
     
-    def get_agent(self, agent_id: str) -> Optional[Agent]:
+    async def get_agent(self, agent_id: str) -> Optional[Agent]:
         """Get agent from cache or database."""
         if agent_id not in self.agent_cache:
-            agent = self.db.query(Agent).filter(Agent.id == agent_id).first()
+            async with self.session_factory() as db:
+                agent = await db.get(Agent, agent_id)
             if agent:
                 self.agent_cache[agent_id] = agent
         return self.agent_cache.get(agent_id)
     
-    def get_agents_by_role(self, role: str) -> List[Agent]:
+    async def get_agents_by_role(self, role: str) -> List[Agent]:
         """Get all agents with a specific role."""
-        return self.db.query(Agent).filter(Agent.role == role, Agent.is_active == True).all()
+        async with self.session_factory() as db:
+            result = await db.execute(select(Agent).filter(Agent.role == role, Agent.is_active == True))
+            return result.scalars().all()
     
     async def select_agent(
         self, 
@@ -103,7 +156,7 @@ class AgentOrchestrator:
         Select the best agent for the current context.
         May route to specialist or escalate to supervisor.
         """
-        primary = self.get_agent(primary_agent_id)
+        primary = await self.get_agent(primary_agent_id)
         
         if not primary:
             logger.error(f"Primary agent {primary_agent_id} not found")
@@ -111,28 +164,28 @@ class AgentOrchestrator:
         
         # Check if we need escalation
         if context.escalation_needed:
-            supervisor = self._find_supervisor(primary)
+            supervisor = await self._find_supervisor(primary)
             if supervisor:
                 logger.info(f"Escalating from {primary.name} to supervisor {supervisor.name}")
                 return supervisor
         
         # Check if we should route to a specialist
         if context.current_intent:
-            specialist = self._find_specialist(context.current_intent)
+            specialist = await self._find_specialist(context.current_intent)
             if specialist and specialist.id != primary.id:
                 logger.info(f"Routing to specialist {specialist.name} for intent: {context.current_intent}")
                 return specialist
         
         return primary
     
-    def _find_supervisor(self, agent: Agent) -> Optional[Agent]:
+    async def _find_supervisor(self, agent: Agent) -> Optional[Agent]:
         """Find a supervisor agent."""
-        supervisors = self.get_agents_by_role("supervisor")
+        supervisors = await self.get_agents_by_role("supervisor")
         if supervisors:
             return supervisors[0]  # Simple: return first available
         return None
     
-    def _find_specialist(self, intent: str) -> Optional[Agent]:
+    async def _find_specialist(self, intent: str) -> Optional[Agent]:
         """Find a specialist for a specific intent."""
         # Map intents to roles
         intent_role_map = {
@@ -145,19 +198,16 @@ class AgentOrchestrator:
         
         role = intent_role_map.get(intent.lower())
         if role:
-            specialists = self.get_agents_by_role(role)
+            specialists = await self.get_agents_by_role(role)
             if specialists:
                 return specialists[0]
         return None
     
     def analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment of user message (Simple Keyword based for now)."""
-        text_lower = text.lower()
-        positive_words = ["thank", "good", "great", "excellent", "happy", "yes", "correct", "perfect"]
-        negative_words = ["bad", "angry", "frustrated", "wrong", "no", "stop", "terrible", "worst", "unhappy"]
-        
-        pos_score = sum(1 for w in positive_words if w in text_lower)
-        neg_score = sum(1 for w in negative_words if w in text_lower)
+        _, matches = self._scan_utterance(text)
+        pos_score = len(matches.get("positive", []))
+        neg_score = len(matches.get("negative", []))
         
         if pos_score > neg_score: return 1.0
         if neg_score > pos_score: return 0.0
@@ -169,36 +219,32 @@ class AgentOrchestrator:
         Returns (should_escalate, reason).
         """
         # 1. Check Agent-Specific Failure Conditions (Elite Feature)
-        failure_conditions = agent.failure_conditions or []
-        last_user_msg = context.history[-1]["content"].lower() if context.history else ""
+        agent_matcher = self._agent_matcher(agent)
+        last_user_msg = context.history[-1]["content"] if context.history else ""
         
-        for condition in failure_conditions:
-            # Simple keyword matching for now, can be expanded to LLM-based check
-            if condition.lower() in last_user_msg:
-                return True, f"Failure Condition Triggered: {condition}"
+        tokens, matches = self._scan_utterance(last_user_msg)
+        
+        # Simple keyword matching for now, can be expanded to LLM-based check
+        failures = agent_matcher.scan(tokens=tokens, categories=["failure"]).get("failure")
+        if failures:
+            return True, f"Failure Condition Triggered: {failures[0]}"
 
         # 2. Check Global Sentiment Slope
         if context.sentiment_slope < 0.3:
             return True, "Predictive Handoff: Consistently negative sentiment"
 
         # 3. Explicit request triggers (Standard)
-        escalation_keywords = [
-            "speak to a human", "transfer to agent", "manager", "supervisor", 
-            "not satisfied", "complaint", "human person"
-        ]
-        
-        for keyword in escalation_keywords:
-            if keyword in last_user_msg:
-                return True, f"User requested: {keyword}"
+        requested = matches.get("escalation")
+        if requested:
+            return True, f"User requested: {requested[0]}"
         
         # 4. Success Check (Exit if primary goal reached)
-        success_criteria = agent.success_criteria or []
-        for criteria in success_criteria:
-            if criteria.lower() in response.lower():
-                # Note: This might lead to "SUCCESS" instead of typical human escalation
-                # For now, we follow the 'exit_actions' if defined
-                if "escalate" in (agent.exit_actions or []):
-                    return True, f"Goal Reached: {criteria}. Handing off for finalization."
+        # Note: This might lead to "SUCCESS" instead of typical human escalation
+        # For now, we follow the 'exit_actions' if defined
+        if "escalate" in (agent.exit_actions or []):
+            reached = agent_matcher.scan(response, categories=["success"]).get("success")
+            if reached:
+                return True, f"Goal Reached: {reached[0]}. Handing off for finalization."
 
         # 5. Repeated frustration / lack of progress
         if len(context.history) > 6:
@@ -208,6 +254,21 @@ class AgentOrchestrator:
         
         return False, None
 
+    def clarify_transcription(
+        self,
+        context: AgentContext,
+        min_confidence: float = 0.5,
+        min_word_confidence: float = 0.4,
+    ) -> Optional[str]:
+        """
+        Scripted clarification when the caller's last utterance was most likely
+        line noise or misrecognized, checked before any retrieval or LLM work.
+        """
+        transcription = context.confidence.transcription
+        if transcription is None or not transcription.is_unreliable(min_confidence, min_word_confidence):
+            return None
+        return "I'm sorry, I didn't quite catch that. Could you please say that again?"
+
     def handle_low_confidence(self, context: AgentContext) -> Optional[str]:
         """
         Produce a clarification or handoff when pipeline confidence is low.
@@ -227,20 +288,10 @@ class AgentOrchestrator:
     
     def detect_intent(self, user_message: str) -> Optional[str]:
         """Simple intent detection based on keywords."""
-        message_lower = user_message.lower()
-        
-        intent_keywords = {
-            "billing": ["bill", "payment", "charge", "invoice", "refund", "money"],
-            "technical": ["error", "not working", "broken", "bug", "issue", "problem"],
-            "sales": ["buy", "purchase", "pricing", "cost", "subscribe", "plan"],
-            "order": ["order", "shipping", "delivery", "tracking", "package"],
-            "account": ["account", "login", "password", "profile", "settings"],
-        }
-        
-        for intent, keywords in intent_keywords.items():
-            if any(kw in message_lower for kw in keywords):
-                return intent
-        
+        _, matches = self._scan_utterance(user_message)
+        for category in INTENT_CATEGORIES:
+            if category in matches:
+                return category.split(":", 1)[1]
         return None
     
     async def run_with_fallback(
@@ -1,7 +1,9 @@
 from typing import List, Dict, Any, Optional
 from app.services.llm.groq_provider import GroqLLM
 from app.models.agent import Agent
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.database import AsyncSessionLocal
 from loguru import logger
 
 class SwarmOrchestrator:
@@ -10,8 +12,8 @@ class SwarmOrchestrator:
     The "Brain" that decides which "Hand" to use.
     """
     
-    def __init__(self, db: Session, supervisor_agent: Agent):
-        self.db = db
+    def __init__(self, supervisor_agent: Agent, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
         self.supervisor = supervisor_agent
         self.llm = GroqLLM()
 
@@ -57,7 +59,8 @@ Respond with ONLY the ID of the selected agent or "SUPERVISOR".
         logger.info(f"Swarm: Attempting autonomous discovery for task: {task_query}")
         
         # 1. Broad fetch of all active agents
-        all_agents = self.db.query(Agent).filter(Agent.is_active == True).all()
+        async with self.session_factory() as db:
+            all_agents = (await db.execute(select(Agent).filter(Agent.is_active == True))).scalars().all()
         
         if not all_agents:
             return None
@@ -0,0 +1,195 @@
+"""
+Compiled multi-pattern keyword matching.
+All phrases of every category are compiled into one trie over word tokens, so
+a single pass over the text reports every matched category. Matching is
+word-bounded by construction: "no" does not fire inside "know". A phrase
+ending in "*" is a stem: its last word only needs to be a prefix
+("refund*" matches "refunds", "refunded").
+
+Words are whitespace-separated with surrounding punctuation ignored. A scan
+costs one dict lookup per word (memoized per distinct word at the root)
+instead of one substring search per keyword, so it stays flat as the
+per-agent lists grow (see bench_keyword_engine.py). Tokens can be computed
+once and shared by several automatons scanning the same utterance.
+"""
+import string
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+STEM_MARKER = "*"
+_PUNCTUATION = string.punctuation + "‘’“”–—…"
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in text.lower().split():
+        word = word.strip(_PUNCTUATION)
+        if word:
+            tokens.append(word)
+    return tokens
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    outputs: List[int] = field(default_factory=list)
+    # Stem phrases ending at this node: {prefix: [pattern index]}, probed by prefix length
+    stems: Dict[str, List[int]] = field(default_factory=dict)
+    stem_lengths: Tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class _Pattern:
+    category: str
+    phrase: str    # As configured (without the stem marker), used in results
+
+
+class KeywordAutomaton:
+    """
+    Usage:
+        matcher = KeywordAutomaton({"billing": ["bill*", "invoice"], "escalation": ["speak to a human"]})
+        matcher.scan("I want to speak to a human about my bills")
+        # {"escalation": ["speak to a human"], "billing": ["bill"]}
+
+    Immutable once built; safe to share across sessions.
+    """
+
+    MAX_MEMOIZED_WORDS = 20000
+
+    def __init__(self, patterns: Mapping[str, Iterable[str]]):
+        self._root = _Node()
+        # Spoken vocabulary is small: the root step of each distinct word is computed once
+        self._root_steps: Dict[str, Tuple[Optional["_Node"], Tuple[int, ...]]] = {}
+        self._patterns: List[_Pattern] = []
+        self.categories: Tuple[str, ...] = tuple(patterns)
+
+        for category, phrases in patterns.items():
+            for phrase in phrases:
+                self._add(category, phrase)
+
+    def _add(self, category: str, phrase: str):
+        stem = phrase.endswith(STEM_MARKER)
+        phrase = (phrase[:-1] if stem else phrase).strip()
+        words = tokenize(phrase)
+        if not words:
+            return
+
+        index = len(self._patterns)
+        self._patterns.append(_Pattern(category, phrase))
+
+        node = self._root
+        for word in words[:-1]:
+            node = node.children.setdefault(word, _Node())
+
+        if stem:
+            node.stems.setdefault(words[-1], []).append(index)
+            node.stem_lengths = tuple(sorted({len(prefix) for prefix in node.stems}))
+        else:
+            node.children.setdefault(words[-1], _Node()).outputs.append(index)
+
+    def _root_step(self, token: str) -> Tuple[Optional[_Node], Tuple[int, ...]]:
+        """Trie step from the root for one word, plus stem matches; memoized per word."""
+        step = self._root_steps.get(token)
+        if step is None:
+            root = self._root
+            node = root.children.get(token)
+            hits = [index for length in root.stem_lengths if length <= len(token)
+                    for index in root.stems.get(token[:length], ())]
+            if node is not None:
+                hits.extend(node.outputs)
+            # Only keep the node if a longer phrase can continue from it
+            if node is not None and not (node.children or node.stem_lengths):
+                node = None
+            step = (node, tuple(hits))
+            if len(self._root_steps) >= self.MAX_MEMOIZED_WORDS:
+                self._root_steps.clear()
+            self._root_steps[token] = step
+        return step
+
+    def scan(self, text: str = "", categories: Optional[Sequence[str]] = None,
+             tokens: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        Return {category: [distinct matched phrases, in order of appearance]}.
+        `categories` optionally restricts which categories are reported;
+        `tokens` (from `tokenize`) skips re-tokenizing an already scanned text.
+        """
+        if tokens is None:
+            tokens = tokenize(text) if text else []
+        if not self._patterns or not tokens:
+            return {}
+
+        count = len(tokens)
+        root_steps = self._root_steps
+        wanted = set(categories) if categories is not None else None
+        patterns = self._patterns
+        found: Dict[str, List[str]] = {}
+        seen = set()
+
+        for start in range(count):
+            token = tokens[start]
+            node, hits = root_steps.get(token) or self._root_step(token)
+            position = start + 1
+            while True:
+                for index in hits:
+                    if index in seen:
+                        continue
+                    pattern = patterns[index]
+                    if wanted is not None and pattern.category not in wanted:
+                        continue
+                    seen.add(index)
+                    found.setdefault(pattern.category, []).append(pattern.phrase)
+
+                # Multi-word phrases: keep walking while the following words stay in the trie
+                if node is None or position >= count:
+                    break
+                token = tokens[position]
+                position += 1
+                hits = [index for length in node.stem_lengths if length <= len(token)
+                        for index in node.stems.get(token[:length], ())]
+                node = node.children.get(token)
+                if node is not None:
+                    hits.extend(node.outputs)
+
+        return found
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+
+class KeywordAutomatonCache:
+    """
+    Compiled automatons keyed by their pattern content, so every session of an
+    agent (and every agent with identical lists) shares one build, and an edited
+    agent naturally compiles a new one.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, KeywordAutomaton]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, patterns: Mapping[str, Iterable[str]]) -> KeywordAutomaton:
+        frozen = {category: tuple(phrases or ()) for category, phrases in patterns.items()}
+        key = tuple(frozen.items())
+        automaton = self._entries.get(key)
+        if automaton is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return automaton
+
+        self.misses += 1
+        automaton = KeywordAutomaton(frozen)
+        self._entries[key] = automaton
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return automaton
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Singleton
+keyword_automaton_cache = KeywordAutomatonCache()
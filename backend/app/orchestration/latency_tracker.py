@@ -0,0 +1,125 @@
+"""
+Per-stage latency instrumentation for the realtime voice pipeline.
+Each turn records how long its stages took; the call aggregates them so
+CallLog and the monitoring stream can show where the latency budget went.
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class LatencyStage(str, Enum):
+    """Instrumented points of a voice turn."""
+    # Spans (duration of the stage itself)
+    SENTIMENT_INTENT = "sentiment_intent"
+    HITL_LOOKUP = "hitl_lookup"
+    SWARM_ROUTING = "swarm_routing"
+    RAG = "rag"
+    RESPONSE_CACHE = "response_cache"
+    COMPLIANCE = "compliance"
+    # Milestones (offset from the start of the turn)
+    LLM_FIRST_TOKEN = "llm_first_token"
+    LLM_COMPLETE = "llm_complete"
+    TTS_FIRST_BYTE = "tts_first_byte"
+    FIRST_AUDIO_SENT = "first_audio_sent"
+
+
+@dataclass
+class TurnLatency:
+    """Stage timings for a single turn (all values in ms)."""
+    turn_index: int
+    started_at: float = field(default_factory=time.perf_counter)
+    spans: Dict[str, float] = field(default_factory=dict)
+    milestones: Dict[str, float] = field(default_factory=dict)
+    total_ms: Optional[float] = None
+    cancelled: bool = False
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    @contextmanager
+    def measure(self, stage: LatencyStage):
+        """Time a span. Repeated spans of the same stage are summed."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.spans[stage.value] = self.spans.get(stage.value, 0.0) + duration
+
+    def mark(self, stage: LatencyStage):
+        """Record a milestone. Only the first occurrence per turn is kept."""
+        if stage.value not in self.milestones:
+            self.milestones[stage.value] = self.elapsed_ms()
+
+    @property
+    def ttfa_ms(self) -> Optional[float]:
+        return self.milestones.get(LatencyStage.FIRST_AUDIO_SENT.value)
+
+    def finish(self):
+        if self.total_ms is None:
+            self.total_ms = self.elapsed_ms()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "turn_index": self.turn_index,
+            "total_ms": round(self.total_ms if self.total_ms is not None else self.elapsed_ms(), 2),
+            "ttfa_ms": round(self.ttfa_ms, 2) if self.ttfa_ms is not None else None,
+            "spans": {k: round(v, 2) for k, v in self.spans.items()},
+            "milestones": {k: round(v, 2) for k, v in self.milestones.items()},
+            "cancelled": self.cancelled,
+        }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class CallLatencyStats:
+    """Aggregates turn timings over the lifetime of a call."""
+
+    def __init__(self):
+        self.turns: List[TurnLatency] = []
+
+    def start_turn(self, turn_index: int) -> TurnLatency:
+        turn = TurnLatency(turn_index=turn_index)
+        self.turns.append(turn)
+        return turn
+
+    def _completed_turns(self) -> List[TurnLatency]:
+        return [t for t in self.turns if not t.cancelled and t.total_ms is not None]
+
+    def avg_ttfa_ms(self) -> float:
+        ttfas = [t.ttfa_ms for t in self._completed_turns() if t.ttfa_ms is not None]
+        return sum(ttfas) / len(ttfas) if ttfas else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage avg/p50/p95/max over completed turns, for CallLog.metadata_json."""
+        turns = self._completed_turns()
+        samples: Dict[str, List[float]] = {}
+        for turn in turns:
+            for stage, value in {**turn.spans, **turn.milestones}.items():
+                samples.setdefault(stage, []).append(value)
+            samples.setdefault("total", []).append(turn.total_ms)
+
+        stages = {
+            stage: {
+                "count": len(values),
+                "avg_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(_percentile(values, 50), 2),
+                "p95_ms": round(_percentile(values, 95), 2),
+                "max_ms": round(max(values), 2),
+            }
+            for stage, values in samples.items()
+        }
+
+        return {
+            "turns": len(turns),
+            "cancelled_turns": len([t for t in self.turns if t.cancelled]),
+            "avg_ttfa_ms": round(self.avg_ttfa_ms(), 2),
+            "stages": stages,
+        }
@@ -0,0 +1,274 @@
+"""
+Speculative turn start on streaming STT partials.
+
+When a partial hypothesis stays unchanged for `stable_ms`, RAG and the LLM
+stream are started on it before the caller has finished speaking. Only text
+is produced speculatively: LLM chunks are buffered, nothing is synthesized
+or sent. When the final transcript arrives the speculation is either
+
+- committed: the final matches the partial within `match_threshold` (word-level
+  similarity, case and punctuation ignored) and the turn would make the same
+  LLM call (same agent, history, model and system prompt). The turn replays
+  the buffered chunks and follows the live stream, so TTS starts on text that
+  already exists;
+- discarded: cancelled, and the turn runs as usual on the final transcript.
+
+A partial that changes after a speculation started restarts it. Chunks produced
+by discarded speculations are counted as wasted tokens (one streamed chunk is
+roughly one token).
+
+Per-agent opt-in via `agent.config["speculation"]`, e.g.
+    {"enabled": true, "stable_ms": 250, "min_words": 3, "match_threshold": 0.9}
+"""
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from loguru import logger
+
+from app.core.agent_settings import from_agent_config, setting
+
+_WORD = re.compile(r"\w+(?:'\w+)?")
+
+
+def utterance_words(text: str) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def utterance_similarity(a: str, b: str) -> float:
+    """Word-level similarity in [0, 1]; case and punctuation are ignored."""
+    words_a, words_b = utterance_words(a), utterance_words(b)
+    if not words_a and not words_b:
+        return 1.0
+    return SequenceMatcher(None, words_a, words_b, autojunk=False).ratio()
+
+
+@dataclass
+class SpeculationSettings:
+    enabled: bool = False            # Costs LLM tokens on every restart: opt-in per agent
+    stable_ms: int = setting(250, minimum=0)                     # A partial unchanged this long starts a speculation
+    min_words: int = setting(3, minimum=1)                       # Shorter partials are too ambiguous to act on
+    match_threshold: float = setting(0.9, minimum=0.0, maximum=1.0)  # Minimum word similarity between the partial and the final
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SpeculationSettings":
+        """Read `config["speculation"]`; invalid keys keep their defaults."""
+        return from_agent_config(cls, config, "speculation")
+
+
+@dataclass
+class SpeculationMetrics:
+    started: int = 0
+    hits: int = 0             # Final matched and the turn streamed the speculative response
+    misses: int = 0           # A speculation was running when the final arrived but could not be used
+    restarts: int = 0         # Superseded by a changed partial before the final
+    committed_tokens: int = 0
+    wasted_tokens: int = 0
+    head_start_ms: float = 0.0  # Sum over hits: how long the speculation ran before the final
+
+    def to_dict(self) -> Dict[str, Any]:
+        decided = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "restarts": self.restarts,
+            "hit_rate": round(self.hits / decided, 3) if decided else None,
+            "committed_tokens": self.committed_tokens,
+            "wasted_tokens": self.wasted_tokens,
+            "avg_head_start_ms": round(self.head_start_ms / self.hits, 1) if self.hits else None,
+        }
+
+
+class Speculation:
+    """
+    RAG + LLM started on one partial transcript. `retrieve(text)` returns the
+    knowledge chunks, `generate(text, chunks)` returns `(system_prompt, stream)`.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        key: Hashable,
+        retrieve: Callable[[str], Awaitable[Any]],
+        generate: Callable[[str, Any], Any],
+    ):
+        self.text = text
+        self.key = key
+        self.started_at = time.perf_counter()
+        self.system_prompt: Optional[str] = None
+        self.committed = False
+        self.head_start_ms = 0.0     # How long it ran before the final transcript arrived
+        self.tokens = 0
+        self._chunks: List[str] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        self._knowledge: "asyncio.Future" = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(retrieve, generate), name=f"speculation:{text[:24]}")
+
+    async def _run(self, retrieve, generate):
+        try:
+            try:
+                chunks = await retrieve(self.text)
+            except Exception as e:
+                self._knowledge.set_exception(e)
+                raise
+            self._knowledge.set_result(chunks)
+            self.system_prompt, stream = generate(self.text, chunks)
+            async for piece in stream:
+                self._chunks.append(piece)
+                self.tokens += 1
+                self._notify()
+        except asyncio.CancelledError:
+            if not self._knowledge.done():
+                self._knowledge.cancel()
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def knowledge(self):
+        """The RAG result of the speculation (shielded: awaiting it does not cancel the speculation)."""
+        return await asyncio.shield(self._knowledge)
+
+    def claim(self, system_prompt: str) -> Optional[AsyncIterator[str]]:
+        """The speculative LLM stream if it was generated with `system_prompt`, else None."""
+        if self.system_prompt != system_prompt or self._error is not None:
+            return None
+        self.committed = True
+        return self._replay()
+
+    async def _replay(self) -> AsyncIterator[str]:
+        sent = 0
+        while True:
+            while sent < len(self._chunks):
+                yield self._chunks[sent]
+                sent += 1
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            await self._changed.wait()
+
+    def cancel(self):
+        self._task.cancel()
+        if not self._knowledge.done():
+            self._knowledge.cancel()
+        elif not self._knowledge.cancelled():
+            self._knowledge.exception()  # Mark a failed lookup nobody joined as retrieved
+
+
+class Speculator:
+    """
+    One per voice session.
+
+    Usage:
+        speculator = Speculator(settings, start=start_speculation, can_start=lambda: not turn_running())
+        speculator.on_partial(hypothesis.text)            # Every streaming partial
+        speculation = speculator.take(final_text, key)    # Turn start: matching speculation or None
+        stream = speculation.claim(system_prompt)         # LLM call: the speculative stream, if it is the same call
+        ...
+        speculator.release(speculation)                   # Turn end (cancels it if never committed)
+    """
+
+    def __init__(
+        self,
+        settings: SpeculationSettings,
+        start: Callable[[str], Speculation],
+        can_start: Callable[[], bool] = lambda: True,
+        metrics: Optional[SpeculationMetrics] = None,
+    ):
+        self.settings = settings
+        self._start = start
+        self._can_start = can_start
+        self.metrics = SpeculationMetrics()
+        self._shared = metrics
+        self._current: Optional[Speculation] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _count(self, **deltas):
+        for target in (self.metrics, self._shared):
+            if target is not None:
+                for name, delta in deltas.items():
+                    setattr(target, name, getattr(target, name) + delta)
+
+    def on_partial(self, text: str):
+        """Restart the stability timer; a different partial also supersedes a running speculation."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._current and utterance_words(self._current.text) != utterance_words(text):
+            self._discard(self._current, restart=True)
+        if self._current or len(utterance_words(text)) < self.settings.min_words:
+            return
+        self._timer = asyncio.get_running_loop().call_later(self.settings.stable_ms / 1000, self._stable, text)
+
+    def _stable(self, text: str):
+        self._timer = None
+        if self._current or not self._can_start():
+            return
+        try:
+            self._current = self._start(text)
+        except Exception as e:
+            logger.warning(f"Speculation not started: {e}")
+            return
+        self._count(started=1)
+        logger.debug(f"Speculating on stable partial: {text!r}")
+
+    def take(self, final_text: str, key: Hashable) -> Optional[Speculation]:
+        """Hand the running speculation to the turn if it matches the final transcript, else cancel it."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        speculation, self._current = self._current, None
+        if speculation is None:
+            return None
+        similarity = utterance_similarity(speculation.text, final_text)
+        if speculation.key != key or similarity < self.settings.match_threshold:
+            logger.info(f"Speculation discarded (similarity {similarity:.2f}): {speculation.text!r} -> {final_text!r}")
+            self._count(misses=1)
+            self._discard(speculation)
+            return None
+        speculation.head_start_ms = (time.perf_counter() - speculation.started_at) * 1000
+        return speculation
+
+    def release(self, speculation: Optional[Speculation]):
+        """End of the turn that took `speculation`: record the outcome and stop its task."""
+        if speculation is None:
+            return
+        if speculation.committed:
+            self._count(hits=1, committed_tokens=speculation.tokens, head_start_ms=speculation.head_start_ms)
+            speculation.cancel()
+        else:
+            self._count(misses=1)
+            self._discard(speculation)
+
+    def _discard(self, speculation: Speculation, restart: bool = False):
+        speculation.cancel()
+        if restart:
+            self._current = None
+            self._count(restarts=1)
+        self._count(wasted_tokens=speculation.tokens)
+
+    def cancel(self):
+        """Session end."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._current:
+            self._discard(self._current)
+            self._current = None
+
+
+# Singleton
+speculation_metrics = SpeculationMetrics()
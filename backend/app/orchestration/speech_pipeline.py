@@ -0,0 +1,147 @@
+"""
+Pipelined text-to-speech delivery for streamed LLM responses.
+
+    segmenter --> bounded queue --> synthesis (small ordered pool) --> sender
+
+Token consumption, synthesis of segment N and synthesis of segment N+1 overlap,
+while audio still reaches the caller in segment order. Synthesis is chunked:
+the head segment's audio is forwarded chunk by chunk as the provider produces
+it, and later segments buffer their chunks until it is their turn.
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from loguru import logger
+
+
+_END = None  # Marks the end of one segment's chunk stream
+
+
+class SpeechPipeline:
+    """
+    Producer/consumer pipeline that synthesizes segments concurrently and sends them in order.
+
+    `synthesize(text)` returns an async iterator of audio chunks for a segment;
+    `send_audio(chunk, end)` delivers them, with `end=True` once per segment after its
+    last chunk (an empty chunk). `submit()` applies backpressure once `max_pending`
+    segments are waiting on the sender, so a slow TTS provider throttles token
+    consumption instead of growing an unbounded backlog.
+    Leaving the `async with` block because of an exception (e.g. barge-in cancellation)
+    cancels every in-flight synthesis.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], AsyncIterator[bytes]],
+        send_audio: Callable[[bytes, bool], Awaitable[None]],
+        max_pending: int = 3,
+        max_concurrent_synthesis: int = 2,
+    ):
+        self._synthesize = synthesize
+        self._send_audio = send_audio
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+        self._synthesis_slots = asyncio.Semaphore(max(1, max_concurrent_synthesis))
+        self._sender: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+        self.segments_submitted = 0
+        self.segments_sent = 0
+
+    async def __aenter__(self) -> "SpeechPipeline":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            await self.drain()
+        else:
+            await self.cancel()
+        return False
+
+    def start(self):
+        if not self._sender:
+            self._sender = asyncio.create_task(self._send_loop())
+
+    async def submit(self, text: str):
+        """Queue a segment for synthesis. Blocks while the pipeline is full."""
+        if self._error:
+            raise self._error
+        self.start()
+        chunks: asyncio.Queue = asyncio.Queue()
+        synthesis = asyncio.create_task(self._synthesize_segment(text, chunks))
+        self.segments_submitted += 1
+        try:
+            await self._queue.put((synthesis, chunks))
+        except asyncio.CancelledError:
+            # Barge-in while waiting for room: cancel() will never see this segment
+            synthesis.cancel()
+            raise
+
+    async def drain(self):
+        """Wait until every submitted segment has been sent."""
+        if not self._sender:
+            return
+        await self._queue.put(None)
+        await self._sender
+        if self._error:
+            raise self._error
+
+    async def cancel(self):
+        """Drop pending audio (barge-in) and stop the sender."""
+        if self._sender and not self._sender.done():
+            self._sender.cancel()
+        pending = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None and not item[0].done():
+                item[0].cancel()
+                pending.append(item[0])
+        if self._sender:
+            pending.append(self._sender)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _synthesize_segment(self, text: str, chunks: asyncio.Queue):
+        try:
+            async with self._synthesis_slots:
+                async for chunk in self._synthesize(text):
+                    if chunk:
+                        chunks.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"TTS synthesis failed for segment: {e}")
+        finally:
+            chunks.put_nowait(_END)
+
+    async def _send_loop(self):
+        current: Optional[asyncio.Task] = None
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is None:
+                    return
+                current, chunks = item
+
+                if self._error:
+                    # Sender is broken (e.g. client gone); keep consuming so producers never block
+                    current.cancel()
+                    continue
+
+                sent_any = False
+                try:
+                    while True:
+                        chunk = await chunks.get()
+                        if chunk is _END:
+                            break
+                        await self._send_audio(chunk, False)
+                        sent_any = True
+                    if sent_any:
+                        await self._send_audio(b"", True)
+                        self.segments_sent += 1
+                except Exception as e:
+                    logger.error(f"Audio delivery failed, dropping remaining segments: {e}")
+                    self._error = e
+                    current.cancel()
+        finally:
+            # Cancelled mid-segment (barge-in): stop the segment being played too
+            if current is not None and not current.done():
+                current.cancel()
@@ -0,0 +1,76 @@
+"""
+Dependency-aware runner for the async stages of a voice turn.
+Independent stages start immediately and run concurrently; a stage that
+declares dependencies waits only for those results. Leaving the runner
+(early return, error or barge-in cancellation) cancels unfinished stages.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from loguru import logger
+
+
+StageFn = Callable[..., Awaitable[Any]]
+
+
+class StageRunner:
+    """
+    Usage:
+        async with StageRunner() as stages:
+            stages.add("specialists", fetch_specialists)
+            stages.add("routing", route, depends_on=["specialists"])  # route(specialists=...)
+            selected = await stages.result("routing")
+    """
+
+    def __init__(self, name: str = "turn"):
+        self.name = name
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def __aenter__(self) -> "StageRunner":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        await self.cancel()
+        return False
+
+    def add(self, stage: str, fn: StageFn, depends_on: Optional[Iterable[str]] = None) -> asyncio.Task:
+        """
+        Schedule a stage. `fn` is called with the results of its dependencies
+        as keyword arguments (named after the dependency stages).
+        """
+        if stage in self._tasks:
+            raise ValueError(f"Stage '{stage}' already scheduled")
+
+        dependencies = list(depends_on or [])
+        missing = [d for d in dependencies if d not in self._tasks]
+        if missing:
+            raise ValueError(f"Stage '{stage}' depends on unscheduled stages: {missing}")
+
+        async def run_stage():
+            kwargs = {}
+            for dependency in dependencies:
+                kwargs[dependency] = await self._tasks[dependency]
+            return await fn(**kwargs)
+
+        task = asyncio.create_task(run_stage(), name=f"{self.name}:{stage}")
+        self._tasks[stage] = task
+        return task
+
+    async def result(self, stage: str) -> Any:
+        """Join a single stage and return its result (re-raises its exception)."""
+        return await self._tasks[stage]
+
+    def done(self, stage: str) -> bool:
+        return stage in self._tasks and self._tasks[stage].done()
+
+    async def cancel(self):
+        """Cancel every stage that has not finished yet and wait for them to unwind."""
+        pending = [t for t in self._tasks.values() if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        # Retrieve exceptions of finished-but-unjoined stages so they are not reported as never retrieved
+        for stage, task in self._tasks.items():
+            if task.done() and not task.cancelled() and task.exception() and task not in pending:
+                logger.debug(f"Stage '{stage}' of {self.name} finished with unjoined error: {task.exception()}")
@@ -0,0 +1,310 @@
+"""
+Bounded supervisor for background side work of a call (compliance audits,
+shadow comparisons, UX clip warm-up, monitoring events).
+Each kind of task has its own concurrency limit, bounded queue and overflow
+policy; queued work is dispatched by priority. Everything is tracked so it
+can be cancelled per session and drained at shutdown instead of dying silently.
+"""
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+from loguru import logger
+from app.core.config import settings
+
+
+TaskFactory = Callable[[], Awaitable[Any]]
+
+
+class TaskPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class OverflowPolicy(str, Enum):
+    DROP_NEW = "drop_new"        # Reject the submission when the kind's queue is full
+    DROP_OLDEST = "drop_oldest"  # Evict the oldest queued task of the kind to make room
+    DEFER = "defer"              # Park it until the kind's queue has room again (bounded)
+
+
+@dataclass
+class TaskKindConfig:
+    name: str
+    max_concurrency: int
+    max_queued: int
+    priority: TaskPriority = TaskPriority.NORMAL
+    overflow: OverflowPolicy = OverflowPolicy.DROP_NEW
+    max_deferred: int = 0
+
+
+@dataclass
+class KindMetrics:
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    deferred: int = 0
+    cancelled: int = 0
+    peak_queued: int = 0
+
+
+@dataclass(order=True)
+class _QueuedTask:
+    priority: int
+    seq: int
+    kind: str = field(compare=False)
+    factory: TaskFactory = field(compare=False)
+    group: Optional[str] = field(compare=False, default=None)
+    name: Optional[str] = field(compare=False, default=None)
+    cancelled: bool = field(compare=False, default=False)
+
+
+# Kinds used by the realtime orchestrator
+COMPLIANCE_AUDIT = "compliance_audit"
+SHADOW_COMPARISON = "shadow_comparison"
+VOICE_UX_PRECOMPUTE = "voice_ux_precompute"
+MONITORING_EVENT = "monitoring_event"
+
+DEFAULT_KINDS = [
+    # Audits are the record of what was said: never dropped unless the deferral backlog is exhausted
+    TaskKindConfig(COMPLIANCE_AUDIT, max_concurrency=4, max_queued=200,
+                   priority=TaskPriority.HIGH, overflow=OverflowPolicy.DEFER, max_deferred=1000),
+    # Shadow comparison is sampling: under pressure keep the most recent turns
+    TaskKindConfig(SHADOW_COMPARISON, max_concurrency=2, max_queued=50,
+                   priority=TaskPriority.LOW, overflow=OverflowPolicy.DROP_OLDEST),
+    TaskKindConfig(VOICE_UX_PRECOMPUTE, max_concurrency=2, max_queued=20,
+                   priority=TaskPriority.NORMAL, overflow=OverflowPolicy.DROP_NEW),
+    TaskKindConfig(MONITORING_EVENT, max_concurrency=8, max_queued=500,
+                   priority=TaskPriority.NORMAL, overflow=OverflowPolicy.DROP_OLDEST),
+]
+
+
+class BackgroundTaskSupervisor:
+    """
+    Usage:
+        task_supervisor.submit(COMPLIANCE_AUDIT, lambda: audit(turn), group=session_id)
+        task_supervisor.cancel_group(session_id, kinds=[VOICE_UX_PRECOMPUTE])
+        await task_supervisor.drain(timeout=10)   # at shutdown
+
+    Tasks are passed as factories so nothing is created (and no coroutine leaks)
+    for work that is dropped or cancelled while queued.
+    """
+
+    def __init__(self, kinds: List[TaskKindConfig], max_concurrency: int):
+        self.kinds: Dict[str, TaskKindConfig] = {k.name: k for k in kinds}
+        self.max_concurrency = max_concurrency
+        self.metrics: Dict[str, KindMetrics] = {k.name: KindMetrics() for k in kinds}
+        self._heap: List[_QueuedTask] = []
+        self._queued: Dict[str, Deque[_QueuedTask]] = {k.name: deque() for k in kinds}
+        self._deferred: Dict[str, Deque[_QueuedTask]] = {k.name: deque() for k in kinds}
+        self._running: Dict[str, Set[asyncio.Task]] = {k.name: set() for k in kinds}
+        self._task_entries: Dict[asyncio.Task, _QueuedTask] = {}
+        self._seq = itertools.count()
+        self._accepting = True
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    # -- Submission ---------------------------------------------------------
+
+    def submit(self, kind: str, factory: TaskFactory, *, priority: Optional[TaskPriority] = None,
+               group: Optional[str] = None, name: Optional[str] = None) -> bool:
+        """
+        Queue a background task. Returns False if it was dropped (queue full or
+        supervisor draining). Must be called from the event loop.
+        """
+        config = self.kinds.get(kind)
+        if config is None:
+            raise ValueError(f"Unknown background task kind '{kind}'")
+
+        metrics = self.metrics[kind]
+        metrics.submitted += 1
+
+        if not self._accepting:
+            metrics.dropped += 1
+            logger.warning(f"Background task '{name or kind}' rejected: supervisor is draining")
+            return False
+
+        entry = _QueuedTask(
+            priority=int(config.priority if priority is None else priority),
+            seq=next(self._seq),
+            kind=kind,
+            factory=factory,
+            group=group,
+            name=name,
+        )
+
+        queued = self._queued[kind]
+        if len(queued) >= config.max_queued:
+            if config.overflow == OverflowPolicy.DROP_OLDEST:
+                evicted = queued.popleft()
+                evicted.cancelled = True
+                metrics.dropped += 1
+                logger.warning(f"Background queue '{kind}' full: dropped oldest task {evicted.name or evicted.seq}")
+            elif config.overflow == OverflowPolicy.DEFER and len(self._deferred[kind]) < config.max_deferred:
+                self._deferred[kind].append(entry)
+                metrics.deferred += 1
+                self._idle.clear()
+                return True
+            else:
+                metrics.dropped += 1
+                logger.warning(f"Background queue '{kind}' full: dropped task {name or kind}")
+                return False
+
+        self._enqueue(entry)
+        self._dispatch()
+        return True
+
+    def _enqueue(self, entry: _QueuedTask):
+        queued = self._queued[entry.kind]
+        queued.append(entry)
+        heapq.heappush(self._heap, entry)
+        metrics = self.metrics[entry.kind]
+        metrics.peak_queued = max(metrics.peak_queued, len(queued))
+        self._idle.clear()
+
+    # -- Dispatch -----------------------------------------------------------
+
+    def _running_count(self) -> int:
+        return sum(len(tasks) for tasks in self._running.values())
+
+    def _dispatch(self):
+        """Start the highest-priority queued tasks whose kind still has a free slot."""
+        # Deferred work is admitted as soon as its kind's queue has room again
+        for kind, deferred in self._deferred.items():
+            while deferred and len(self._queued[kind]) < self.kinds[kind].max_queued:
+                self._enqueue(deferred.popleft())
+
+        blocked: List[_QueuedTask] = []
+        while self._heap and self._running_count() < self.max_concurrency:
+            entry = heapq.heappop(self._heap)
+            if entry.cancelled:
+                continue
+            if len(self._running[entry.kind]) >= self.kinds[entry.kind].max_concurrency:
+                blocked.append(entry)
+                continue
+            self._queued[entry.kind].remove(entry)
+            self._start(entry)
+        for entry in blocked:
+            heapq.heappush(self._heap, entry)
+
+        self._update_idle()
+
+    def _start(self, entry: _QueuedTask):
+        self.metrics[entry.kind].started += 1
+        task = asyncio.create_task(self._run(entry), name=f"bg:{entry.kind}:{entry.name or entry.seq}")
+        self._running[entry.kind].add(task)
+        self._task_entries[task] = entry
+        task.add_done_callback(self._on_done)
+
+    async def _run(self, entry: _QueuedTask):
+        try:
+            await entry.factory()
+        except asyncio.CancelledError:
+            self.metrics[entry.kind].cancelled += 1
+            raise
+        except Exception as e:
+            self.metrics[entry.kind].failed += 1
+            logger.error(f"Background task {entry.kind}:{entry.name or entry.seq} failed: {e}")
+        else:
+            self.metrics[entry.kind].completed += 1
+
+    def _on_done(self, task: asyncio.Task):
+        entry = self._task_entries.pop(task, None)
+        if entry is not None:
+            self._running[entry.kind].discard(task)
+        self._dispatch()
+
+    def _update_idle(self):
+        pending = (
+            self._running_count()
+            or any(self._queued.values())
+            or any(self._deferred.values())
+        )
+        if pending:
+            self._idle.clear()
+        else:
+            self._idle.set()
+
+    # -- Lifecycle ----------------------------------------------------------
+
+    def cancel_group(self, group: str, kinds: Optional[List[str]] = None) -> int:
+        """Cancel queued and running tasks of one group (e.g. a session that ended)."""
+        cancelled = 0
+        for kind in kinds or list(self.kinds):
+            for backlog in (self._queued[kind], self._deferred[kind]):
+                for entry in [e for e in backlog if e.group == group]:
+                    backlog.remove(entry)
+                    entry.cancelled = True
+                    self.metrics[kind].cancelled += 1
+                    cancelled += 1
+            for task in list(self._running[kind]):
+                if self._task_entries[task].group == group and not task.done():
+                    task.cancel()
+                    cancelled += 1
+        self._update_idle()
+        return cancelled
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop accepting work and wait for queued/running tasks to finish.
+        Whatever is still pending after `timeout` seconds is cancelled (and logged).
+        Returns True if everything completed.
+        """
+        self._accepting = False
+        self._dispatch()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            pass
+
+        lost = 0
+        for kind in self.kinds:
+            for backlog in (self._queued[kind], self._deferred[kind]):
+                lost += len(backlog)
+                self.metrics[kind].cancelled += len(backlog)
+                for entry in backlog:
+                    entry.cancelled = True
+                backlog.clear()
+        self._heap.clear()
+
+        running = [t for tasks in self._running.values() for t in tasks if not t.done()]
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+        logger.warning(
+            f"Background drain timed out after {timeout}s: "
+            f"cancelled {len(running)} running and {lost} queued tasks"
+        )
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accepting": self._accepting,
+            "max_concurrency": self.max_concurrency,
+            "running": self._running_count(),
+            "kinds": {
+                kind: {
+                    "max_concurrency": config.max_concurrency,
+                    "max_queued": config.max_queued,
+                    "priority": config.priority.name.lower(),
+                    "overflow": config.overflow.value,
+                    "queued": len(self._queued[kind]),
+                    "deferred_pending": len(self._deferred[kind]),
+                    "running": len(self._running[kind]),
+                    **vars(self.metrics[kind]),
+                }
+                for kind, config in self.kinds.items()
+            },
+        }
+
+
+# Singleton
+task_supervisor = BackgroundTaskSupervisor(DEFAULT_KINDS, max_concurrency=settings.BACKGROUND_TASK_MAX_CONCURRENCY)
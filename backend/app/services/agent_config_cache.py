@@ -0,0 +1,257 @@
+"""
+Process-wide cache of resolved agent configuration.
+
+Call setup (websocket sessions, Twilio webhooks) needs the agent row, its
+rollout versions, the parsed ConversationPolicy and the tool schemas. These
+change rarely, so they are loaded once per TTL and shared by every call on the
+worker. Agent/version CRUD invalidates entries locally and broadcasts the
+invalidation to the other workers over Redis Pub/Sub.
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import agent as models
+from app.schemas.policy import ConversationPolicy
+from app.services.tools.registry import get_tool_schemas
+
+
+INVALIDATION_CHANNEL = "agent_config:invalidate"
+PUBLISH_TIMEOUT_SECONDS = 2.0  # An unreachable Redis costs a broadcast, never a stalled request
+
+
+@dataclass
+class ResolvedAgentConfig:
+    """Effective configuration of an agent for one version (None = base agent)."""
+    agent_id: str
+    version_id: Optional[str]
+    version_number: Optional[int]
+    persona: str
+    tools: List[Any]
+    policy: Optional[ConversationPolicy] = None
+    tool_schemas: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class _AgentEntry:
+    agent: models.Agent  # Transient snapshot, read-only
+    weighted_versions: List[Tuple[int, str]]  # (weight, version_id) for A/B rollout
+    pinned_version_id: Optional[str]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class AgentConfigCache:
+    """TTL cache of agents and their resolved (agent_id, version_id) configurations."""
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self._agents: Dict[str, _AgentEntry] = {}
+        self._configs: Dict[Tuple[str, Optional[str]], ResolvedAgentConfig] = {}
+        self._publisher: Optional[redis.Redis] = None
+        self._async_publisher: Optional[aioredis.Redis] = None
+        # Other per-worker caches derived from agent config (e.g. cached answers) drop with it
+        self._invalidation_hooks: List[Callable[[Optional[str]], Any]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def _build_config(self, agent: models.Agent, version: Optional[models.AgentVersion]) -> ResolvedAgentConfig:
+        if version is None:
+            persona, tools, policy = agent.persona, agent.tools or [], None
+        else:
+            persona, tools = version.persona, version.tools
+            policy = ConversationPolicy.parse_obj(version.policy) if version.policy else None
+
+        return ResolvedAgentConfig(
+            agent_id=agent.id,
+            version_id=version.id if version else None,
+            version_number=version.version_number if version else None,
+            persona=persona,
+            tools=tools,
+            policy=policy,
+            tool_schemas=get_tool_schemas(tools) if tools else None,
+        )
+
+    async def _load(self, db: AsyncSession, agent_id: str) -> Optional[_AgentEntry]:
+        agent = await db.get(models.Agent, agent_id)
+        if not agent:
+            return None
+
+        versions = (await db.execute(select(models.AgentVersion).filter(
+            models.AgentVersion.agent_id == agent_id,
+            models.AgentVersion.weight > 0,
+        ))).scalars().all()
+
+        pinned = None
+        if not versions and agent.active_version_id:
+            pinned = await db.get(models.AgentVersion, agent.active_version_id)
+
+        # Parse everything up front so no call pays the Pydantic cost
+        self._configs[(agent_id, None)] = self._build_config(agent, None)
+        for version in list(versions) + ([pinned] if pinned else []):
+            self._configs[(agent_id, version.id)] = self._build_config(agent, version)
+
+        # Share a transient copy across sessions; the loaded row stays owned by the caller's session
+        snapshot = models.Agent(**{c.name: getattr(agent, c.name) for c in models.Agent.__table__.columns})
+
+        entry = _AgentEntry(
+            agent=snapshot,
+            weighted_versions=[(v.weight, v.id) for v in versions],
+            pinned_version_id=pinned.id if pinned else None,
+        )
+        self._agents[agent_id] = entry
+        return entry
+
+    async def _entry(self, db: AsyncSession, agent_id: str) -> Optional[_AgentEntry]:
+        entry = self._agents.get(agent_id)
+        if entry and time.monotonic() - entry.loaded_at < self.ttl_seconds:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        # TTL reload: the config may be unchanged, so derived caches (cached answers) are kept
+        self._drop_local(agent_id, notify=False)
+        return await self._load(db, agent_id)
+
+    async def get_agent(self, db: AsyncSession, agent_id: str) -> Optional[models.Agent]:
+        """Cached (transient, read-only) agent row."""
+        entry = await self._entry(db, agent_id)
+        return entry.agent if entry else None
+
+    async def resolve(self, db: AsyncSession, agent_id: str) -> Optional[Tuple[models.Agent, ResolvedAgentConfig]]:
+        """
+        Pick the configuration for a new call.
+        Canary / A/B weights are rolled per call; manual pinning applies when no rollout is active.
+        """
+        entry = await self._entry(db, agent_id)
+        if not entry:
+            return None
+
+        version_id = None
+        if entry.weighted_versions:
+            total_weight = sum(weight for weight, _ in entry.weighted_versions)
+            if total_weight > 0:
+                rand_val = random.randint(1, 100)
+                cumulative = 0
+                for weight, candidate_id in entry.weighted_versions:
+                    cumulative += weight
+                    if rand_val <= cumulative:
+                        version_id = candidate_id
+                        break
+        elif entry.pinned_version_id:
+            version_id = entry.pinned_version_id
+
+        return entry.agent, self._configs[(agent_id, version_id)]
+
+    def add_invalidation_hook(self, hook: Callable[[Optional[str]], Any]):
+        """
+        Call `hook(agent_id)` (None = everything) when an agent is invalidated explicitly,
+        here or on another worker. TTL reloads and listener reconnects do not call hooks.
+        """
+        self._invalidation_hooks.append(hook)
+
+    def _drop_local(self, agent_id: Optional[str] = None, notify: bool = True):
+        if notify:
+            for hook in self._invalidation_hooks:
+                try:
+                    hook(agent_id)
+                except Exception as e:
+                    logger.warning(f"Agent config invalidation hook failed: {e}")
+        if agent_id is None:
+            self._agents.clear()
+            self._configs.clear()
+            return
+        self._agents.pop(agent_id, None)
+        for key in [k for k in self._configs if k[0] == agent_id]:
+            self._configs.pop(key, None)
+
+    def invalidate(self, agent_id: Optional[str] = None, broadcast: bool = True):
+        """
+        Drop an agent (or everything) here and tell the other workers to do the same.
+        Blocks on Redis: for sync endpoints (thread pool); async code uses `invalidate_async()`.
+        """
+        self._drop_local(agent_id)
+        if not broadcast:
+            return
+        try:
+            if not self._publisher:
+                self._publisher = redis.Redis(
+                    host=settings.REDIS_HOST, port=settings.REDIS_PORT,
+                    socket_connect_timeout=PUBLISH_TIMEOUT_SECONDS, socket_timeout=PUBLISH_TIMEOUT_SECONDS,
+                )
+            self._publisher.publish(INVALIDATION_CHANNEL, json.dumps({"agent_id": agent_id}))
+        except Exception as e:
+            # Other workers fall back to TTL expiry
+            logger.warning(f"Agent config invalidation broadcast failed: {e}")
+
+    async def invalidate_async(self, agent_id: Optional[str] = None, broadcast: bool = True):
+        """`invalidate()` for code on the event loop: the broadcast never blocks live sessions."""
+        self._drop_local(agent_id)
+        if not broadcast:
+            return
+        try:
+            if not self._async_publisher:
+                self._async_publisher = aioredis.Redis(
+                    host=settings.REDIS_HOST, port=settings.REDIS_PORT,
+                    socket_connect_timeout=PUBLISH_TIMEOUT_SECONDS, socket_timeout=PUBLISH_TIMEOUT_SECONDS,
+                )
+            await self._async_publisher.publish(INVALIDATION_CHANNEL, json.dumps({"agent_id": agent_id}))
+        except Exception as e:
+            # Other workers fall back to TTL expiry
+            logger.warning(f"Agent config invalidation broadcast failed: {e}")
+
+    def _apply_broadcast(self, data: str):
+        """An invalidation published by `invalidate()` on some worker."""
+        try:
+            agent_id = json.loads(data).get("agent_id")
+        except (json.JSONDecodeError, AttributeError):
+            return
+        self._drop_local(agent_id)
+        logger.debug(f"Agent config cache invalidated: {agent_id or 'all'}")
+
+    async def listen_for_invalidations(self):
+        """Background task: apply invalidations published by other workers (reconnects on failure)."""
+        while True:
+            client = aioredis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were disconnected is lost: reload configs, but keep
+                # derived caches (their own TTLs bound how long a missed invalidation lasts)
+                self._drop_local(notify=False)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._apply_broadcast(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Agent config invalidation listener error, retrying: {e}")
+            finally:
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(5)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "agents": len(self._agents),
+            "configs": len(self._configs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Singleton
+agent_config_cache = AgentConfigCache(ttl_seconds=settings.AGENT_CONFIG_CACHE_TTL_SECONDS)
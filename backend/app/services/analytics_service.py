@@ -1,8 +1,8 @@
 """
 Analytics service for tracking platform performance and observability.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, extract
+from sqlalchemy import select, func, desc, extract
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from app.models.analytics import CallLog
@@ -15,7 +15,7 @@ import hmac
 from app.core.config import settings
 
 class AnalyticsService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.classifier_llm = GroqLLM(model="llama-3.1-8b-instant")
 
@@ -53,10 +53,11 @@ class AnalyticsService:
             outcome=outcome,
             outcome_reason=outcome_reason,
             transcript=redacted_transcript,
+            metadata_json=session_data.get("metadata", {}),
             signature=signature
         )
         self.db.add(call_log)
-        self.db.commit()
+        await self.db.commit()
         return call_log
 
     def sign_transcript(self, transcript: List[Dict[str, Any]], session_id: str) -> str:
@@ -109,13 +110,20 @@ class AnalyticsService:
 
     async def get_overview_stats(self) -> Dict[str, Any]:
         """Get high-level statistics for the dashboard."""
-        total_calls = self.db.query(func.count(CallLog.id)).scalar()
-        total_duration = self.db.query(func.sum(CallLog.duration_seconds)).scalar() or 0
-        avg_latency = self.db.query(func.avg(CallLog.avg_latency_ms)).scalar() or 0
-        total_cost = self.db.query(func.sum(CallLog.estimated_cost)).scalar() or 0
+        total_calls, total_duration, avg_latency, total_cost = (await self.db.execute(
+            select(
+                func.count(CallLog.id),
+                func.sum(CallLog.duration_seconds),
+                func.avg(CallLog.avg_latency_ms),
+                func.sum(CallLog.estimated_cost),
+            )
+        )).one()
+        total_duration = total_duration or 0
+        avg_latency = avg_latency or 0
+        total_cost = total_cost or 0
         
         # Success rate (based on AI outcome classification)
-        successful_calls = self.db.query(func.count(CallLog.id)).filter(CallLog.outcome == "SUCCESS").scalar()
+        successful_calls = await self.db.scalar(select(func.count(CallLog.id)).filter(CallLog.outcome == "SUCCESS"))
         success_rate = (successful_calls / total_calls * 100) if total_calls > 0 else 0
         
         return {
@@ -130,24 +138,28 @@ class AnalyticsService:
         """Get call volume grouped by day."""
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        results = self.db.query(
-            func.date(CallLog.start_time).label('date'),
-            func.count(CallLog.id).label('count')
-        ).filter(CallLog.start_time >= start_date)\
-         .group_by(func.date(CallLog.start_time))\
-         .order_by('date').all()
+        results = (await self.db.execute(
+            select(
+                func.date(CallLog.start_time).label('date'),
+                func.count(CallLog.id).label('count')
+            ).filter(CallLog.start_time >= start_date)
+            .group_by(func.date(CallLog.start_time))
+            .order_by('date')
+        )).all()
          
         return [{"date": str(r.date), "count": r.count} for r in results]
 
     async def get_agent_performance(self) -> List[Dict[str, Any]]:
         """Compare performance across different agents."""
-        results = self.db.query(
-            Agent.name,
-            func.count(CallLog.id).label('calls'),
-            func.avg(CallLog.duration_seconds).label('avg_duration'),
-            func.avg(CallLog.avg_latency_ms).label('avg_latency')
-        ).join(CallLog, Agent.id == CallLog.agent_id)\
-         .group_by(Agent.name).all()
+        results = (await self.db.execute(
+            select(
+                Agent.name,
+                func.count(CallLog.id).label('calls'),
+                func.avg(CallLog.duration_seconds).label('avg_duration'),
+                func.avg(CallLog.avg_latency_ms).label('avg_latency')
+            ).join(CallLog, Agent.id == CallLog.agent_id)
+            .group_by(Agent.name)
+        )).all()
          
         return [{
             "name": r.name,
@@ -159,7 +171,7 @@ class AnalyticsService:
     async def get_compliance_report(self, session_id: str) -> Dict[str, Any]:
         """Generate a summarized compliance audit report for a session."""
         from app.models.compliance import AuditLog
-        audits = self.db.query(AuditLog).filter(AuditLog.session_id == session_id).all()
+        audits = (await self.db.execute(select(AuditLog).filter(AuditLog.session_id == session_id))).scalars().all()
         
         violations = []
         for a in audits:
@@ -178,18 +190,27 @@ class AnalyticsService:
         """Get statistics for shadow model comparisons."""
         from app.models.analytics import ShadowLog
         
-        avg_sim = self.db.query(func.avg(ShadowLog.similarity_score)).scalar() or 0
-        total_shadow_runs = self.db.query(func.count(ShadowLog.id)).scalar()
-        avg_primary_lat = self.db.query(func.avg(ShadowLog.primary_latency_ms)).scalar() or 0
-        avg_shadow_lat = self.db.query(func.avg(ShadowLog.shadow_latency_ms)).scalar() or 0
+        avg_sim, total_shadow_runs, avg_primary_lat, avg_shadow_lat = (await self.db.execute(
+            select(
+                func.avg(ShadowLog.similarity_score),
+                func.count(ShadowLog.id),
+                func.avg(ShadowLog.primary_latency_ms),
+                func.avg(ShadowLog.shadow_latency_ms),
+            )
+        )).one()
+        avg_sim = avg_sim or 0
+        avg_primary_lat = avg_primary_lat or 0
+        avg_shadow_lat = avg_shadow_lat or 0
         
         # Performance by model pair
-        model_pairs = self.db.query(
-            ShadowLog.primary_model,
-            ShadowLog.shadow_model,
-            func.avg(ShadowLog.similarity_score).label("avg_similarity"),
-            func.count(ShadowLog.id).label("count")
-        ).group_by(ShadowLog.primary_model, ShadowLog.shadow_model).all()
+        model_pairs = (await self.db.execute(
+            select(
+                ShadowLog.primary_model,
+                ShadowLog.shadow_model,
+                func.avg(ShadowLog.similarity_score).label("avg_similarity"),
+                func.count(ShadowLog.id).label("count")
+            ).group_by(ShadowLog.primary_model, ShadowLog.shadow_model)
+        )).all()
         
         return {
             "avg_similarity": round(avg_sim, 4),
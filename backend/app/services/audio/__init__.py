@@ -0,0 +1,11 @@
+# Audio processing & transport module
+from .frames import AudioFrame, AudioFrameType, AudioFormat, FrameError, encode_frame, decode_frame
+from .transport import AudioTransport
+from .codec import (
+    Resampler, Packetizer, resample, ulaw_encode, ulaw_decode, alaw_encode, alaw_decode,
+    pcm16_to_wav, pcm16_to_telephony, telephony_to_pcm16, OPUS_AVAILABLE,
+)
+from .vad import VADSettings, VADEvent, VADEventType, VoiceActivityDetector
+from .jitter import JitterBuffer
+from .ring_buffer import AudioRingBuffer
+from .twilio_transport import TwilioMediaTransport
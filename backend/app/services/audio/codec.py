@@ -0,0 +1,299 @@
+"""
+Vectorized audio conversion between browser, telephony and provider formats.
+
+- G.711 μ-law / A-law encode and decode (bit-exact with the ITU/Sun reference,
+  through precomputed lookup tables)
+- PCM16 resampling between 8/16/24/48 kHz (polyphase windowed-sinc FIR; the
+  stateful `Resampler` carries filter history across streamed chunks)
+- fixed-duration packetization (e.g. 20 ms telephony frames)
+- WAV wrapping, and Opus when `opuslib` is installed
+
+Inputs may be `bytes`, `bytearray` or `memoryview` (e.g. a decoded websocket
+frame payload); PCM is read in place with `np.frombuffer`, without a copy.
+PCM16 is little-endian signed 16-bit mono throughout. See bench_audio_codec.py.
+"""
+import io
+import wave
+from math import gcd
+from typing import Iterator, List, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import opuslib  # noqa: F401  (optional Opus support)
+    OPUS_AVAILABLE = True
+except ImportError:
+    OPUS_AVAILABLE = False
+
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 24000, 48000)
+TELEPHONY_SAMPLE_RATE = 8000
+PCM16_WIDTH = 2
+
+_PCM16 = np.dtype("<i2")
+
+
+def pcm16_array(data: Union[Buffer, np.ndarray]) -> np.ndarray:
+    """Read-only int16 view over a PCM16 buffer (no copy)."""
+    if isinstance(data, np.ndarray):
+        return data.astype(_PCM16, copy=False)
+    if len(data) % PCM16_WIDTH:
+        raise ValueError("PCM16 buffer length must be a multiple of 2")
+    return np.frombuffer(data, dtype=_PCM16)
+
+
+# -- G.711 --------------------------------------------------------------------
+
+_ULAW_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEG_END = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 8159
+
+
+def _build_ulaw_encode_table() -> np.ndarray:
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+    seg = np.searchsorted(_ULAW_SEG_END, magnitude)
+    value = (seg << 4) | ((magnitude >> (seg + 1)) & 0x0F)
+    value = np.where(seg >= 8, 0x7F, value)
+    return (value ^ mask).astype(np.uint8)
+
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0x0F) << 3) + _ULAW_BIAS) << ((u & 0x70) >> 4)
+    return np.where(u & 0x80, _ULAW_BIAS - t, t - _ULAW_BIAS).astype(_PCM16)
+
+
+def _build_alaw_encode_table() -> np.ndarray:
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    magnitude = np.where(pcm >= 0, pcm, -pcm - 1)
+    seg = np.searchsorted(_ALAW_SEG_END, magnitude)
+    shift = np.where(seg < 2, 1, seg)
+    value = (seg << 4) | ((magnitude >> shift) & 0x0F)
+    value = np.where(seg >= 8, 0x7F, value)
+    return (value ^ mask).astype(np.uint8)
+
+
+def _build_alaw_decode_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    seg = (a & 0x70) >> 4
+    t = (a & 0x0F) << 4
+    t = np.where(seg == 0, t + 8, t + 0x108)
+    t = np.where(seg > 1, t << np.maximum(seg - 1, 0), t)
+    return np.where(a & 0x80, t, -t).astype(_PCM16)
+
+
+# Encode tables are indexed by the sample's unsigned 16-bit pattern (offset by 32768)
+_ULAW_ENCODE = _build_ulaw_encode_table()
+_ULAW_DECODE = _build_ulaw_decode_table()
+_ALAW_ENCODE = _build_alaw_encode_table()
+_ALAW_DECODE = _build_alaw_decode_table()
+
+
+def _table_index(pcm: np.ndarray) -> np.ndarray:
+    return pcm.view(np.uint16) ^ 0x8000
+
+
+def ulaw_encode(pcm: Union[Buffer, np.ndarray]) -> bytes:
+    return _ULAW_ENCODE[_table_index(pcm16_array(pcm))].tobytes()
+
+
+def ulaw_decode(data: Buffer) -> np.ndarray:
+    return _ULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def alaw_encode(pcm: Union[Buffer, np.ndarray]) -> bytes:
+    return _ALAW_ENCODE[_table_index(pcm16_array(pcm))].tobytes()
+
+
+def alaw_decode(data: Buffer) -> np.ndarray:
+    return _ALAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+# -- Resampling ---------------------------------------------------------------
+
+class Resampler:
+    """
+    Streaming PCM16 sample-rate converter (polyphase FIR, ratio L/M).
+    The low-pass spans `taps_per_phase` samples of the lower rate, so the voice
+    band survives and out-of-band energy does not alias back into it. The last
+    input samples are kept between calls, so chunk boundaries are seamless;
+    output is delayed by half the filter span (about 2 ms at the default).
+
+    Usage:
+        upsampler = Resampler(8000, 16000)
+        for chunk in caller_audio:
+            pcm_16k = upsampler.process(chunk)
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, taps_per_phase: int = 32):
+        for rate in (src_rate, dst_rate):
+            if rate not in SUPPORTED_SAMPLE_RATES:
+                raise ValueError(f"Unsupported sample rate {rate}; expected one of {SUPPORTED_SAMPLE_RATES}")
+        divisor = gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.up = dst_rate // divisor
+        self.down = src_rate // divisor
+        # Decimating filters need proportionally more input samples for the same span
+        self.taps = taps_per_phase * -(-self.down // self.up)
+        self._phases = self._design(self.up, self.down, self.taps)
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._offset = (self.taps - 1) * self.up  # Next output position, in upsampled samples
+
+    @staticmethod
+    def _design(up: int, down: int, taps: int) -> np.ndarray:
+        """Kaiser-windowed sinc low-pass split into `up` phases of `taps` coefficients."""
+        length = up * taps
+        cutoff = 0.5 / max(up, down) * 0.92  # Cycles per upsampled sample, with a transition band
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 6.0)
+        h *= up / h.sum()
+        # phases[p, taps - 1 - j] weights input x[i - j] for an output at upsampled position i * up + p,
+        # i.e. each phase is reversed so it lines up with the forward window x[i - taps + 1 : i + 1]
+        return h.reshape(taps, up).T[:, ::-1].astype(np.float32).copy()
+
+    def process(self, pcm: Union[Buffer, np.ndarray]) -> np.ndarray:
+        samples = pcm16_array(pcm)
+        if self.up == self.down:
+            return samples
+        if not len(samples):
+            return np.zeros(0, dtype=_PCM16)
+
+        buffer = np.concatenate((self._history, samples.astype(np.float32)))
+        end = len(buffer) * self.up
+        count = max(0, -(-(end - self._offset) // self.down))
+        # windows[k] = buffer[k:k + taps] (a strided view, no copy)
+        windows = sliding_window_view(buffer, self.taps)
+        out = np.empty(count, dtype=np.float32)
+        # Phases repeat every `up` outputs, and those outputs advance `down` input samples each:
+        # one strided matrix-vector product per phase
+        for first in range(min(self.up, count)):
+            position = self._offset + first * self.down
+            start = position // self.up - (self.taps - 1)
+            n = len(range(first, count, self.up))
+            out[first::self.up] = windows[start:start + (n - 1) * self.down + 1:self.down] @ self._phases[position % self.up]
+
+        consumed = len(buffer) - (self.taps - 1)
+        self._offset += count * self.down - consumed * self.up
+        self._history = buffer[consumed:]
+        return np.clip(np.rint(out), -32768, 32767).astype(_PCM16)
+
+    def reset(self):
+        self._history[:] = 0
+        self._offset = (self.taps - 1) * self.up
+
+
+def resample(pcm: Union[Buffer, np.ndarray], src_rate: int, dst_rate: int) -> np.ndarray:
+    """One-shot resampling of a complete clip."""
+    return Resampler(src_rate, dst_rate).process(pcm)
+
+
+# -- Packetization ------------------------------------------------------------
+
+def frame_bytes(sample_rate: int, frame_ms: int = 20, sample_width: int = PCM16_WIDTH) -> int:
+    return sample_rate * frame_ms // 1000 * sample_width
+
+
+def iter_frames(data: Buffer, frame_size: int, pad: bool = False) -> Iterator[memoryview]:
+    """Fixed-size slices of a complete buffer, as zero-copy memoryviews."""
+    view = memoryview(data).cast("B")
+    whole = len(view) - len(view) % frame_size
+    for start in range(0, whole, frame_size):
+        yield view[start:start + frame_size]
+    if pad and whole < len(view):
+        yield memoryview(bytes(view[whole:]).ljust(frame_size, b"\x00"))
+
+
+class Packetizer:
+    """
+    Regroups a stream of arbitrarily sized chunks into fixed-size packets,
+    e.g. 160-byte / 20 ms μ-law frames for telephony.
+    """
+
+    def __init__(self, frame_size: int, silence: bytes = b"\x00"):
+        self.frame_size = frame_size
+        self.silence = silence
+        self._pending = bytearray()
+
+    def push(self, data: Buffer) -> List[bytes]:
+        self._pending += data
+        whole = len(self._pending) - len(self._pending) % self.frame_size
+        if not whole:
+            return []
+        view = memoryview(self._pending)
+        packets = [bytes(view[start:start + self.frame_size]) for start in range(0, whole, self.frame_size)]
+        view.release()
+        del self._pending[:whole]
+        return packets
+
+    def flush(self, pad: bool = True) -> List[bytes]:
+        """Emit the remainder, padded with silence to a full packet unless `pad` is False."""
+        if not self._pending:
+            return []
+        packet = bytes(self._pending)
+        self._pending.clear()
+        if pad:
+            packet += self.silence * (self.frame_size - len(packet))
+        return [packet]
+
+
+# -- Containers and compressed codecs -----------------------------------------
+
+def pcm16_to_wav(pcm: Buffer, sample_rate: int, channels: int = 1) -> bytes:
+    """Wraps raw PCM audio into WAV for browser-friendly playback."""
+    with io.BytesIO() as wav_buffer:
+        with wave.open(wav_buffer, "wb") as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(PCM16_WIDTH)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+        return wav_buffer.getvalue()
+
+
+def pcm16_to_telephony(pcm: Union[Buffer, np.ndarray], src_rate: int, resampler: Resampler = None) -> bytes:
+    """Provider PCM16 -> 8 kHz μ-law. Pass a per-call `resampler` when streaming."""
+    resampler = resampler or Resampler(src_rate, TELEPHONY_SAMPLE_RATE)
+    return ulaw_encode(resampler.process(pcm))
+
+
+def telephony_to_pcm16(ulaw: Buffer, dst_rate: int, resampler: Resampler = None) -> np.ndarray:
+    """8 kHz μ-law -> PCM16 at `dst_rate`. Pass a per-call `resampler` when streaming."""
+    resampler = resampler or Resampler(TELEPHONY_SAMPLE_RATE, dst_rate)
+    return resampler.process(ulaw_decode(ulaw))
+
+
+class OpusEncoder:
+    """PCM16 -> Opus packets (one per `frame_ms` frame). Requires `opuslib`."""
+
+    def __init__(self, sample_rate: int = 48000, frame_ms: int = 20, application: str = "voip"):
+        if not OPUS_AVAILABLE:
+            raise RuntimeError("Opus support requires the opuslib package")
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._encoder = opuslib.Encoder(sample_rate, 1, application)
+        self._packetizer = Packetizer(self.frame_samples * PCM16_WIDTH)
+
+    def encode(self, pcm: Buffer) -> List[bytes]:
+        return [self._encoder.encode(frame, self.frame_samples) for frame in self._packetizer.push(pcm)]
+
+    def flush(self) -> List[bytes]:
+        return [self._encoder.encode(frame, self.frame_samples) for frame in self._packetizer.flush()]
+
+
+class OpusDecoder:
+    """Opus packets -> PCM16. Requires `opuslib`."""
+
+    def __init__(self, sample_rate: int = 48000, frame_ms: int = 20):
+        if not OPUS_AVAILABLE:
+            raise RuntimeError("Opus support requires the opuslib package")
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+
+    def decode(self, packet: Buffer) -> bytes:
+        return self._decoder.decode(bytes(packet), self.frame_samples)
@@ -0,0 +1,105 @@
+"""
+Binary audio frame protocol for the orchestrator websocket.
+
+Every binary websocket message is a fixed 10-byte big-endian header followed
+by the raw audio bytes (no base64):
+
+    offset  size  field
+    0       2     magic   b"OV"
+    2       1     version (1)
+    3       1     frame type (AudioFrameType)
+    4       1     audio format (AudioFormat)
+    5       1     flags (bit 0: end of utterance / segment)
+    6       4     sequence number (uint32, per direction)
+    10      ...   payload
+"""
+import struct
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+FRAME_MAGIC = b"OV"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct(">2sBBBBI")
+HEADER_SIZE = FRAME_HEADER.size
+
+FLAG_END = 0x01
+
+
+class FrameError(ValueError):
+    """Raised when a binary message is not a valid audio frame."""
+
+
+class AudioFrameType(IntEnum):
+    OUTPUT_AUDIO = 1   # Server -> client synthesized speech
+    INPUT_AUDIO = 2    # Client -> server caller audio
+
+
+class AudioFormat(IntEnum):
+    WAV = 1
+    PCM16 = 2
+    MULAW = 3
+    WEBM = 4
+    MP3 = 5
+    OPUS = 6
+
+    @property
+    def mimetype(self) -> str:
+        return {
+            AudioFormat.WAV: "audio/wav",
+            AudioFormat.PCM16: "audio/l16",
+            AudioFormat.MULAW: "audio/basic",
+            AudioFormat.WEBM: "audio/webm",
+            AudioFormat.MP3: "audio/mpeg",
+            AudioFormat.OPUS: "audio/opus",
+        }[self]
+
+
+@dataclass
+class AudioFrame:
+    frame_type: AudioFrameType
+    audio_format: AudioFormat
+    seq: int
+    flags: int
+    payload: memoryview
+
+    @property
+    def is_end(self) -> bool:
+        return bool(self.flags & FLAG_END)
+
+
+def encode_frame(
+    payload: bytes,
+    frame_type: AudioFrameType = AudioFrameType.OUTPUT_AUDIO,
+    audio_format: AudioFormat = AudioFormat.WAV,
+    seq: int = 0,
+    flags: int = 0,
+) -> bytes:
+    """Prefix raw audio with the frame header (a single copy of the payload)."""
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC, FRAME_VERSION, int(frame_type), int(audio_format), flags, seq & 0xFFFFFFFF
+    )
+    return header + payload
+
+
+def decode_frame(data: bytes) -> AudioFrame:
+    """Parse a binary message. The payload is a zero-copy view into `data`."""
+    if len(data) < HEADER_SIZE:
+        raise FrameError(f"Frame too short ({len(data)} bytes)")
+
+    magic, version, frame_type, audio_format, flags, seq = FRAME_HEADER.unpack_from(data, 0)
+    if magic != FRAME_MAGIC:
+        raise FrameError("Invalid frame magic")
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+
+    try:
+        return AudioFrame(
+            frame_type=AudioFrameType(frame_type),
+            audio_format=AudioFormat(audio_format),
+            seq=seq,
+            flags=flags,
+            payload=memoryview(data)[HEADER_SIZE:],
+        )
+    except ValueError as e:
+        raise FrameError(str(e)) from e
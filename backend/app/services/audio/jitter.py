@@ -0,0 +1,68 @@
+"""
+Inbound jitter buffer for timestamped telephony audio (e.g. Twilio media frames).
+
+Frames are released in timestamp order once contiguous. A frame that is still
+missing when `depth` later frames are waiting is concealed with silence, so
+downstream timing (VAD hangover, STT endpointing) stays true to the call even
+when the network drops or bunches packets. Frames older than what was already
+released are dropped.
+"""
+from typing import Dict, List, Optional
+
+
+class JitterBuffer:
+    def __init__(self, sample_rate: int = 8000, sample_width: int = 1, silence: bytes = b"\xff", depth: int = 3):
+        self.bytes_per_ms = sample_rate * sample_width / 1000
+        self.sample_width = sample_width
+        self.silence = silence
+        self.depth = depth
+        self._pending: Dict[int, bytes] = {}   # Byte offset in the stream -> payload
+        self._next: Optional[int] = None
+        self.released_frames = 0
+        self.late_frames = 0
+        self.concealed_bytes = 0
+
+    def _offset(self, timestamp_ms: float) -> int:
+        offset = int(round(timestamp_ms * self.bytes_per_ms))
+        return offset - offset % self.sample_width
+
+    def push(self, timestamp_ms: float, payload: bytes) -> List[bytes]:
+        """Add a frame stamped with its stream time; returns the audio now ready, in order."""
+        offset = self._offset(timestamp_ms)
+        if self._next is None:
+            self._next = offset
+        if offset < self._next:
+            self.late_frames += 1
+            return []
+        self._pending[offset] = payload
+        return self._release(force=False)
+
+    def flush(self) -> List[bytes]:
+        """Release everything still held, concealing any gaps."""
+        return self._release(force=True)
+
+    def _release(self, force: bool) -> List[bytes]:
+        out = []
+        while self._pending:
+            payload = self._pending.pop(self._next, None)
+            if payload is None:
+                if not force and len(self._pending) < self.depth:
+                    break
+                # Give up on the missing frame: silence up to the earliest one we have
+                gap = min(self._pending) - self._next
+                out.append(self.silence * (gap // len(self.silence)))
+                self.concealed_bytes += gap
+                self._next += gap
+                continue
+            out.append(payload)
+            self._next += len(payload)
+            self.released_frames += 1
+        return out
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "released_frames": self.released_frames,
+            "late_frames": self.late_frames,
+            "concealed_ms": round(self.concealed_bytes / self.bytes_per_ms, 1),
+            "buffered_frames": len(self._pending),
+        }
@@ -0,0 +1,126 @@
+"""
+Fixed-capacity ring buffer for one session's raw caller audio.
+
+Frames are copied into a single preallocated `bytearray` instead of living on
+as separate `bytes` objects. Positions are absolute byte offsets in the
+caller's stream, so readers keep their own cursors and the buffer keeps no
+per-reader state:
+
+- STT gets the view of each frame as it is written
+- VAD reads whole frames from its own cursor (`VoiceActivityDetector.process_buffered`)
+- re-recognition reads the last utterance by stream time (`window_ms`, `last_ms`)
+
+The storage is mirrored: every byte is written at `i` and `i + capacity`, so
+any window of up to `capacity` bytes is one contiguous `memoryview` and no
+read ever copies, whether or not it crosses the wrap point. A view stays valid
+until `capacity` more bytes have been written; consumers that hold audio
+longer than that must copy it.
+"""
+from typing import Any, Dict, Optional
+
+from .codec import TELEPHONY_SAMPLE_RATE, pcm16_to_wav, ulaw_decode
+
+# Raw caller formats that can be windowed at any byte offset: (sample rate, sample width)
+RAW_CALLER_FORMATS = {"audio/l16": (16000, 2), "audio/basic": (TELEPHONY_SAMPLE_RATE, 1)}
+
+
+class AudioRingBuffer:
+    """
+    Usage:
+        ring = AudioRingBuffer.for_mimetype("audio/basic", seconds=10)
+        frame = ring.write(payload)        # View of the frame just written
+        recent = ring.last_ms(2000)        # Last 2 s
+        utterance = ring.window_ms(start_ms, end_ms)
+        wav = ring.to_wav(utterance)       # Copy, e.g. for batch re-recognition
+    """
+
+    def __init__(self, capacity: int, sample_rate: int = 16000, sample_width: int = 2, mimetype: str = "audio/l16"):
+        capacity -= capacity % sample_width
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must hold at least one sample")
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.mimetype = mimetype
+        self.bytes_per_ms = sample_rate * sample_width / 1000
+        self._storage = bytearray(2 * capacity)
+        self._view = memoryview(self._storage)
+        self.position = 0        # Bytes written since the stream started
+        self.overwritten = 0     # Bytes that fell out of the window
+
+    @classmethod
+    def for_mimetype(cls, mimetype: Optional[str], seconds: float) -> Optional["AudioRingBuffer"]:
+        """A buffer holding `seconds` of a raw caller format, or None for compressed audio."""
+        layout = RAW_CALLER_FORMATS.get(mimetype or "")
+        if not layout or seconds <= 0:
+            return None
+        rate, width = layout
+        return cls(int(rate * width * seconds), sample_rate=rate, sample_width=width, mimetype=mimetype)
+
+    @property
+    def oldest(self) -> int:
+        """Position of the oldest byte still held."""
+        return max(0, self.position - self.capacity)
+
+    def __len__(self) -> int:
+        return self.position - self.oldest
+
+    def write(self, data) -> memoryview:
+        """Append caller audio (any bytes-like); returns a view of what was written."""
+        data = memoryview(data).cast("B")
+        size = len(data)
+        if not size:
+            return self._view[0:0]
+        oldest = self.oldest
+        if size > self.capacity:
+            # Only the newest `capacity` bytes survive anyway
+            self.position += size - self.capacity
+            data, size = data[size - self.capacity:], self.capacity
+
+        view, capacity = self._view, self.capacity
+        start = self.position % capacity
+        end = start + size
+        view[start:end] = data
+        if end <= capacity:
+            view[start + capacity:end + capacity] = data
+        else:
+            # Crossed into the mirror half: copy each side onto the other
+            view[start + capacity:] = view[start:capacity]
+            view[:end - capacity] = view[capacity:end]
+        self.position += size
+        self.overwritten += self.oldest - oldest
+        return view[start:end]
+
+    def window(self, start: int, end: Optional[int] = None) -> memoryview:
+        """Zero-copy view of stream bytes [start, end); clamped to what is still held."""
+        end = self.position if end is None else min(end, self.position)
+        start = max(start, self.oldest)
+        if end <= start:
+            return self._view[0:0]
+        offset = start % self.capacity
+        return self._view[offset:offset + end - start]
+
+    def window_ms(self, start_ms: float, end_ms: Optional[float] = None) -> memoryview:
+        """`window()` in stream time (e.g. the `at_ms` of VAD events)."""
+        return self.window(self.offset_at(start_ms), None if end_ms is None else self.offset_at(end_ms))
+
+    def last_ms(self, ms: float) -> memoryview:
+        """The most recent `ms` of audio."""
+        return self.window(self.position - self.offset_at(ms))
+
+    def to_wav(self, window: memoryview) -> bytes:
+        """A window as a PCM16 WAV file (μ-law is decoded). Copies, so it outlives the window."""
+        pcm = ulaw_decode(window) if self.mimetype == "audio/basic" else window
+        return pcm16_to_wav(pcm, self.sample_rate)
+
+    def offset_at(self, ms: float) -> int:
+        offset = int(ms * self.bytes_per_ms)
+        return offset - offset % self.sample_width
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity_ms": round(self.capacity / self.bytes_per_ms),
+            "buffered_ms": round(len(self) / self.bytes_per_ms),
+            "written_ms": round(self.position / self.bytes_per_ms),
+            "overwritten_bytes": self.overwritten,
+        }
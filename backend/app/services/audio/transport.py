@@ -0,0 +1,127 @@
+"""
+Per-session websocket transport that hides the negotiated audio encoding.
+
+Clients opt into binary audio with `?audio_transport=binary`; everyone else keeps
+the legacy JSON protocol (`{"type": "audio", "data": <base64>}`).
+"""
+import base64
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from loguru import logger
+
+from .frames import AudioFormat, AudioFrameType, FrameError, FLAG_END, decode_frame, encode_frame
+
+
+AUDIO_TRANSPORT_JSON = "json"
+AUDIO_TRANSPORT_BINARY = "binary"
+SUPPORTED_AUDIO_TRANSPORTS = [AUDIO_TRANSPORT_JSON, AUDIO_TRANSPORT_BINARY]
+
+
+class AudioTransport:
+    """Wraps a client websocket; sends/receives audio in the negotiated format."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        mode: Optional[str] = None,
+        default_format: AudioFormat = AudioFormat.WAV,
+    ):
+        self.websocket = websocket
+        self.mode = AUDIO_TRANSPORT_BINARY if mode == AUDIO_TRANSPORT_BINARY else AUDIO_TRANSPORT_JSON
+        self.default_format = default_format
+        self._out_seq = 0
+        self._in_seq: Optional[int] = None
+
+    @property
+    def binary(self) -> bool:
+        return self.mode == AUDIO_TRANSPORT_BINARY
+
+    @property
+    def client_state(self):
+        return self.websocket.client_state
+
+    def describe(self) -> Dict[str, Any]:
+        """Negotiation result, advertised to the client in `session_start`."""
+        return {"audio_transport": self.mode, "audio_transports": SUPPORTED_AUDIO_TRANSPORTS}
+
+    async def send_json(self, payload: Dict[str, Any]):
+        await self.websocket.send_json(payload)
+
+    async def send_audio(
+        self,
+        audio: bytes,
+        audio_format: Optional[AudioFormat] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        end: bool = True,
+    ):
+        """
+        Send synthesized audio to the client.
+        Whole clips keep `end=True`; streamed chunks of a clip pass `end=False` and
+        the clip is closed by a final (possibly empty) frame with `end=True`.
+        """
+        audio_format = audio_format or self.default_format
+
+        if not self.binary:
+            if not audio:
+                return
+            message: Dict[str, Any] = {"type": "audio", "data": base64.b64encode(audio).decode("utf-8")}
+            if metadata:
+                message["metadata"] = metadata
+            await self.websocket.send_json(message)
+            return
+
+        self._out_seq += 1
+        if metadata:
+            # Metadata travels as a small JSON message tied to the frame's sequence number
+            await self.websocket.send_json({"type": "audio_metadata", "seq": self._out_seq, "metadata": metadata})
+        await self.websocket.send_bytes(
+            encode_frame(
+                audio,
+                frame_type=AudioFrameType.OUTPUT_AUDIO,
+                audio_format=audio_format,
+                seq=self._out_seq,
+                flags=FLAG_END if end else 0,
+            )
+        )
+
+    async def interrupt(self):
+        """Barge-in. Browser clients stop their own playback when a new response starts."""
+        return
+
+    async def receive_message(self) -> Optional[Dict[str, Any]]:
+        """
+        Receive the next client message as a dict.
+        Binary frames become `{"type": "audio_frame", "audio_bytes": memoryview, ...}`.
+        Returns None for frames that should be skipped.
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        data = message.get("bytes")
+        if data is not None:
+            try:
+                frame = decode_frame(data)
+            except FrameError as e:
+                logger.warning(f"Dropping malformed audio frame: {e}")
+                return None
+            if frame.frame_type != AudioFrameType.INPUT_AUDIO:
+                logger.warning(f"Unexpected inbound frame type {frame.frame_type.name}")
+                return None
+            if self._in_seq is not None and frame.seq != self._in_seq + 1:
+                logger.debug(f"Inbound audio sequence gap: {self._in_seq} -> {frame.seq}")
+            self._in_seq = frame.seq
+            return {
+                "type": "audio_frame",
+                "audio_bytes": frame.payload,
+                "mimetype": frame.audio_format.mimetype,
+                "seq": frame.seq,
+                "final": frame.is_end,
+            }
+
+        return json.loads(message.get("text") or "{}")
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        await self.websocket.close(code=code, reason=reason)
@@ -0,0 +1,305 @@
+"""
+AudioTransport for Twilio Media Streams (`<Connect><Stream>` websockets).
+
+Lets the native voice session run on phone calls:
+
+- Inbound `media` events (base64 8 kHz μ-law) pass through a jitter buffer and
+  reach the session as raw `audio/basic` frames (streaming STT + server VAD).
+- Outbound TTS clips (WAV or raw PCM16) are resampled to 8 kHz, μ-law encoded,
+  cut into 20 ms frames and paced out at playback speed, a little ahead of the
+  caller's ear. A `mark` follows every clip so we know what has been played.
+- `interrupt()` (barge-in) drops queued frames and sends `clear`, which makes
+  Twilio discard what it has buffered.
+
+Twilio does not understand the JSON messages sent to browser clients; they are dropped.
+"""
+import asyncio
+import base64
+import json
+import struct
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+from loguru import logger
+
+from .codec import TELEPHONY_SAMPLE_RATE, Packetizer, Resampler, frame_bytes, pcm16_array, ulaw_encode
+from .frames import AudioFormat
+from .jitter import JitterBuffer
+
+AUDIO_TRANSPORT_TWILIO = "twilio"
+TWILIO_FRAME_MS = 20
+ULAW_SILENCE = b"\xff"
+
+
+class _ClipDecoder:
+    """PCM16 samples of one synthesized clip arriving in chunks: a WAV stream, or raw PCM16."""
+
+    def __init__(self, default_rate: int):
+        self.default_rate = default_rate
+        self.rate: Optional[int] = None
+        self.channels = 1
+        self.unsupported = False
+        self._header = bytearray()
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> Optional[np.ndarray]:
+        if self.unsupported:
+            return None
+        if self.rate is not None:
+            return self._samples(chunk)
+
+        self._header += chunk
+        header = self._header
+        if len(header) < 12:
+            return None
+        if header[:4] != b"RIFF":
+            if header[:3] == b"ID3" or (header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+                self.unsupported = True  # MP3 from the provider: needs a decoder we do not ship
+                return None
+            self.rate = self.default_rate
+            data, self._header = bytes(header), bytearray()
+            return self._samples(data)
+
+        offset = 12
+        while offset + 8 <= len(header):
+            chunk_id, size = struct.unpack_from("<4sI", header, offset)
+            if chunk_id == b"data":
+                if self.rate is None:
+                    self.unsupported = True
+                    return None
+                data, self._header = bytes(header[offset + 8:]), bytearray()
+                return self._samples(data)  # Streamed WAVs carry a placeholder size: read to the end
+            if offset + 8 + size > len(header):
+                return None
+            if chunk_id == b"fmt ":
+                audio_format, self.channels, rate = struct.unpack_from("<HHI", header, offset + 8)
+                bits = struct.unpack_from("<H", header, offset + 22)[0]
+                if audio_format != 1 or bits != 16:
+                    self.unsupported = True
+                    return None
+                self.rate = rate
+            offset += 8 + size + (size & 1)
+        return None
+
+    def _samples(self, data: bytes) -> Optional[np.ndarray]:
+        frame = 2 * self.channels
+        data = self._carry + data
+        usable = len(data) - len(data) % frame
+        self._carry = data[usable:]
+        if not usable:
+            return None
+        samples = pcm16_array(data[:usable])
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(samples.dtype)
+        return samples
+
+
+class TwilioMediaTransport:
+    """
+    Usage:
+        transport = TwilioMediaTransport(websocket)
+        start = await transport.wait_for_start()
+        ...  # run the voice session with it
+        transport.stop()     # Always, also after the caller hung up
+        await transport.close()
+    """
+
+    binary = True  # Forward TTS chunks as they arrive; no JSON clip framing
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        default_rate: int = 24000,
+        playout_lead_ms: int = 100,
+        jitter_depth: int = 3,
+    ):
+        self.websocket = websocket
+        self.mode = AUDIO_TRANSPORT_TWILIO
+        self.default_format = AudioFormat.WAV
+        self.default_rate = default_rate
+        self.playout_lead = playout_lead_ms / 1000
+        self.stream_sid: Optional[str] = None
+        self.call_sid: Optional[str] = None
+        self.parameters: Dict[str, Any] = {}
+        self.jitter = JitterBuffer(TELEPHONY_SAMPLE_RATE, sample_width=1, silence=ULAW_SILENCE, depth=jitter_depth)
+
+        self._frame_size = frame_bytes(TELEPHONY_SAMPLE_RATE, TWILIO_FRAME_MS, sample_width=1)
+        self._decoder: Optional[_ClipDecoder] = None
+        self._resampler: Optional[Resampler] = None
+        self._packetizer = Packetizer(self._frame_size, silence=ULAW_SILENCE)
+        self._outbound: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._generation = 0        # Bumped by interrupt(): queued frames of older clips are dropped
+        self._play_clock = 0.0      # When the caller will have heard everything sent so far
+        self._pacer: Optional[asyncio.Task] = None
+        self._stopped = False
+        self._marks = 0
+        self.pending_marks: Set[str] = set()
+        self.frames_sent = 0
+        self.clears = 0
+
+    @property
+    def client_state(self):
+        return self.websocket.client_state
+
+    def describe(self) -> Dict[str, Any]:
+        return {"audio_transport": self.mode, "audio_transports": [AUDIO_TRANSPORT_TWILIO]}
+
+    async def wait_for_start(self) -> Dict[str, Any]:
+        """Read the stream until Twilio's `start` event; returns its `start` payload."""
+        while True:
+            message = await self.receive_message()
+            if self.stream_sid:
+                return message
+
+    # -- Inbound --------------------------------------------------------------
+
+    async def receive_message(self) -> Optional[Dict[str, Any]]:
+        """
+        Next Twilio event as a session message: caller audio becomes
+        `{"type": "audio_frame", "audio_bytes": ..., "mimetype": "audio/basic"}`.
+        Returns None for events the session does not need.
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        data = json.loads(message.get("text") or "{}")
+        event = data.get("event")
+
+        if event == "media":
+            media = data.get("media") or {}
+            if media.get("track", "inbound") != "inbound":
+                return None
+            ready = self.jitter.push(float(media.get("timestamp") or 0), base64.b64decode(media.get("payload") or ""))
+            if not ready:
+                return None
+            return {"type": "audio_frame", "audio_bytes": b"".join(ready), "mimetype": "audio/basic"}
+
+        if event == "mark":
+            self.pending_marks.discard((data.get("mark") or {}).get("name"))
+            return None
+
+        if event == "start":
+            start = data.get("start") or {}
+            self.stream_sid = start.get("streamSid") or data.get("streamSid")
+            self.call_sid = start.get("callSid")
+            self.parameters = start.get("customParameters") or {}
+            logger.info(f"Twilio media stream started: {self.stream_sid} (call {self.call_sid})")
+            return start
+
+        if event == "stop":
+            logger.info(f"Twilio media stream stopped: {self.stream_sid}")
+            raise WebSocketDisconnect(1000)
+
+        return None  # connected, dtmf
+
+    # -- Outbound -------------------------------------------------------------
+
+    async def send_json(self, payload: Dict[str, Any]):
+        # Browser protocol messages (text chunks, session/vad events) have no Twilio equivalent
+        return
+
+    async def send_audio(
+        self,
+        audio: bytes,
+        audio_format: Optional[AudioFormat] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        end: bool = True,
+    ):
+        """Queue synthesized audio for paced playback; `end=True` closes the clip with a mark."""
+        if self._decoder is None:
+            self._decoder = _ClipDecoder(self.default_rate)
+            self._resampler = None
+        if audio:
+            samples = self._decoder.feed(audio)
+            if self._decoder.unsupported:
+                logger.warning("Dropping TTS audio Twilio cannot play: expected PCM16 WAV or raw PCM16")
+            elif samples is not None and len(samples):
+                self._queue_pcm(samples)
+        if end:
+            if self._resampler is not None:
+                # Push the filter's delay line out so the clip does not lose its last milliseconds
+                self._queue_pcm(np.zeros(self._resampler.taps, dtype=np.int16))
+            for frame in self._packetizer.flush():
+                self._enqueue("media", frame)
+            self._marks += 1
+            self._enqueue("mark", f"clip-{self._marks}")
+            self._decoder = None
+
+    def _queue_pcm(self, samples: np.ndarray):
+        if self._resampler is None:
+            try:
+                self._resampler = Resampler(self._decoder.rate, TELEPHONY_SAMPLE_RATE)
+            except ValueError as e:
+                logger.warning(f"Dropping TTS audio for Twilio: {e}")
+                self._decoder.unsupported = True
+                return
+        for frame in self._packetizer.push(ulaw_encode(self._resampler.process(samples))):
+            self._enqueue("media", frame)
+
+    def _enqueue(self, kind: str, payload):
+        if self._stopped:
+            return
+        if self._pacer is None or self._pacer.done():
+            self._pacer = asyncio.create_task(self._pace())
+        self._outbound.put_nowait((self._generation, kind, payload))
+
+    async def _pace(self):
+        try:
+            await self._pace_frames()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Twilio pacer stopped: {e}")
+
+    async def _pace_frames(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            generation, kind, payload = await self._outbound.get()
+            if generation != self._generation:
+                continue
+            if kind == "mark":
+                self.pending_marks.add(payload)
+                await self._send_event("mark", mark={"name": payload})
+                continue
+            now = loop.time()
+            self._play_clock = max(self._play_clock, now)
+            ahead = self._play_clock - now
+            if ahead > self.playout_lead:
+                await asyncio.sleep(ahead - self.playout_lead)
+                if generation != self._generation:
+                    continue  # Barge-in while we waited
+            await self._send_event("media", media={"payload": base64.b64encode(payload).decode("ascii")})
+            self.frames_sent += 1
+            self._play_clock += TWILIO_FRAME_MS / 1000
+
+    async def _send_event(self, event: str, **fields):
+        if not self.stream_sid:
+            return
+        await self.websocket.send_json({"event": event, "streamSid": self.stream_sid, **fields})
+
+    async def interrupt(self):
+        """Barge-in: stop the agent's speech, including what Twilio has already buffered."""
+        self._generation += 1
+        while not self._outbound.empty():
+            self._outbound.get_nowait()
+        self._decoder = None
+        self._resampler = None
+        self._packetizer.flush(pad=False)
+        self._play_clock = 0.0
+        self.pending_marks.clear()
+        self.clears += 1
+        await self._send_event("clear")
+
+    def stop(self):
+        """Stop outbound playback for good. Idempotent; safe once the websocket is gone."""
+        if self._stopped:
+            return
+        self._stopped = True
+        if self._pacer:
+            self._pacer.cancel()  # Otherwise it waits on the empty queue forever, holding the websocket
+        logger.info(f"Twilio stream {self.stream_sid}: {self.frames_sent} frames sent, {self.clears} clears, jitter {self.jitter.stats()}")
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        self.stop()
+        await self.websocket.close(code=code, reason=reason)
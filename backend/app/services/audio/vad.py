@@ -0,0 +1,166 @@
+"""
+Server-side voice activity detection and endpointing on PCM16 caller audio.
+
+Per-frame features (energy in dBFS and zero-crossing rate) are computed for
+every complete frame of a chunk at once in NumPy; a small state machine then
+walks the frames:
+
+    SILENCE --(speech for start_ms)--> SPEECH   emits SPEECH_START (barge-in)
+    SPEECH --(silence for end_silence_ms)--> SILENCE   emits SPEECH_END (endpoint)
+
+A frame is speech when it is above both the absolute `energy_threshold_db`
+and the tracked noise floor by `noise_margin_db`, and its zero-crossing rate
+is below `max_zcr` (broadband noise crosses zero far more often than voiced
+speech); very loud frames count as speech whatever their ZCR, so fricatives
+inside a word do not end it early.
+
+Per-agent tuning via `agent.config["vad"]`, e.g.
+    {"end_silence_ms": 500, "energy_threshold_db": -40}
+"""
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.agent_settings import from_agent_config, setting
+
+from .codec import pcm16_array, ulaw_decode
+from .ring_buffer import AudioRingBuffer
+
+# Raw caller formats VAD can run on, with their sample rates
+VAD_INPUT_RATES = {"audio/l16": 16000, "audio/basic": 8000}
+
+
+@dataclass
+class VADSettings:
+    enabled: bool = True
+    frame_ms: int = setting(20, minimum=5, maximum=100)
+    energy_threshold_db: float = setting(-45.0, minimum=-100.0, maximum=0.0)  # Absolute floor for speech (dBFS)
+    noise_margin_db: float = setting(12.0, minimum=0.0)     # Speech must exceed the tracked noise floor by this much
+    loud_margin_db: float = setting(20.0, minimum=0.0)      # Frames this far above the threshold are speech regardless of ZCR
+    max_zcr: float = setting(0.35, minimum=0.0, maximum=1.0)  # Zero crossings per sample above which a frame looks like noise
+    start_ms: int = setting(100, minimum=0)                 # Continuous speech needed to start an utterance (barge-in guard)
+    end_silence_ms: int = setting(400, minimum=0)           # Hangover: silence that ends an utterance
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "VADSettings":
+        """Read `config["vad"]`; invalid keys keep their defaults."""
+        return from_agent_config(cls, config, "vad")
+
+
+class VADEventType(IntEnum):
+    SPEECH_START = 1
+    SPEECH_END = 2
+
+
+@dataclass
+class VADEvent:
+    kind: VADEventType
+    at_ms: float             # Stream time of the event (start of speech / end of the hangover)
+    speech_ms: float = 0.0   # SPEECH_END: length of the utterance, hangover excluded
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"event": self.kind.name.lower(), "at_ms": round(self.at_ms, 1), "speech_ms": round(self.speech_ms, 1)}
+
+
+def frame_features(samples: np.ndarray, frame_len: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Energy (dBFS) and zero-crossing rate of each complete frame of `samples`."""
+    frames = samples[: len(samples) // frame_len * frame_len].reshape(-1, frame_len).astype(np.float32)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_len
+    energy_db = 10.0 * np.log10(power / (32768.0 * 32768.0) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    return energy_db, zcr
+
+
+class VoiceActivityDetector:
+    """
+    Stateful across chunks; feed caller audio in arrival order.
+
+    Usage:
+        vad = VoiceActivityDetector(VADSettings.from_config(agent.config), sample_rate=16000)
+        for event in vad.process(pcm16_chunk):
+            ...
+    """
+
+    NOISE_ADAPT = 0.05        # Noise floor tracking in non-speech frames
+    NOISE_ADAPT_SPEECH = 0.001  # Slow drift during speech, so a constant loud background is learned eventually
+
+    def __init__(self, settings: Optional[VADSettings] = None, sample_rate: int = 16000):
+        self.settings = settings or VADSettings()
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * self.settings.frame_ms // 1000
+        self._start_frames = max(1, self.settings.start_ms // self.settings.frame_ms)
+        self._end_frames = max(1, self.settings.end_silence_ms // self.settings.frame_ms)
+        self._pending = np.empty(0, dtype=np.int16)
+        self._ring_cursor = 0  # Next stream byte to read in `process_buffered()`
+        self.noise_floor_db = self.settings.energy_threshold_db - self.settings.noise_margin_db
+        self.in_speech = False
+        self._frames_seen = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._speech_started = 0
+
+    @classmethod
+    def for_mimetype(cls, settings: VADSettings, mimetype: Optional[str]) -> Optional["VoiceActivityDetector"]:
+        """A detector for a raw caller format, or None if the format is compressed (webm, opus, ...)."""
+        rate = VAD_INPUT_RATES.get(mimetype or "")
+        return cls(settings, sample_rate=rate) if rate and settings.enabled else None
+
+    def process_input(self, audio, mimetype: Optional[str]) -> List[VADEvent]:
+        """`process()` for audio in its wire format (PCM16 or μ-law)."""
+        return self.process(ulaw_decode(audio) if mimetype == "audio/basic" else audio)
+
+    def process_buffered(self, ring: AudioRingBuffer) -> List[VADEvent]:
+        """
+        `process_input()` on the whole frames the session's ring gained since the last
+        call, read as a zero-copy view; a partial frame waits in the ring, not in `_pending`.
+        """
+        frame_size = self.frame_len * ring.sample_width
+        start = max(self._ring_cursor, ring.oldest)
+        end = start + (ring.position - start) // frame_size * frame_size
+        self._ring_cursor = end
+        if end == start:
+            return []
+        return self.process_input(ring.window(start, end), ring.mimetype)
+
+    def process(self, pcm) -> List[VADEvent]:
+        """Consume PCM16 audio; returns the events completed by it (usually none)."""
+        samples = pcm16_array(pcm)
+        if len(self._pending):
+            samples = np.concatenate([self._pending, samples])
+        usable = len(samples) // self.frame_len * self.frame_len
+        self._pending = samples[usable:].copy()
+        if not usable:
+            return []
+
+        energy_db, zcr = frame_features(samples[:usable], self.frame_len)
+        settings = self.settings
+        events: List[VADEvent] = []
+        frame_ms = settings.frame_ms
+        for db, crossings in zip(energy_db.tolist(), zcr.tolist()):
+            threshold = max(settings.energy_threshold_db, self.noise_floor_db + settings.noise_margin_db)
+            speech = db > threshold and (crossings <= settings.max_zcr or db > threshold + settings.loud_margin_db)
+            self.noise_floor_db += (db - self.noise_floor_db) * (self.NOISE_ADAPT_SPEECH if speech else self.NOISE_ADAPT)
+            self._frames_seen += 1
+
+            if not self.in_speech:
+                self._speech_run = self._speech_run + 1 if speech else 0
+                if self._speech_run >= self._start_frames:
+                    self.in_speech = True
+                    self._silence_run = 0
+                    self._speech_started = self._frames_seen - self._speech_run
+                    events.append(VADEvent(VADEventType.SPEECH_START, at_ms=self._speech_started * frame_ms))
+            else:
+                self._silence_run = 0 if speech else self._silence_run + 1
+                if self._silence_run >= self._end_frames:
+                    self.in_speech = False
+                    self._speech_run = 0
+                    speech_frames = self._frames_seen - self._silence_run - self._speech_started
+                    events.append(VADEvent(
+                        VADEventType.SPEECH_END,
+                        at_ms=self._frames_seen * frame_ms,
+                        speech_ms=speech_frames * frame_ms,
+                    ))
+        return events
@@ -134,9 +134,10 @@ Respond STRICTLY in JSON format:
 """
 
 from app.models.compliance import RegulatoryPolicy
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_baseline_rules(db: Session = None, organization_id: str = None) -> List[ComplianceRule]:
+async def get_baseline_rules(db: AsyncSession = None, organization_id: str = None) -> List[ComplianceRule]:
     """Standard safety and regulatory rules."""
     rules = [
         ComplianceRule(
@@ -164,9 +165,9 @@ def get_baseline_rules(db: Session = None, organization_id: str = None) -> List[
     
     # If DB and Org provided, fetch custom rules
     if db and organization_id:
-        policies = db.query(RegulatoryPolicy).filter(
+        policies = (await db.execute(select(RegulatoryPolicy).filter(
             RegulatoryPolicy.organization_id == organization_id
-        ).all()
+        ))).scalars().all()
         for p in policies:
             for r_data in (p.rules or []):
                 # Convert JSON back to ComplianceRule
@@ -1,14 +1,14 @@
 """
 Human-in-the-Loop (HITL) Service for managing pending actions.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from app.models.hitl import PendingAction, ApprovalStatus, SessionIntervention, InterventionMode
 
 class HITLService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_pending_action(
@@ -28,14 +28,17 @@ class HITLService:
             status=ApprovalStatus.PENDING.value
         )
         self.db.add(action)
-        self.db.commit()
-        self.db.refresh(action)
+        await self.db.commit()
+        await self.db.refresh(action)
         return action
 
     async def list_pending_actions(self, status: str = "pending") -> List[PendingAction]:
-        return self.db.query(PendingAction)\
-            .filter(PendingAction.status == status)\
-            .order_by(desc(PendingAction.created_at)).all()
+        result = await self.db.execute(
+            select(PendingAction)
+            .filter(PendingAction.status == status)
+            .order_by(desc(PendingAction.created_at))
+        )
+        return result.scalars().all()
 
     async def process_action(
         self, 
@@ -44,7 +47,7 @@ class HITLService:
         decision: str, 
         feedback: str = None
     ) -> Optional[PendingAction]:
-        action = self.db.query(PendingAction).filter(PendingAction.id == action_id).first()
+        action = await self.db.scalar(select(PendingAction).filter(PendingAction.id == action_id))
         if not action:
             return None
             
@@ -53,8 +56,8 @@ class HITLService:
         action.processed_at = datetime.utcnow()
         action.feedback = feedback
         
-        self.db.commit()
-        self.db.refresh(action)
+        await self.db.commit()
+        await self.db.refresh(action)
         return action
 
     async def start_intervention(
@@ -64,9 +67,9 @@ class HITLService:
         mode: str = InterventionMode.HUMAN_TAKEOVER.value
     ) -> SessionIntervention:
         """Initiate a human takeover or whisper mode for a session."""
-        intervention = self.db.query(SessionIntervention).filter(
+        intervention = await self.db.scalar(select(SessionIntervention).filter(
             SessionIntervention.session_id == session_id
-        ).first()
+        ))
         
         if intervention:
             intervention.mode = mode
@@ -81,25 +84,25 @@ class HITLService:
             )
             self.db.add(intervention)
             
-        self.db.commit()
-        self.db.refresh(intervention)
+        await self.db.commit()
+        await self.db.refresh(intervention)
         return intervention
 
     async def stop_intervention(self, session_id: str) -> bool:
         """Deactivate human intervention and return control to AI."""
-        intervention = self.db.query(SessionIntervention).filter(
+        intervention = await self.db.scalar(select(SessionIntervention).filter(
             SessionIntervention.session_id == session_id
-        ).first()
+        ))
         
         if intervention:
             intervention.is_active = False
-            self.db.commit()
+            await self.db.commit()
             return True
         return False
 
     async def get_intervention_status(self, session_id: str) -> Optional[SessionIntervention]:
         """Check if a session is currently being intervened by a human."""
-        return self.db.query(SessionIntervention).filter(
+        return await self.db.scalar(select(SessionIntervention).filter(
             SessionIntervention.session_id == session_id,
             SessionIntervention.is_active == True
-        ).first()
+        ).limit(1))
@@ -1,6 +1,6 @@
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, delete, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 from sentence_transformers import SentenceTransformer
 from app.models.knowledge import AgentKnowledge
@@ -23,7 +23,7 @@ class KnowledgeService:
             cls._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
         return cls._embedding_model
         
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = self.get_embedding_model()
         
@@ -50,8 +50,8 @@ class KnowledgeService:
             embedding=embedding
         )
         self.db.add(db_knowledge)
-        self.db.commit()
-        self.db.refresh(db_knowledge)
+        await self.db.commit()
+        await self.db.refresh(db_knowledge)
         return db_knowledge
 
     async def query_knowledge(
@@ -70,7 +70,7 @@ class KnowledgeService:
         # pgvector cosine similarity search
         # 1 - (embedding <=> query_embedding) as score
         query = (
-            self.db.query(
+            select(
                 AgentKnowledge,
                 (1 - AgentKnowledge.embedding.cosine_distance(query_embedding)).label("score")
             )
@@ -80,7 +80,7 @@ class KnowledgeService:
             .limit(limit)
         )
         
-        results = query.all()
+        results = (await self.db.execute(query)).all()
         
         formatted_results = []
         for knowledge, score in results:
@@ -95,5 +95,5 @@ class KnowledgeService:
         return formatted_results
 
     async def delete_knowledge(self, knowledge_id: str):
-        self.db.query(AgentKnowledge).filter(AgentKnowledge.id == knowledge_id).delete()
-        self.db.commit()
+        await self.db.execute(delete(AgentKnowledge).where(AgentKnowledge.id == knowledge_id))
+        await self.db.commit()
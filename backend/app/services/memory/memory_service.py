@@ -5,8 +5,8 @@ Inspired by memU's proactive memory architecture.
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sentence_transformers import SentenceTransformer
 from loguru import logger
 import json
@@ -35,7 +35,7 @@ class MemoryService:
             logger.info("Embedding model loaded")
         return cls._embedding_model
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = self.get_embedding_model()
     
@@ -63,11 +63,11 @@ class MemoryService:
         Store a memory fact. Updates existing memory if key exists.
         """
         # Check if memory exists
-        existing = self.db.query(MemoryItem).filter(
+        existing = await self.db.scalar(select(MemoryItem).filter(
             MemoryItem.user_id == user_id,
             MemoryItem.key == key,
             MemoryItem.organization_id == organization_id
-        ).first()
+        ).limit(1))
         
         if existing:
             # Update existing memory
@@ -79,7 +79,7 @@ class MemoryService:
             existing.confidence = max(existing.confidence, confidence)
             existing.updated_at = datetime.utcnow()
             existing.embedding = self._generate_embedding(f"[{memory_type}] {category}: {key} = {value}")
-            self.db.commit()
+            await self.db.commit()
             logger.info(f"Updated memory [{memory_type}] for user {user_id}: {key}")
             return existing
         
@@ -105,7 +105,7 @@ class MemoryService:
         )
         
         self.db.add(memory)
-        self.db.commit()
+        await self.db.commit()
         logger.info(f"Stored new memory for user {user_id}: {key} = {value}")
         return memory
     
@@ -137,6 +137,9 @@ class MemoryService:
             logger.warning(f"Memory extraction skipped: User {user_id} has withdrawn consent")
             return []
 
+        # Release the pooled connection while the LLM extracts facts
+        await self.db.commit()
+
         # Build extraction prompt with PII Redaction
         conv_text = "\n".join([f"{m['role']}: {redactor.redact_text(m['content'])}" for m in conversation])
         
@@ -225,7 +228,7 @@ Return ONLY valid JSON array, no other text:"""
         stmt = stmt.where(and_(*filters))
         stmt = stmt.order_by('distance').limit(limit)
         
-        results = self.db.execute(stmt).all()
+        results = (await self.db.execute(stmt)).all()
         
         memories = []
         for memory, distance in results:
@@ -245,7 +248,7 @@ Return ONLY valid JSON array, no other text:"""
                 "last_updated": memory.updated_at.isoformat() if memory.updated_at else None
             })
         
-        self.db.commit()
+        await self.db.commit()
         return memories
     
     async def get_user_memories(
@@ -257,14 +260,16 @@ Return ONLY valid JSON array, no other text:"""
         """
         Get all memories for a user, grouped by category.
         """
-        query = self.db.query(MemoryItem).filter(MemoryItem.user_id == user_id)
+        query = select(MemoryItem).filter(MemoryItem.user_id == user_id)
         if organization_id:
             query = query.filter(MemoryItem.organization_id == organization_id)
         
         if categories:
             query = query.filter(MemoryItem.category.in_(categories))
         
-        memories = query.order_by(MemoryItem.category, MemoryItem.updated_at.desc()).all()
+        memories = (await self.db.execute(
+            query.order_by(MemoryItem.category, MemoryItem.updated_at.desc())
+        )).scalars().all()
         
         result = {}
         for memory in memories:
@@ -286,15 +291,15 @@ Return ONLY valid JSON array, no other text:"""
         Called at the start of a conversation to provide history.
         """
         # Get user profile
-        profile = self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        profile = await self.db.scalar(select(UserProfile).filter(UserProfile.user_id == user_id).limit(1))
         
         # Get recent memories
         memories = await self.get_user_memories(user_id, organization_id=organization_id)
         
         # Get last conversation summary
-        last_summary = self.db.query(ConversationSummary).filter(
+        last_summary = await self.db.scalar(select(ConversationSummary).filter(
             ConversationSummary.user_id == user_id
-        ).order_by(ConversationSummary.created_at.desc()).first()
+        ).order_by(ConversationSummary.created_at.desc()).limit(1))
         
         context_parts = []
         
@@ -393,14 +398,14 @@ KEY POINTS:
         # Update user profile
         await self._update_user_profile(user_id)
         
-        self.db.commit()
+        await self.db.commit()
         return summary
     
     # ==================== USER PROFILE ====================
     
     async def _update_user_profile(self, user_id: str):
         """Update or create user profile after a conversation."""
-        profile = self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        profile = await self.db.scalar(select(UserProfile).filter(UserProfile.user_id == user_id).limit(1))
         
         if not profile:
             profile = UserProfile(user_id=user_id)
@@ -410,22 +415,22 @@ KEY POINTS:
         profile.last_interaction = datetime.utcnow()
         
         # Try to get name from memories
-        name_memory = self.db.query(MemoryItem).filter(
+        name_memory = await self.db.scalar(select(MemoryItem).filter(
             MemoryItem.user_id == user_id,
             MemoryItem.key == "name"
-        ).first()
+        ).limit(1))
         
         if name_memory:
             profile.name = name_memory.value
     
     async def get_or_create_profile(self, user_id: str) -> UserProfile:
         """Get or create a user profile."""
-        profile = self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        profile = await self.db.scalar(select(UserProfile).filter(UserProfile.user_id == user_id).limit(1))
         
         if not profile:
             profile = UserProfile(user_id=user_id)
             self.db.add(profile)
-            self.db.commit()
+            await self.db.commit()
         
         return profile
 
@@ -433,10 +438,10 @@ KEY POINTS:
         """Set or update user consent status."""
         profile = await self.get_or_create_profile(user_id)
         profile.consent_status = status
-        self.db.commit()
+        await self.db.commit()
         logger.info(f"Consent for user {user_id} updated to: {status}")
 
 
 # Singleton-ish factory function
-def get_memory_service(db: Session) -> MemoryService:
+def get_memory_service(db: AsyncSession) -> MemoryService:
     return MemoryService(db)
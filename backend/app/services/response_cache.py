@@ -0,0 +1,290 @@
+"""
+Per-agent semantic cache of answers to repeated questions.
+Opt-in per agent via `agent.config["response_cache"]`:
+
+    {"enabled": true, "similarity_threshold": 0.92, "ttl_seconds": 86400}
+
+Entries are scoped by agent, agent version, a digest of the persona and the
+policy state, and matched by a local sentence embedding of the normalized
+utterance. The audio spoken for an answer is kept with it (per voice, language
+and tone), so a hit skips both the LLM call and TTS.
+Callers decide eligibility: turns that depend on tools or caller memory must
+neither read nor write the cache.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.services.agent_config_cache import agent_config_cache
+from app.services.knowledge_service import KnowledgeService
+
+
+Scope = Tuple[str, str, str, str]       # (agent_id, version_id, persona digest, policy state)
+AudioKey = Tuple[str, str, str]         # (voice, language, tone)
+
+_NORMALIZE_RE = re.compile(r"[^\w\s']+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _SPACES_RE.sub(" ", _NORMALIZE_RE.sub(" ", text.lower())).strip()
+
+
+def tone_for_sentiment(sentiment_score: Optional[float]) -> str:
+    """Bucket matching the TTS instruction choice, so cached audio keeps the delivery tone."""
+    if sentiment_score is None:
+        return "default"
+    if sentiment_score < 0.3:
+        return "empathetic"
+    if sentiment_score > 0.8:
+        return "excited"
+    return "professional"
+
+
+@dataclass
+class ResponseCacheSettings:
+    similarity_threshold: float
+    ttl_seconds: int
+
+
+@dataclass
+class CachedResponse:
+    scope: Scope
+    utterance: str
+    embedding: np.ndarray
+    text: str
+    expires_at: float
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+    audio: Dict[AudioKey, List[bytes]] = field(default_factory=dict)
+
+    @property
+    def audio_bytes(self) -> int:
+        return sum(len(chunk) for chunks in self.audio.values() for chunk in chunks)
+
+
+@dataclass
+class ResponseCacheMetrics:
+    lookups: int = 0
+    hits: int = 0
+    exact_hits: int = 0
+    misses: int = 0
+    audio_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(vars(self))
+        data["hit_rate"] = round(self.hits / self.lookups, 4) if self.lookups else 0.0
+        return data
+
+
+class _ScopeIndex:
+    """Entries of one scope plus a lazily rebuilt embedding matrix for the similarity search."""
+
+    def __init__(self):
+        self.entries: Dict[str, CachedResponse] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._ordered: List[CachedResponse] = []
+
+    def add(self, entry: CachedResponse):
+        self.entries[entry.utterance] = entry
+        self._matrix = None
+
+    def remove(self, entry: CachedResponse):
+        if self.entries.get(entry.utterance) is entry:
+            del self.entries[entry.utterance]
+            self._matrix = None
+
+    def nearest(self, embedding: np.ndarray) -> Tuple[Optional[CachedResponse], float]:
+        if not self.entries:
+            return None, 0.0
+        if self._matrix is None:
+            self._ordered = list(self.entries.values())
+            self._matrix = np.vstack([e.embedding for e in self._ordered])
+        scores = self._matrix @ embedding
+        best = int(np.argmax(scores))
+        return self._ordered[best], float(scores[best])
+
+
+class SemanticResponseCache:
+    """
+    Usage:
+        cache_settings = response_cache.settings_for(agent)        # None unless opted in
+        embedding = await response_cache.embed(utterance)
+        entry = response_cache.lookup(scope, utterance, embedding, cache_settings)
+        ...
+        entry = response_cache.store(scope, utterance, embedding, answer, cache_settings)
+        response_cache.add_audio(entry, (voice, language, tone), chunks)
+    """
+
+    def __init__(self, max_entries: int, max_audio_bytes: int, default_ttl_seconds: int,
+                 default_threshold: float, min_words: int):
+        self.max_entries = max_entries
+        self.max_audio_bytes = max_audio_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self.default_threshold = default_threshold
+        self.min_words = min_words
+        self.metrics = ResponseCacheMetrics()
+        self._lru: "OrderedDict[int, CachedResponse]" = OrderedDict()
+        self._scopes: Dict[Scope, _ScopeIndex] = {}
+        self._audio_bytes = 0
+
+    # -- Configuration ------------------------------------------------------
+
+    def settings_for(self, agent: Any) -> Optional[ResponseCacheSettings]:
+        """Per-agent opt-in from `agent.config["response_cache"]`."""
+        config = (getattr(agent, "config", None) or {}).get("response_cache") or {}
+        if not config.get("enabled"):
+            return None
+        return ResponseCacheSettings(
+            similarity_threshold=float(config.get("similarity_threshold", self.default_threshold)),
+            ttl_seconds=int(config.get("ttl_seconds", self.default_ttl_seconds)),
+        )
+
+    @staticmethod
+    def scope_for(agent_id: str, version_id: Optional[str], persona: Optional[str], state: str) -> Scope:
+        # Editing the persona in place (no new version) still starts a fresh scope
+        persona_digest = hashlib.sha1((persona or "").encode("utf-8")).hexdigest()[:12]
+        return (str(agent_id), str(version_id or "base"), persona_digest, state or "")
+
+    def is_cacheable_utterance(self, utterance: str) -> bool:
+        # Very short turns ("why?", "and then") only make sense with the conversation history
+        return len(utterance.split()) >= self.min_words
+
+    # -- Lookup / store -----------------------------------------------------
+
+    async def embed(self, utterance: str) -> np.ndarray:
+        """Unit-length embedding of a normalized utterance (computed off the event loop)."""
+        model = KnowledgeService.get_embedding_model()
+        return await asyncio.to_thread(model.encode, utterance, normalize_embeddings=True)
+
+    def lookup(self, scope: Scope, utterance: str, embedding: np.ndarray,
+               cache_settings: ResponseCacheSettings) -> Optional[CachedResponse]:
+        self.metrics.lookups += 1
+        index = self._scopes.get(scope)
+        entry = None
+        exact = False
+        if index is not None:
+            entry = index.entries.get(utterance)
+            exact = entry is not None
+            if not exact:
+                candidate, score = index.nearest(embedding)
+                if candidate is not None and score >= cache_settings.similarity_threshold:
+                    entry = candidate
+
+        if entry is not None and entry.expires_at <= time.time():
+            self._evict(entry)
+            self.metrics.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.metrics.misses += 1
+            return None
+
+        entry.hits += 1
+        self.metrics.hits += 1
+        if exact:
+            self.metrics.exact_hits += 1
+        self._lru.move_to_end(id(entry))
+        return entry
+
+    def store(self, scope: Scope, utterance: str, embedding: np.ndarray, text: str,
+              cache_settings: ResponseCacheSettings) -> CachedResponse:
+        index = self._scopes.setdefault(scope, _ScopeIndex())
+        previous = index.entries.get(utterance)
+        if previous is not None:
+            self._evict(previous)
+            index = self._scopes.setdefault(scope, _ScopeIndex())
+
+        entry = CachedResponse(
+            scope=scope,
+            utterance=utterance,
+            embedding=np.asarray(embedding, dtype=np.float32),
+            text=text,
+            expires_at=time.time() + cache_settings.ttl_seconds,
+        )
+        index.add(entry)
+        self._lru[id(entry)] = entry
+        self.metrics.stores += 1
+        self._enforce_limits()
+        return entry
+
+    def audio_for(self, entry: CachedResponse, key: AudioKey) -> Optional[List[bytes]]:
+        chunks = entry.audio.get(key)
+        if chunks:
+            self.metrics.audio_hits += 1
+        return chunks
+
+    def add_audio(self, entry: CachedResponse, key: AudioKey, chunks: List[bytes]):
+        if not chunks or id(entry) not in self._lru:
+            return
+        previous = entry.audio.get(key)
+        if previous:
+            self._audio_bytes -= sum(len(c) for c in previous)
+        entry.audio[key] = list(chunks)
+        self._audio_bytes += sum(len(c) for c in chunks)
+        self._enforce_limits()
+
+    # -- Eviction -----------------------------------------------------------
+
+    def _evict(self, entry: CachedResponse):
+        if self._lru.pop(id(entry), None) is None:
+            return
+        self._audio_bytes -= entry.audio_bytes
+        index = self._scopes.get(entry.scope)
+        if index is not None:
+            index.remove(entry)
+            if not index.entries:
+                del self._scopes[entry.scope]
+
+    def _enforce_limits(self):
+        now = time.time()
+        while self._lru and (len(self._lru) > self.max_entries or self._audio_bytes > self.max_audio_bytes):
+            _, oldest = next(iter(self._lru.items()))
+            self._evict(oldest)
+            if oldest.expires_at <= now:
+                self.metrics.expirations += 1
+            else:
+                self.metrics.evictions += 1
+
+    def invalidate_agent(self, agent_id: Optional[str] = None) -> int:
+        """Drop every entry of one agent (all versions and states), or of all agents."""
+        stale = [e for e in self._lru.values() if agent_id is None or e.scope[0] == str(agent_id)]
+        for entry in stale:
+            self._evict(entry)
+        if stale:
+            logger.info(f"Response cache: dropped {len(stale)} answers of agent {agent_id or '*'}")
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._lru),
+            "scopes": len(self._scopes),
+            "audio_bytes": self._audio_bytes,
+            "max_entries": self.max_entries,
+            "max_audio_bytes": self.max_audio_bytes,
+            **self.metrics.to_dict(),
+        }
+
+
+# Singleton
+response_cache = SemanticResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_audio_bytes=settings.RESPONSE_CACHE_MAX_AUDIO_MB * 1024 * 1024,
+    default_ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    default_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    min_words=settings.RESPONSE_CACHE_MIN_WORDS,
+)
+# Knowledge/config edits of an agent invalidate its cached answers on every worker
+agent_config_cache.add_invalidation_hook(response_cache.invalidate_agent)
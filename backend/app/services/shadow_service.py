@@ -1,14 +1,16 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from loguru import logger
 
+from app.core.database import AsyncSessionLocal
 from app.models.analytics import ShadowLog
 from app.services.llm.groq_provider import GroqLLM
 
 class ShadowComparisonService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+        # Comparisons run in the background alongside the live turn, so each write opens its own session
+        self.session_factory = session_factory
         # Use 70b model for better accuracy in shadow comparison
         self.shadow_llm = GroqLLM(model="llama-3.3-70b-versatile")
         
@@ -81,8 +83,9 @@ class ShadowComparisonService:
                 shadow_latency_ms=shadow_duration,
                 intent_match=(cos_sim > 0.85) # Simple heuristic for now
             )
-            self.db.add(log)
-            self.db.commit()
+            async with self.session_factory() as db:
+                db.add(log)
+                await db.commit()
             
             logger.info(f"Shadow Run [Turn {turn_index}]: Sim={cos_sim:.2f}, LatencyDiff={shadow_duration - primary_latency:.0f}ms")
             
@@ -90,5 +93,5 @@ class ShadowComparisonService:
             logger.error(f"Shadow Comparison Failed: {e}")
 
 # Factory
-def get_shadow_service(db: Session):
-    return ShadowComparisonService(db)
+def get_shadow_service(session_factory: async_sessionmaker = AsyncSessionLocal):
+    return ShadowComparisonService(session_factory)
@@ -1,7 +1,154 @@
+import asyncio
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional
+from loguru import logger
+
+
+@dataclass
+class WordConfidence:
+    word: str
+    confidence: float
+    start: Optional[float] = None   # Seconds from the start of the utterance audio
+    end: Optional[float] = None
+
+
+@dataclass
+class TranscriptionResult:
+    """What a provider heard in one utterance, with the evidence for how sure it is."""
+    text: str
+    confidence: Optional[float] = None          # Utterance level, 0..1 when the provider reports it
+    words: List[WordConfidence] = field(default_factory=list)
+    language: Optional[str] = None              # Requested or detected language
+    duration: Optional[float] = None            # Seconds of audio recognized
+
+    @property
+    def score(self) -> Optional[float]:
+        """Utterance confidence, or the mean word confidence when only words are scored."""
+        if self.confidence is not None:
+            return self.confidence
+        if self.words:
+            return sum(w.confidence for w in self.words) / len(self.words)
+        return None
+
+    def low_confidence_ratio(self, min_word_confidence: float) -> float:
+        """Share of words scored below `min_word_confidence` (0.0 without word scores)."""
+        if not self.words:
+            return 0.0
+        return sum(1 for w in self.words if w.confidence < min_word_confidence) / len(self.words)
+
+    def is_unreliable(self, min_confidence: float, min_word_confidence: float, max_low_word_ratio: float = 0.5) -> bool:
+        """Likely noise or a misrecognition: not worth an LLM turn. Unscored results are trusted."""
+        if not self.text.strip():
+            return True
+        score = self.score
+        if score is not None and score < min_confidence:
+            return True
+        return self.low_confidence_ratio(min_word_confidence) > max_low_word_ratio
+
+
+@dataclass
+class TranscriptHypothesis:
+    text: str
+    is_final: bool                       # Final hypotheses end an utterance and drive a turn
+    confidence: Optional[float] = None   # 0..1 when the provider reports it
+    result: Optional[TranscriptionResult] = None  # Finals: word scores, language and timing when available
+
+    def to_result(self) -> TranscriptionResult:
+        return self.result or TranscriptionResult(self.text, confidence=self.confidence)
+
+
+class STTStream(ABC):
+    """
+    One live recognition session (per call, spanning many utterances).
+    Audio goes in with `send()`; hypotheses come out by iterating the stream,
+    which ends after `close()`.
+
+    Usage:
+        stream = await stt_service.open_stream(language="en-US", mimetype="audio/webm")
+        await stream.send(chunk)
+        await stream.finalize()        # Caller signalled end of utterance
+        async for hypothesis in stream:
+            ...
+    """
+
+    @abstractmethod
+    async def send(self, audio: bytes):
+        """Push the next chunk of caller audio."""
+
+    @abstractmethod
+    async def finalize(self):
+        """End the current utterance: pending audio is recognized and a final hypothesis follows."""
+
+    @abstractmethod
+    async def close(self):
+        """Stop recognition; iteration ends once pending hypotheses are delivered."""
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[TranscriptHypothesis]:
+        ...
+
 
 class STTProvider(ABC):
     @abstractmethod
-    async def transcribe(self, audio_bytes: bytes) -> str:
-        """Transcribe audio bytes to text."""
+    async def transcribe(self, audio_bytes: bytes, language: str = "en-US", mimetype: str = "audio/wav") -> TranscriptionResult:
+        """Transcribe one utterance; confidences are filled in as far as the provider reports them."""
         pass
+
+    async def open_stream(self, language: str = "en-US", mimetype: str = "audio/webm") -> STTStream:
+        """
+        Start live recognition. Providers with a streaming API override this;
+        the default buffers each utterance and transcribes it on `finalize()`.
+        """
+        return BufferedSTTStream(self, language=language, mimetype=mimetype)
+
+
+class BufferedSTTStream(STTStream):
+    """Streaming interface over a batch provider: no partials, one final per utterance."""
+
+    close_timeout_s = 5.0  # Grace for the last utterance's recognition when the stream closes
+
+    def __init__(self, provider: STTProvider, language: str, mimetype: str):
+        self.provider = provider
+        self.language = language
+        self.mimetype = mimetype
+        self._audio = bytearray()  # Current utterance, grown in place rather than kept as per-frame bytes
+        self._recognizing: Optional[asyncio.Task] = None
+        self._hypotheses: "asyncio.Queue[Optional[TranscriptHypothesis]]" = asyncio.Queue()
+
+    async def send(self, audio: bytes):
+        self._audio += audio
+
+    async def finalize(self):
+        audio, self._audio = bytes(self._audio), bytearray()
+        if audio:
+            # In the background, chained so finals keep utterance order; the caller keeps reading input
+            self._recognizing = asyncio.create_task(self._recognize(audio, self._recognizing))
+
+    async def _recognize(self, audio: bytes, previous: Optional[asyncio.Task]):
+        if previous:
+            await asyncio.wait([previous])
+        try:
+            result = await self.provider.transcribe(audio, language=self.language, mimetype=self.mimetype)
+        except Exception as e:
+            logger.error(f"STT Error: {e}")
+            return
+        if result.text:
+            await self._hypotheses.put(TranscriptHypothesis(result.text, is_final=True, confidence=result.score, result=result))
+
+    async def close(self):
+        if self._recognizing:
+            # The caller often hangs up right after finishing a sentence: deliver that final if it comes in time
+            try:
+                await asyncio.wait_for(asyncio.shield(self._recognizing), timeout=self.close_timeout_s)
+            except Exception:
+                pass
+            self._recognizing.cancel()
+        await self._hypotheses.put(None)
+
+    async def __aiter__(self) -> AsyncIterator[TranscriptHypothesis]:
+        while True:
+            hypothesis = await self._hypotheses.get()
+            if hypothesis is None:
+                return
+            yield hypothesis
@@ -1,25 +1,57 @@
-from deepgram import DeepgramClient
 import os
 import asyncio
-from .base import STTProvider
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlencode
+import websockets
+from .base import STTProvider, STTStream, TranscriptHypothesis, TranscriptionResult, WordConfidence
 from app.core.config import settings
 from loguru import logger
 
+try:
+    from deepgram import DeepgramClient  # Optional: only batch transcription uses the SDK
+except ImportError:
+    DeepgramClient = None
+
+DEEPGRAM_LISTEN_URL = "wss://api.deepgram.com/v1/listen"
+
+# Raw formats need explicit encoding parameters; containers (webm, wav, ...) are detected
+RAW_ENCODINGS = {
+    "audio/l16": {"encoding": "linear16", "sample_rate": 16000},
+    "audio/basic": {"encoding": "mulaw", "sample_rate": 8000},
+}
+
+def parse_words(alternative: Dict[str, Any], offset: float = 0.0) -> List[WordConfidence]:
+    """Word scores of a Deepgram alternative; `offset` shifts times to the start of the utterance."""
+    return [
+        WordConfidence(
+            word=w.get("punctuated_word") or w.get("word", ""),
+            confidence=float(w.get("confidence", 0.0)),
+            start=w["start"] - offset if "start" in w else None,
+            end=w["end"] - offset if "end" in w else None,
+        )
+        for w in alternative.get("words") or []
+    ]
+
+
 class DeepgramSTT(STTProvider):
     def __init__(self, api_key: str = None):
         self.api_key = api_key or settings.DEEPGRAM_API_KEY
         if not self.api_key:
             logger.warning("DEEPGRAM_API_KEY not found in settings.")
             self.client = None
+        elif DeepgramClient is None:
+            logger.warning("deepgram-sdk not installed: batch transcription disabled, live streaming still available")
+            self.client = None
         else:
             self.client = DeepgramClient(api_key=self.api_key)
 
-    async def transcribe(self, audio_bytes: bytes, language: str = "en-US", mimetype: str = "audio/wav") -> str:
+    async def transcribe(self, audio_bytes: bytes, language: str = "en-US", mimetype: str = "audio/wav") -> TranscriptionResult:
         """
         One-off transcription for an audio chunk.
         """
         if not self.client:
-            return "Deepgram Key Missing"
+            return TranscriptionResult("Deepgram Key Missing")
 
         options = {
             "model": "nova-2",
@@ -35,14 +67,126 @@ class DeepgramSTT(STTProvider):
             {"buffer": audio_bytes, "mimetype": mimetype}, 
             options
         )
-        return response["results"]["channels"][0]["alternatives"][0]["transcript"]
+        channel = response["results"]["channels"][0]
+        alternative = channel["alternatives"][0]
+        return TranscriptionResult(
+            text=alternative["transcript"],
+            confidence=alternative.get("confidence"),
+            words=parse_words(alternative),
+            language=channel.get("detected_language") or (None if language == "auto" else language),
+            duration=(response.get("metadata") or {}).get("duration"),
+        )
 
-    async def stream_connection(self):
-        """
-        Returns a live connection handler for WebSocket streaming.
-        """
-        if not self.client:
-            return None
-        
-        dg_connection = self.client.listen.live.v("1")
-        return dg_connection
+    async def open_stream(self, language: str = "en-US", mimetype: str = "audio/webm") -> STTStream:
+        """Live recognition over Deepgram's websocket API, with interim results."""
+        if not self.api_key:
+            return await super().open_stream(language=language, mimetype=mimetype)
+
+        params = {
+            "model": settings.STT_DEEPGRAM_MODEL,
+            "smart_format": "true",
+            "interim_results": "true",
+            "endpointing": settings.STT_ENDPOINTING_MS,
+            **RAW_ENCODINGS.get(mimetype, {}),
+        }
+        if language == "auto":
+            params["detect_language"] = "true"
+        else:
+            params["language"] = language
+        connection = await websockets.connect(
+            f"{DEEPGRAM_LISTEN_URL}?{urlencode(params)}",
+            extra_headers={"Authorization": f"Token {self.api_key}"},
+            max_size=None,
+        )
+        return DeepgramSTTStream(connection, language=None if language == "auto" else language)
+
+
+class DeepgramSTTStream(STTStream):
+    """
+    Deepgram sends interim results for the words being spoken and `is_final`
+    results as parts of the utterance settle; `speech_final` (endpointing) or
+    the answer to a Finalize request closes the utterance.
+    """
+
+    def __init__(self, connection, language: Optional[str] = None):
+        self.connection = connection
+        self.language = language
+        self._settled: List[str] = []
+        self._confidences: List[float] = []
+        self._words: List[WordConfidence] = []
+        self._utterance_start: Optional[float] = None   # Stream time of the first settled segment
+        self._utterance_end = 0.0
+        self._hypotheses: "asyncio.Queue[Optional[TranscriptHypothesis]]" = asyncio.Queue()
+        self._reader = asyncio.create_task(self._read())
+        self._keepalive = asyncio.create_task(self._keep_alive())
+
+    async def send(self, audio: bytes):
+        await self.connection.send(audio)  # Any bytes-like (ring buffer views too); framed before send returns, no extra copy
+
+    async def finalize(self):
+        await self.connection.send(json.dumps({"type": "Finalize"}))
+
+    async def close(self):
+        self._keepalive.cancel()
+        try:
+            await self.connection.send(json.dumps({"type": "CloseStream"}))
+            await asyncio.wait_for(asyncio.shield(self._reader), timeout=2.0)
+        except Exception:
+            pass
+        self._reader.cancel()
+        await self.connection.close()
+        await self._hypotheses.put(None)
+
+    async def __aiter__(self) -> AsyncIterator[TranscriptHypothesis]:
+        while True:
+            hypothesis = await self._hypotheses.get()
+            if hypothesis is None:
+                return
+            yield hypothesis
+
+    async def _keep_alive(self):
+        # Deepgram closes idle streams after ~10 s without audio (caller listening to a long answer)
+        while True:
+            await asyncio.sleep(settings.STT_KEEPALIVE_SECONDS)
+            await self.connection.send(json.dumps({"type": "KeepAlive"}))
+
+    async def _read(self):
+        try:
+            async for raw in self.connection:
+                message = json.loads(raw)
+                if message.get("type") != "Results":
+                    continue
+                alternative = message["channel"]["alternatives"][0]
+                text = alternative.get("transcript", "")
+                if not message.get("is_final"):
+                    if text:
+                        partial = " ".join(self._settled + [text])
+                        await self._hypotheses.put(TranscriptHypothesis(partial, is_final=False, confidence=alternative.get("confidence")))
+                    continue
+                if text:
+                    start = float(message.get("start", 0.0))
+                    if self._utterance_start is None:
+                        self._utterance_start = start
+                    self._settled.append(text)
+                    self._confidences.append(alternative.get("confidence", 0.0))
+                    self._words.extend(parse_words(alternative, offset=self._utterance_start))
+                    self._utterance_end = start + float(message.get("duration", 0.0))
+                if (message.get("speech_final") or message.get("from_finalize")) and self._settled:
+                    result = TranscriptionResult(
+                        text=" ".join(self._settled),
+                        # The least certain part bounds the utterance
+                        confidence=min(self._confidences),
+                        words=self._words,
+                        language=message["channel"].get("detected_language") or self.language,
+                        duration=self._utterance_end - self._utterance_start,
+                    )
+                    await self._hypotheses.put(TranscriptHypothesis(result.text, is_final=True, confidence=result.confidence, result=result))
+                    self._settled, self._confidences, self._words = [], [], []
+                    self._utterance_start = None
+        except websockets.ConnectionClosed as e:
+            logger.warning(f"Deepgram STT stream closed: {e}")
+        except Exception as e:
+            logger.error(f"Deepgram STT stream error: {e}")
+        finally:
+            self._keepalive.cancel()
+            await self._hypotheses.put(None)
@@ -1,8 +1,64 @@
-from .base import STTProvider
+from typing import AsyncIterator, Optional
+from .base import STTProvider, STTStream, TranscriptHypothesis, TranscriptionResult, WordConfidence
 import asyncio
 
+MOCK_TRANSCRIPT = "This is a simulated transcription of the user's voice."
+MOCK_CONFIDENCE = 0.95
+
+
+def mock_result(transcript: str, language: str = "en-US") -> TranscriptionResult:
+    words = transcript.split()
+    return TranscriptionResult(
+        text=transcript,
+        confidence=MOCK_CONFIDENCE,
+        words=[WordConfidence(w, MOCK_CONFIDENCE, start=i * 0.3, end=(i + 1) * 0.3) for i, w in enumerate(words)],
+        language=language,
+        duration=len(words) * 0.3,
+    )
+
+
 class MockSTT(STTProvider):
-    async def transcribe(self, audio_bytes: bytes) -> str:
+    async def transcribe(self, audio_bytes: bytes, language: str = "en-US", mimetype: str = "audio/wav") -> TranscriptionResult:
         # Mock transcription for testing without API usage
-        await asyncio.sleep(0.5) 
-        return "This is a simulated transcription of the user's voice."
+        await asyncio.sleep(0.5)
+        return mock_result(MOCK_TRANSCRIPT, language)
+
+    async def open_stream(self, language: str = "en-US", mimetype: str = "audio/webm") -> STTStream:
+        return MockSTTStream()
+
+
+class MockSTTStream(STTStream):
+    """
+    Local streaming recognizer: every chunk reveals one more word of the
+    transcript as a partial; `finalize()` emits the utterance as a final.
+    """
+
+    def __init__(self, transcript: str = MOCK_TRANSCRIPT, recognition_delay: float = 0.0):
+        self.words = transcript.split()
+        self.recognition_delay = recognition_delay
+        self._heard = 0
+        self._hypotheses: "asyncio.Queue[Optional[TranscriptHypothesis]]" = asyncio.Queue()
+
+    async def send(self, audio: bytes):
+        if not audio:
+            return
+        if self.recognition_delay:
+            await asyncio.sleep(self.recognition_delay)
+        self._heard = min(self._heard + 1, len(self.words))
+        await self._hypotheses.put(TranscriptHypothesis(" ".join(self.words[:self._heard]), is_final=False, confidence=0.5))
+
+    async def finalize(self):
+        if self._heard:
+            result = mock_result(" ".join(self.words))
+            await self._hypotheses.put(TranscriptHypothesis(result.text, is_final=True, confidence=result.confidence, result=result))
+        self._heard = 0
+
+    async def close(self):
+        await self._hypotheses.put(None)
+
+    async def __aiter__(self) -> AsyncIterator[TranscriptHypothesis]:
+        while True:
+            hypothesis = await self._hypotheses.get()
+            if hypothesis is None:
+                return
+            yield hypothesis
@@ -0,0 +1,93 @@
+"""
+Per-session streaming recognition for the orchestrator websocket.
+Caller audio is forwarded to the provider's live stream as it arrives, so
+recognition runs while the caller is still speaking; partial hypotheses are
+relayed for live captions and each final hypothesis starts a turn.
+
+    transcriber = StreamingTranscriber(stt_service, language, on_partial=..., on_final=...)
+    await transcriber.push(chunk, mimetype="audio/webm")
+    await transcriber.push(last_chunk, end_of_utterance=True)
+    ...
+    late_finals = await transcriber.close()  # Recognized after the session stopped taking turns
+
+Clients opt in with `?stt=streaming`.
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+from loguru import logger
+from .base import STTProvider, STTStream, TranscriptHypothesis
+
+STT_MODE_UTTERANCE = "utterance"    # One audio message per utterance, transcribed whole
+STT_MODE_STREAMING = "streaming"    # Continuous audio frames, partial + final hypotheses
+
+HypothesisHandler = Callable[[TranscriptHypothesis], Awaitable[None]]
+
+
+class StreamingTranscriber:
+    def __init__(
+        self,
+        provider: STTProvider,
+        language: str,
+        on_partial: HypothesisHandler,
+        on_final: HypothesisHandler,
+    ):
+        self.provider = provider
+        self.language = language
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self._stream: Optional[STTStream] = None
+        self._pump: Optional[asyncio.Task] = None
+        self._closing = False
+        self._late_finals: List[TranscriptHypothesis] = []
+        self.partials = 0
+        self.finals = 0
+
+    async def push(self, audio: bytes, mimetype: Optional[str] = None, end_of_utterance: bool = False):
+        """Forward caller audio; the stream is opened on the first chunk (format from its mimetype)."""
+        if self._stream is None:
+            self._stream = await self.provider.open_stream(language=self.language, mimetype=mimetype or "audio/webm")
+            self._pump = asyncio.create_task(self._relay(self._stream))
+        if audio:
+            await self._stream.send(audio)
+        if end_of_utterance:
+            await self._stream.finalize()
+
+    async def _relay(self, stream: STTStream):
+        try:
+            async for hypothesis in stream:
+                if not hypothesis.text.strip():
+                    continue
+                if hypothesis.is_final:
+                    self.finals += 1
+                    if self._closing:
+                        self._late_finals.append(hypothesis)  # No turn left to run it; close() returns it
+                    else:
+                        await self.on_final(hypothesis)
+                elif not self._closing:
+                    self.partials += 1
+                    await self.on_partial(hypothesis)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming STT relay error: {e}")
+
+    async def close(self) -> List[TranscriptHypothesis]:
+        """
+        End the live stream. Finals recognized meanwhile (the caller hung up right
+        after speaking) are returned instead of passed to `on_final`.
+        """
+        if self._stream is None:
+            return []
+        self._closing = True
+        stream, self._stream = self._stream, None
+        try:
+            await stream.close()
+            # Let the last hypotheses through before the session goes away
+            await asyncio.wait_for(self._pump, timeout=2.0)
+        except Exception as e:
+            logger.debug(f"Streaming STT close: {e}")
+        finally:
+            if not self._pump.done():
+                self._pump.cancel()
+        late_finals, self._late_finals = self._late_finals, []
+        return late_finals
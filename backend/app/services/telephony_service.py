@@ -17,14 +17,17 @@ class TelephonyService:
             else None
         )
         
-    def generate_twiml_stream(self, stream_url: str, welcome_message: str = None) -> str:
-        """Generate TwiML to connect a call to a media stream."""
+    def generate_twiml_stream(self, stream_url: str, welcome_message: str = None, parameters: dict = None) -> str:
+        """Generate TwiML to connect a call to a media stream (`parameters` arrive in its start event)."""
         response = VoiceResponse()
         if welcome_message:
             response.say(welcome_message)
             
         connect = Connect()
-        connect.stream(url=stream_url)
+        stream = connect.stream(url=stream_url)
+        for name, value in (parameters or {}).items():
+            if value:
+                stream.parameter(name=name, value=value)
         response.append(connect)
         return str(response)
 
@@ -1,6 +1,24 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Tuple
+
+
+@dataclass(frozen=True)
+class TTSCapabilities:
+    """What a provider's `synthesize` accepts and offers; declared once per provider class."""
+    language: bool = False              # Accepts `language=`
+    voices: bool = False                # Accepts `voice=`
+    instruct: bool = False              # Accepts a per-request style `instruct=`
+    streaming: bool = False             # `synthesize_chunks` streams from upstream
+    cloning: bool = False               # register_voice / delete_voice
+    voice_design: bool = False          # design_voice from a description
+    sample_formats: Tuple[str, ...] = ()  # Container/codec of the returned audio
+
 
 class TTSProvider(ABC):
+    # Providers override this; the default only passes the text
+    capabilities: TTSCapabilities = TTSCapabilities()
+
     @abstractmethod
     async def synthesize(self, text: str) -> bytes:
         """Convert text to audio bytes."""
@@ -10,3 +28,13 @@ class TTSProvider(ABC):
     async def synthesize_stream(self, text_iterator) -> bytes:
          """Consume text stream and yield audio bytes."""
          pass
+
+    async def synthesize_chunks(self, text: str, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Yield the audio of one text as the provider produces it.
+        Concatenated chunks equal `synthesize(text)`. Providers with a streaming
+        endpoint override this; the default yields the whole clip once.
+        """
+        audio = await self.synthesize(text, **kwargs)
+        if audio:
+            yield audio
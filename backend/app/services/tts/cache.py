@@ -0,0 +1,343 @@
+"""
+Content-addressed cache of synthesized audio, shared by the TTS providers.
+Keys are a SHA-256 of everything that changes the audio (provider/model,
+voice, language, instruction, text). Two tiers:
+
+- memory: byte-bounded LRU of recent clips, per worker
+- disk: one file per key under TTS_CACHE_DIR, shared by all workers on the
+  host and kept across restarts; evicted oldest-used first
+
+Failed syntheses (empty audio) are never cached; neither are streams that
+were interrupted or failed part-way.
+
+Misses are single-flight: concurrent requests for the same key (a campaign's
+greeting, the fillers) share one upstream call. Stream subscribers that join
+late replay the chunks received so far, then follow live. The upstream call
+runs on its own task and is only cancelled once every requester has gone.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+from app.core.config import settings
+
+
+@dataclass
+class TTSCacheMetrics:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    bytes_from_cache: int = 0
+    bytes_synthesized: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+    disk_errors: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0      # Requests that joined an identical in-flight synthesis
+    peak_subscribers: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(vars(self))
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        data["hit_rate"] = round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        requests = self.upstream_calls + self.coalesced
+        data["coalescing_ratio"] = round(self.coalesced / requests, 4) if requests else 0.0
+        return data
+
+
+def cache_key(provider: str, voice: Optional[str], language: Optional[str], instruct: Optional[str], text: str) -> str:
+    material = "\x1f".join([provider, voice or "", language or "", instruct or "", text])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One in-flight upstream synthesis, fanned out to every requester of its key."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def push(self, chunk: bytes):
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None):
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[bytes]:
+        position = 0
+        while True:
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.done or len(self.chunks) > position)
+
+
+class TTSAudioCache:
+    """
+    Usage (inside a provider):
+        return await tts_audio_cache.get_or_synthesize(
+            "qwen", voice, language, instruct, text,
+            lambda: self._synthesize_uncached(text, voice, instruct),
+        )
+    """
+
+    def __init__(self, memory_max_bytes: int, disk_dir: Optional[str], disk_max_bytes: int, enabled: bool = True,
+                 single_flight: bool = True):
+        self.enabled = enabled
+        self.single_flight = single_flight
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.metrics = TTSCacheMetrics()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None  # Measured lazily on first disk write
+        self._disk_lock = threading.Lock()  # Disk accounting is updated from executor threads
+        self._inflight: Dict[str, _Flight] = {}
+
+    # -- Public API ---------------------------------------------------------
+
+    async def get_or_synthesize(self, provider: str, voice: Optional[str], language: Optional[str],
+                                instruct: Optional[str], text: str,
+                                synthesize: Callable[[], Awaitable[bytes]]) -> bytes:
+        async def stream():
+            audio = await synthesize()
+            if audio:
+                yield audio
+
+        chunks = [chunk async for chunk in self.stream_or_synthesize(provider, voice, language, instruct, text, stream)]
+        return b"".join(chunks)
+
+    async def stream_or_synthesize(self, provider: str, voice: Optional[str], language: Optional[str],
+                                   instruct: Optional[str], text: str,
+                                   stream: Callable[[], AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+        """
+        Streaming variant: a hit yields the cached clip at once; a miss forwards the
+        provider's chunks as they arrive and caches the clip once the stream completed.
+        """
+        if not text or not (self.enabled or self.single_flight):
+            async for chunk in stream():
+                yield chunk
+            return
+
+        key = cache_key(provider, voice, language, instruct, text)
+        flight = self._inflight.get(key)
+        if flight is None and self.enabled:
+            audio = await self.get(key)
+            if audio is not None:
+                yield audio
+                return
+            self.metrics.misses += 1
+            flight = self._inflight.get(key)  # Started while we read the disk tier
+
+        if flight is None:
+            flight = self._start_flight(key, stream)
+        else:
+            self.metrics.coalesced += 1
+
+        flight.subscribers += 1
+        self.metrics.peak_subscribers = max(self.metrics.peak_subscribers, flight.subscribers)
+        try:
+            async for chunk in flight.follow():
+                yield chunk
+        finally:
+            flight.subscribers -= 1
+            if not flight.subscribers and not flight.done:
+                # Every requester gave up (e.g. barge-in): stop the upstream call; new requests start afresh
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+                flight.task.cancel()
+
+    def _start_flight(self, key: str, stream: Callable[[], AsyncIterator[bytes]]) -> _Flight:
+        flight = _Flight()
+        self._inflight[key] = flight
+        self.metrics.upstream_calls += 1
+        flight.task = asyncio.create_task(self._run_flight(key, flight, stream))
+        return flight
+
+    async def _run_flight(self, key: str, flight: _Flight, stream: Callable[[], AsyncIterator[bytes]]):
+        error: Optional[BaseException] = None
+        try:
+            async for chunk in stream():
+                if chunk:
+                    await flight.push(chunk)
+        except asyncio.CancelledError as e:
+            error = e
+        except Exception as e:
+            error = e
+        finally:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+            await flight.finish(error)
+
+        audio = b"".join(flight.chunks)
+        if error is None and audio:
+            self.metrics.bytes_synthesized += len(audio)
+            if self.enabled:
+                self.put(key, audio)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.metrics.memory_hits += 1
+            self.metrics.bytes_from_cache += len(audio)
+            return audio
+
+        if not self.disk_dir:
+            return None
+        audio = await asyncio.to_thread(self._read_disk, key)
+        if audio is None:
+            return None
+        self.metrics.disk_hits += 1
+        self.metrics.bytes_from_cache += len(audio)
+        self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        self.metrics.stores += 1
+        self._remember(key, audio)
+        if self.disk_dir:
+            # Persisting is off the response path; failures only cost a future miss
+            asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, audio)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_max_bytes": self.memory_max_bytes,
+            "disk_dir": self.disk_dir,
+            "disk_bytes": self._disk_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+            "single_flight": self.single_flight,
+            "inflight": len(self._inflight),
+            **self.metrics.to_dict(),
+        }
+
+    # -- Memory tier --------------------------------------------------------
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.metrics.memory_evictions += 1
+
+    # -- Disk tier (runs in worker threads) ---------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.audio")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            # The clip is kept as bytes in the memory tier anyway, so one plain read is the cheapest copy
+            with open(path, "rb") as f:
+                audio = f.read()
+            if not audio:
+                return None
+            os.utime(path)  # Mark as recently used for disk eviction
+            return audio
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            with self._disk_lock:
+                self.metrics.disk_errors += 1
+            logger.warning(f"TTS cache read failed for {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, audio: bytes):
+        path = self._path(key)
+        try:
+            if os.path.exists(path):
+                return
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            # Atomic publish: other workers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+
+            # Publish and account together so an eviction walk never counts a clip twice
+            with self._disk_lock:
+                if os.path.exists(path):
+                    os.remove(tmp_path)
+                    return
+                os.replace(tmp_path, path)
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._measure_disk()
+                else:
+                    self._disk_bytes += len(audio)
+                if self._disk_bytes > self.disk_max_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            with self._disk_lock:
+                self.metrics.disk_errors += 1
+            logger.warning(f"TTS cache write failed for {key}: {e}")
+
+    def _disk_files(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".audio"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _measure_disk(self) -> int:
+        return sum(size for _, size, _ in self._disk_files())
+
+    def _evict_disk(self):
+        """Delete least recently used files until the tier is back under 90% of its budget. Caller holds `_disk_lock`."""
+        files = sorted(self._disk_files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        target = self.disk_max_bytes * 0.9
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.metrics.disk_evictions += 1
+            except FileNotFoundError:
+                continue
+        self._disk_bytes = total
+
+
+# Singleton
+tts_audio_cache = TTSAudioCache(
+    memory_max_bytes=settings.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+    disk_dir=settings.TTS_CACHE_DIR or None,
+    disk_max_bytes=settings.TTS_CACHE_DISK_MB * 1024 * 1024,
+    enabled=settings.TTS_CACHE_ENABLED,
+    single_flight=settings.TTS_SINGLE_FLIGHT_ENABLED,
+)
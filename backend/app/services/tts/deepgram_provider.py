@@ -1,47 +1,106 @@
 import os
-import requests
-from .base import TTSProvider
+from typing import AsyncIterator
+import httpx
+from .base import TTSCapabilities, TTSProvider
+from .cache import tts_audio_cache
+from .http import tts_http_clients
+from .scheduler import TTSDeadlineExceeded, tts_scheduler
 from app.core.config import settings
 from loguru import logger
 
+DEEPGRAM_API_URL = "https://api.deepgram.com"
+
 class DeepgramTTS(TTSProvider):
+    # Voice and language select an Aura model; no style instructions
+    capabilities = TTSCapabilities(language=True, voices=True, streaming=True, sample_formats=("mp3",))
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or settings.DEEPGRAM_API_KEY
 
-    async def synthesize(self, text: str, language: str = "en-US", voice: str = None) -> bytes:
-        if not self.api_key:
-            return b"mock_audio_missing_key"
-
+    @staticmethod
+    def _model_for(language: str, voice: str = None) -> str:
         # Map language to models if voice not specified
         if voice and voice != "auto":
-            selected_model = voice
-        else:
-            lang_main = language.split("-")[0].lower()
-            model_map = {
-                "en": "aura-asteria-en",
-                "es": "aura-luna-es",
-                "fr": "aura-luna-fr",
-                "de": "aura-luna-de",
-                "pt": "aura-luna-pt",
-            }
-            selected_model = model_map.get(lang_main, "aura-asteria-en")
-            
-        url = f"https://api.deepgram.com/v1/speak?model={selected_model}"
-
-        headers = {
+            return voice
+        lang_main = language.split("-")[0].lower()
+        model_map = {
+            "en": "aura-asteria-en",
+            "es": "aura-luna-es",
+            "fr": "aura-luna-fr",
+            "de": "aura-luna-de",
+            "pt": "aura-luna-pt",
+        }
+        return model_map.get(lang_main, "aura-asteria-en")
+
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Token {self.api_key}",
             "Content-Type": "application/json"
         }
-        
+
+    async def synthesize(self, text: str, language: str = "en-US", voice: str = None) -> bytes:
+        if not self.api_key:
+            return b"mock_audio_missing_key"
+
+        selected_model = self._model_for(language, voice)
+        # The model already encodes voice and language
+        return await tts_audio_cache.get_or_synthesize(
+            "deepgram", selected_model, None, None, text,
+            lambda: self._synthesize_uncached(text, selected_model),
+        )
+
+    async def synthesize_chunks(self, text: str, language: str = "en-US", voice: str = None) -> AsyncIterator[bytes]:
+        """Yield audio as Deepgram streams its chunked response."""
+        if not self.api_key:
+            yield b"mock_audio_missing_key"
+            return
+
+        selected_model = self._model_for(language, voice)
+        async for chunk in tts_audio_cache.stream_or_synthesize(
+            "deepgram", selected_model, None, None, text,
+            lambda: self._stream_uncached(text, selected_model),
+        ):
+            yield chunk
+
+    async def _stream_uncached(self, text: str, selected_model: str) -> AsyncIterator[bytes]:
+        received = False
+        try:
+            async with tts_scheduler.slot("deepgram"), tts_http_clients.get(DEEPGRAM_API_URL).stream(
+                "POST", "/v1/speak", params={"model": selected_model}, headers=self._headers(), json={"text": text}
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(f"Deepgram TTS Error: {response.status_code} - {response.text}")
+                    return
+                async for chunk in response.aiter_bytes():
+                    received = True
+                    yield chunk
+        except TTSDeadlineExceeded:
+            logger.warning("Deepgram TTS request dropped: queued past its deadline")
+        except httpx.HTTPError as e:
+            if received:
+                # Audio was cut off mid-sentence: fail the segment so it is never cached
+                raise
+            logger.error(f"TTS Exception: {e}")
+
+    async def _synthesize_uncached(self, text: str, selected_model: str) -> bytes:
+        headers = self._headers()
         payload = {"text": text}
 
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            # Non-blocking, over the shared keep-alive pool
+            async with tts_scheduler.slot("deepgram"):
+                response = await tts_http_clients.get(DEEPGRAM_API_URL).post(
+                    "/v1/speak", params={"model": selected_model}, headers=headers, json=payload
+                )
             if response.status_code == 200:
                 return response.content
             else:
                 logger.error(f"Deepgram TTS Error: {response.status_code} - {response.text}")
                 return b""
+        except TTSDeadlineExceeded:
+            logger.warning("Deepgram TTS request dropped: queued past its deadline")
+            return b""
         except Exception as e:
             logger.error(f"TTS Exception: {e}")
             return b""
@@ -0,0 +1,82 @@
+"""
+Shared, long-lived async HTTP clients for the TTS providers.
+One `httpx.AsyncClient` per TTS endpoint and worker, so every sentence reuses a
+kept-alive connection (HTTP/2 when the `h2` package is installed and the
+server negotiates it) instead of paying connection setup and a thread hop.
+Clients are pre-warmed at startup and closed at shutdown.
+"""
+import asyncio
+from typing import Dict, Iterable
+import httpx
+from loguru import logger
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class TTSHttpClients:
+    """
+    Usage:
+        client = tts_http_clients.get("http://127.0.0.1:8008")
+        response = await client.post("/tts/custom_voice", files=...)
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build(self, base_url: str) -> httpx.AsyncClient:
+        http2 = settings.TTS_HTTP2 and HTTP2_AVAILABLE
+        return httpx.AsyncClient(
+            base_url=base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.TTS_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TTS_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.TTS_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.TTS_HTTP_READ_TIMEOUT_SECONDS,
+                connect=settings.TTS_HTTP_CONNECT_TIMEOUT_SECONDS,
+                pool=settings.TTS_HTTP_POOL_TIMEOUT_SECONDS,
+            ),
+        )
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        base_url = base_url.rstrip("/")
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = self._build(base_url)
+            self._clients[base_url] = client
+        return client
+
+    async def warm(self, base_urls: Iterable[str], connections: int = None):
+        """
+        Open `connections` keep-alive connections per endpoint before the first call.
+        Any HTTP response (even 401/404) leaves a warm connection in the pool.
+        """
+        connections = connections or settings.TTS_HTTP_WARM_CONNECTIONS
+
+        async def touch(client: httpx.AsyncClient, base_url: str):
+            try:
+                await client.head("/")
+            except httpx.HTTPError as e:
+                logger.warning(f"TTS connection warm-up failed for {base_url}: {e}")
+
+        await asyncio.gather(*(
+            touch(self.get(base_url), base_url)
+            for base_url in base_urls
+            for _ in range(connections)
+        ))
+        logger.info(f"TTS HTTP clients warmed: {', '.join(self._clients)}")
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+# Singleton
+tts_http_clients = TTSHttpClients()
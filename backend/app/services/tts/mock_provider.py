@@ -1,7 +1,9 @@
-from .base import TTSProvider
+from .base import TTSCapabilities, TTSProvider
 import asyncio
 
 class MockTTS(TTSProvider):
+    capabilities = TTSCapabilities(sample_formats=("raw",))
+
     async def synthesize(self, text: str) -> bytes:
         # Return empty bytes for now, or load a static file if needed
         await asyncio.sleep(0.5)
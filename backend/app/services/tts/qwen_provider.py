@@ -1,37 +1,96 @@
 import os
-import requests
-import json
-import asyncio
-from typing import Optional
-from .base import TTSProvider
+from typing import AsyncIterator, Optional
+import httpx
+from app.core.config import settings
+from .base import TTSCapabilities, TTSProvider
+from .cache import tts_audio_cache
+from .http import tts_http_clients
+from .scheduler import TTSDeadlineExceeded, tts_scheduler
 from loguru import logger
 
 class QwenTTS(TTSProvider):
-    def __init__(self, base_url: str = "http://127.0.0.1:8008"):
-        self.base_url = base_url
+    capabilities = TTSCapabilities(
+        language=True, voices=True, instruct=True, streaming=True,
+        cloning=True, voice_design=True, sample_formats=("wav",),
+    )
+
+    def __init__(self, base_url: str = None):
+        self.base_url = (base_url or settings.QWEN_TTS_BASE_URL).rstrip("/")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Shared keep-alive pool for this server (per worker)
+        return tts_http_clients.get(self.base_url)
 
     async def synthesize(self, text: str, language: str = "en-US", voice: str = None, instruct: str = None) -> bytes:
         """
         Synthesize text using Qwen3-TTS v2.1.0.
-        Uses multipart/form-data as per new documentation.
+        Repeats are served from the shared TTS audio cache.
+        """
+        if not voice or voice == "auto":
+            voice = "Vivian"
+
+        # The server is always called with language "Auto", so language is not part of the key
+        return await tts_audio_cache.get_or_synthesize(
+            f"qwen:{self.base_url}", voice, "auto", instruct, text,
+            lambda: self._synthesize_uncached(text, voice, instruct),
+        )
+
+    async def synthesize_chunks(self, text: str, language: str = "en-US", voice: str = None, instruct: str = None) -> AsyncIterator[bytes]:
+        """
+        Yield audio as the server writes its chunked response, so the first words
+        can be played before the whole sentence is synthesized.
         """
         if not voice or voice == "auto":
             voice = "Vivian"
 
-        url = f"{self.base_url}/tts/custom_voice"
-        
+        async for chunk in tts_audio_cache.stream_or_synthesize(
+            f"qwen:{self.base_url}", voice, "auto", instruct, text,
+            lambda: self._stream_uncached(text, voice, instruct),
+        ):
+            yield chunk
+
+    @staticmethod
+    def _form(text: str, voice: str, instruct: Optional[str]) -> dict:
         # multipart/form-data
-        data = {
+        return {
             "text": (None, text),
             "speaker": (None, voice),
             "language": (None, "Auto"),
             "instruct": (None, instruct or "")
         }
 
+    async def _stream_uncached(self, text: str, voice: str, instruct: Optional[str]) -> AsyncIterator[bytes]:
+        received = False
+        try:
+            async with tts_scheduler.slot(f"qwen:{self.base_url}"):
+                async with self.client.stream("POST", "/tts/custom_voice", files=self._form(text, voice, instruct)) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        logger.error(f"QwenTTS Error ({response.status_code}): {response.text}")
+                        return
+                    async for chunk in response.aiter_bytes():
+                        received = True
+                        yield chunk
+        except TTSDeadlineExceeded:
+            logger.warning("QwenTTS request dropped: queued past its deadline")
+        except httpx.HTTPError as e:
+            if received:
+                # Audio was cut off mid-sentence: fail the segment so it is never cached
+                raise
+            logger.error(f"QwenTTS Connection Error: {e}")
+
+    async def _synthesize_uncached(self, text: str, voice: str, instruct: Optional[str]) -> bytes:
+        """Uses multipart/form-data as per new documentation."""
+        data = self._form(text, voice, instruct)
+
         try:
-            # Run blocking request in thread
             # To send as multipart/form-data with no files, we pass a dict of {field: (None, value)} to files
-            response = await asyncio.to_thread(requests.post, url, files=data)
+            async with tts_scheduler.slot(f"qwen:{self.base_url}"):
+                response = await self.client.post("/tts/custom_voice", files=data)
+        except TTSDeadlineExceeded:
+            logger.warning("QwenTTS request dropped: queued past its deadline")
+            return b""
         except Exception as e:
             logger.error(f"QwenTTS Connection Error: {e}")
             return b""
@@ -44,13 +103,12 @@ class QwenTTS(TTSProvider):
 
     async def design_voice(self, text: str, instruct: str) -> bytes:
         """Create a unique voice from a description."""
-        url = f"{self.base_url}/tts/voice_design"
         data = {
             "text": (None, text),
             "instruct": (None, instruct)
         }
         try:
-            response = await asyncio.to_thread(requests.post, url, files=data)
+            response = await self.client.post("/tts/voice_design", files=data)
             if response.status_code == 200:
                 return response.content
             return b""
@@ -60,7 +118,6 @@ class QwenTTS(TTSProvider):
 
     async def register_voice(self, name: str, ref_text: str, ref_audio_path: str) -> Optional[str]:
         """Clone a voice and register it."""
-        url = f"{self.base_url}/voices"
         try:
             with open(ref_audio_path, "rb") as f:
                 files = {
@@ -68,7 +125,7 @@ class QwenTTS(TTSProvider):
                     "ref_text": (None, ref_text),
                     "ref_audio": (os.path.basename(ref_audio_path), f, "audio/wav")
                 }
-                response = await asyncio.to_thread(requests.post, url, files=files)
+                response = await self.client.post("/voices", files=files)
                 if response.status_code == 200:
                     return response.json().get("id")
             return None
@@ -78,9 +135,8 @@ class QwenTTS(TTSProvider):
 
     async def delete_voice(self, voice_id: str) -> bool:
         """Delete a registered voice."""
-        url = f"{self.base_url}/voices/{voice_id}"
         try:
-            response = await asyncio.to_thread(requests.delete, url)
+            response = await self.client.delete(f"/voices/{voice_id}")
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Voice Deletion Error: {e}")
@@ -89,8 +145,7 @@ class QwenTTS(TTSProvider):
     async def get_voices(self):
         """Fetch available voices from the service."""
         try:
-            url = f"{self.base_url}/voices"
-            response = await asyncio.to_thread(requests.get, url)
+            response = await self.client.get("/voices")
             if response.status_code == 200:
                 saved_voices = response.json()
                 # Format: [{id, name, ...}]
@@ -0,0 +1,212 @@
+"""
+Priority scheduler for upstream TTS calls.
+Every provider request (after the audio cache and single-flight layer) takes a
+slot of its provider; each provider has its own concurrency limit. Waiting
+requests are granted by priority class, then by how much work their session
+already has outstanding (so one long answer cannot starve other callers), then
+in arrival order. A request still queued past its deadline is dropped instead
+of producing audio nobody will hear.
+
+Priority and session travel with the request through a context variable, so
+call sites declare intent without threading arguments through the providers:
+
+    with tts_request(TTSPriority.FIRST_SENTENCE, deadline_ms=3000):
+        audio = await tts_service.synthesize(text)
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+
+
+class TTSPriority(IntEnum):
+    UX_CLIP = 0          # Backchannels / fillers: only useful right now
+    FIRST_SENTENCE = 1   # Time-to-first-audio of a turn
+    CONTINUATION = 2     # Rest of an answer, already playing
+
+
+class TTSDeadlineExceeded(Exception):
+    """The request waited for a provider slot past its deadline and was dropped."""
+
+
+@dataclass(frozen=True)
+class TTSRequestContext:
+    priority: TTSPriority = TTSPriority.CONTINUATION
+    session_id: Optional[str] = None
+    deadline: Optional[float] = None  # time.monotonic()
+
+
+_request_context: ContextVar[TTSRequestContext] = ContextVar("tts_request_context", default=TTSRequestContext())
+
+
+@contextmanager
+def tts_request(priority: Optional[TTSPriority] = None, session_id: Optional[str] = None,
+                deadline_ms: Optional[float] = None):
+    """Scope TTS calls made inside the block; unspecified fields are inherited."""
+    current = _request_context.get()
+    context = replace(
+        current,
+        priority=current.priority if priority is None else priority,
+        session_id=session_id or current.session_id,
+        deadline=time.monotonic() + deadline_ms / 1000 if deadline_ms is not None else current.deadline,
+    )
+    token = _request_context.set(context)
+    try:
+        yield context
+    finally:
+        _request_context.reset(token)
+
+
+def bind_tts_session(session_id: str):
+    """Tag every TTS call of the current task (and tasks it creates later) with a session."""
+    _request_context.set(replace(_request_context.get(), session_id=session_id))
+
+
+@dataclass
+class PriorityMetrics:
+    granted: int = 0
+    queued: int = 0
+    dropped_stale: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(vars(self))
+        data["avg_wait_ms"] = round(self.total_wait_ms / self.granted, 2) if self.granted else 0.0
+        data["total_wait_ms"] = round(self.total_wait_ms, 2)
+        data["max_wait_ms"] = round(self.max_wait_ms, 2)
+        return data
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    session_load: int
+    seq: int
+    context: TTSRequestContext = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class _ProviderQueue:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiting: List[_Waiter] = []
+        self.outstanding: Dict[str, int] = {}  # session -> queued + active requests
+        self.metrics = {priority: PriorityMetrics() for priority in TTSPriority}
+
+
+class TTSScheduler:
+    """
+    Usage (inside a provider):
+        async with tts_scheduler.slot("qwen"):
+            response = await client.post(...)
+    """
+
+    def __init__(self, limits: Dict[str, int], default_limit: int):
+        self.limits = limits
+        self.default_limit = default_limit
+        self._queues: Dict[str, _ProviderQueue] = {}
+        self._seq = itertools.count()
+
+    def _queue(self, provider: str) -> _ProviderQueue:
+        queue = self._queues.get(provider)
+        if queue is None:
+            family = provider.split(":", 1)[0]
+            queue = _ProviderQueue(max(1, self.limits.get(family, self.default_limit)))
+            self._queues[provider] = queue
+        return queue
+
+    @asynccontextmanager
+    async def slot(self, provider: str):
+        """Hold one of the provider's slots; raises TTSDeadlineExceeded if it came too late."""
+        queue = self._queue(provider)
+        context = _request_context.get()
+        session = context.session_id or ""
+        queue.outstanding[session] = queue.outstanding.get(session, 0) + 1
+        try:
+            await self._acquire(queue, context, session)
+            try:
+                yield
+            finally:
+                queue.active -= 1
+                self._dispatch(queue)
+        finally:
+            remaining = queue.outstanding[session] - 1
+            if remaining:
+                queue.outstanding[session] = remaining
+            else:
+                del queue.outstanding[session]
+
+    async def _acquire(self, queue: _ProviderQueue, context: TTSRequestContext, session: str):
+        metrics = queue.metrics[context.priority]
+        if queue.active < queue.limit and not queue.waiting:
+            queue.active += 1
+            metrics.granted += 1
+            return
+
+        waiter = _Waiter(
+            priority=int(context.priority),
+            session_load=queue.outstanding[session] - 1,
+            seq=next(self._seq),
+            context=context,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(queue.waiting, waiter)
+        metrics.queued += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                # Granted just as we were cancelled: hand the slot on
+                queue.active -= 1
+                self._dispatch(queue)
+            raise
+
+        wait_ms = (time.monotonic() - waiter.enqueued_at) * 1000
+        metrics.total_wait_ms += wait_ms
+        metrics.max_wait_ms = max(metrics.max_wait_ms, wait_ms)
+
+    def _dispatch(self, queue: _ProviderQueue):
+        now = time.monotonic()
+        while queue.waiting and queue.active < queue.limit:
+            waiter = heapq.heappop(queue.waiting)
+            if waiter.future.done():
+                continue  # Cancelled while queued
+            metrics = queue.metrics[waiter.context.priority]
+            if waiter.context.deadline is not None and now > waiter.context.deadline:
+                metrics.dropped_stale += 1
+                waiter.future.set_exception(TTSDeadlineExceeded())
+                continue
+            queue.active += 1
+            metrics.granted += 1
+            waiter.future.set_result(True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            provider: {
+                "limit": queue.limit,
+                "active": queue.active,
+                "waiting": sum(1 for w in queue.waiting if not w.future.done()),
+                "sessions": len(queue.outstanding),
+                "priorities": {priority.name.lower(): m.to_dict() for priority, m in queue.metrics.items()},
+            }
+            for provider, queue in self._queues.items()
+        }
+
+
+# Singleton
+tts_scheduler = TTSScheduler(
+    limits={
+        "qwen": settings.TTS_QWEN_MAX_CONCURRENCY,
+        "deepgram": settings.TTS_DEEPGRAM_MAX_CONCURRENCY,
+    },
+    default_limit=settings.TTS_DEFAULT_MAX_CONCURRENCY,
+)
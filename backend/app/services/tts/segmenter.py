@@ -0,0 +1,181 @@
+"""
+Splits a streamed LLM response into segments for TTS synthesis.
+
+The first segment is cut early, at the first clause boundary (comma, colon,
+dash or a conjunction) once it has `first_clause_words` words, or after
+`first_segment_max_words` words at the latest, so the caller hears audio
+before the first sentence is complete. Later segments are whole sentences:
+short ones are merged with the next, and long ones are cut at a clause
+boundary. A period only ends a sentence when the next word is known: not
+inside numbers ("$3.50"), after abbreviations ("e.g.", "Dr.", "z.B."),
+initials, or before a lowercase word. CJK sentence and clause punctuation
+is recognized too.
+
+Per-agent tuning via `agent.config["tts_segmenter"]`, e.g.
+    {"first_clause_words": 4, "first_segment_max_words": 10, "min_segment_words": 3}
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.core.agent_settings import from_agent_config, setting
+
+
+# Lowercased, without the final period; shared across languages
+ABBREVIATIONS = frozenset({
+    # English
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "inc", "ltd",
+    "corp", "approx", "dept", "fig", "mt", "ft", "oz", "lb", "jan", "feb", "apr",
+    "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "a.m", "p.m", "u.s", "u.k",
+    # Spanish / Portuguese
+    "sra", "srta", "dra", "ud", "uds", "av", "pág", "núm", "sto", "sta",
+    # French
+    "mme", "mlle", "env", "cf", "p.ex",
+    # German
+    "z.b", "bzw", "usw", "ca", "nr", "str", "evtl", "ggf", "inkl", "d.h", "u.a",
+})
+
+# Also ordinary words ("The answer is no."): abbreviations only before a number ("No. 5", "Mar. 3")
+NUMBER_ABBREVIATIONS = frozenset({"no", "est", "mar", "co"})
+
+CONJUNCTIONS = frozenset({
+    "and", "but", "or", "so", "because", "which", "while", "although", "though", "then",
+    "y", "pero", "porque", "mas", "et", "mais", "donc", "und", "aber", "weil", "oder",
+})
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*(?=\s)|[。！？]+[」』”’)]*|\n")
+_CLAUSE_END = re.compile(r"[,;:–—][\"'”’)\]]*(?=\s)|[，、；：]")
+_WORD = re.compile(r"\S+")
+_CJK = re.compile(r"[぀-ヿ㐀-鿿]")
+
+
+@dataclass
+class SegmenterSettings:
+    first_clause_words: int = setting(4, minimum=1)         # Earliest clause cut for the first segment
+    first_segment_max_words: int = setting(12, minimum=1)   # Forced cut of a long first sentence
+    min_segment_words: int = setting(3, minimum=1)          # Shorter later sentences are merged with the next
+    max_segment_chars: int = setting(300, minimum=20)       # Longer later sentences are cut at a clause boundary
+
+    def __post_init__(self):
+        self.first_segment_max_words = max(self.first_segment_max_words, self.first_clause_words)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SegmenterSettings":
+        """Read `config["tts_segmenter"]`; invalid keys keep their defaults."""
+        return from_agent_config(cls, config, "tts_segmenter")
+
+
+def _word_count(text: str) -> int:
+    # Chinese/Japanese have no spaces: count each ideograph/kana as a word
+    cjk = len(_CJK.findall(text))
+    return len(_WORD.findall(_CJK.sub(" ", text))) + cjk
+
+
+class SentenceSegmenter:
+    """
+    Incremental, latency-aware segmenter.
+    Call `push()` with every streamed chunk and `flush()` once the stream ends.
+    """
+
+    def __init__(self, settings: Optional[SegmenterSettings] = None):
+        self.settings = settings or SegmenterSettings()
+        self._buffer = ""
+        self.segments_emitted = 0
+
+    def push(self, chunk: str) -> List[str]:
+        """Add a chunk; returns the segments that are ready to be synthesized."""
+        self._buffer += chunk
+        segments = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            segment, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            if segment:
+                segments.append(segment)
+                self.segments_emitted += 1
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the stream has ended."""
+        segment, self._buffer = self._buffer.strip(), ""
+        if any(ch.isalnum() for ch in segment):
+            self.segments_emitted += 1
+            return segment
+        return None
+
+    # -- Boundary search ------------------------------------------------------
+
+    def _next_cut(self) -> Optional[int]:
+        """Index to cut the buffer at, or None to wait for more text."""
+        buffer = self._buffer
+        first = self.segments_emitted == 0
+        settings = self.settings
+
+        for match in _SENTENCE_END.finditer(buffer):
+            end = match.end()
+            if not self._is_sentence_end(buffer, match.start(), end):
+                continue
+            words = _word_count(buffer[:end])
+            if first or words >= settings.min_segment_words or buffer[match.start()] == "\n":
+                return end
+            # Too short to stand alone: keep it for the next sentence
+
+        words = _word_count(buffer)
+        if first:
+            if words >= settings.first_clause_words:
+                cut = self._clause_cut(buffer, settings.first_clause_words)
+                if cut is not None:
+                    return cut
+            if words > settings.first_segment_max_words:
+                return self._word_cut(buffer, settings.first_segment_max_words)
+        elif len(buffer) > settings.max_segment_chars:
+            cut = self._clause_cut(buffer, settings.min_segment_words, limit=settings.max_segment_chars)
+            return cut if cut is not None else self._word_cut(buffer, _word_count(buffer[:settings.max_segment_chars]))
+        return None
+
+    @staticmethod
+    def _is_sentence_end(buffer: str, start: int, end: int) -> bool:
+        if buffer[start] != ".":
+            return True  # ? ! … CJK and newlines are unambiguous
+        rest = buffer[end:].lstrip()
+        if not rest:
+            return False  # Cannot tell "Dr. Smith" from "...Dr. ." until the next word arrives
+        if rest[0].islower():
+            return False  # "e.g. the", "approx. five"
+        word = buffer[:start].rsplit(None, 1)[-1] if buffer[:start].strip() else ""
+        word = word.lstrip("\"'“‘([").lower()
+        if word in ABBREVIATIONS:
+            return False
+        if word in NUMBER_ABBREVIATIONS and rest[0].isdigit():
+            return False
+        if len(word) == 1 and word.isalpha():
+            return False  # Initials: "J. R. Smith"
+        return True
+
+    @staticmethod
+    def _clause_cut(buffer: str, min_words: int, limit: Optional[int] = None) -> Optional[int]:
+        """
+        Clause boundary with at least `min_words` words before it: the earliest one
+        (first segment), or the last one within `limit` characters (long sentences).
+        """
+        region = buffer if limit is None else buffer[:limit]
+        candidates = [match.end() for match in _CLAUSE_END.finditer(region)]
+        # Cut before a conjunction, once the word after it has arrived
+        candidates += [
+            word.start() for word in list(_WORD.finditer(region))[:-1]
+            if word.start() > 0 and word.group().lower() in CONJUNCTIONS
+        ]
+        candidates = sorted(c for c in candidates if _word_count(region[:c]) >= min_words)
+        if not candidates:
+            return None
+        return candidates[0] if limit is None else candidates[-1]
+
+    @staticmethod
+    def _word_cut(buffer: str, words: int) -> Optional[int]:
+        """Cut after the `words`-th whole word (the last one must be followed by whitespace)."""
+        matches = list(_WORD.finditer(buffer))
+        for match in matches[max(0, words - 1):]:
+            if match.end() < len(buffer):
+                return match.end()
+        return None
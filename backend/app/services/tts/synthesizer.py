@@ -0,0 +1,60 @@
+"""
+Single entry point for speech synthesis.
+Call sites describe what they want (text, language, voice, style) and the
+facade passes each provider only the arguments its declared `capabilities`
+accept, so an unsupported style instruction is dropped instead of breaking
+the call. Capabilities are read once, when the facade is built.
+
+    tts = synthesizer_for(tts_service)
+    audio = await tts.synthesize("Hello", language="en-US", voice="Vivian", instruct="calm")
+    async for chunk in tts.stream("Hello", voice="Vivian"):
+        ...
+"""
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional
+from app.core.config import settings
+from .base import TTSCapabilities, TTSProvider
+
+
+class TTSSynthesizer:
+    def __init__(self, provider: TTSProvider):
+        self.provider = provider
+        self.capabilities: TTSCapabilities = provider.capabilities
+
+    def _kwargs(self, language: Optional[str], voice: Optional[str], instruct: Optional[str]) -> Dict[str, Any]:
+        capabilities = self.capabilities
+        kwargs = {}
+        if capabilities.language and language:
+            kwargs["language"] = language
+        if capabilities.voices and voice:
+            kwargs["voice"] = voice
+        if capabilities.instruct and instruct:
+            kwargs["instruct"] = instruct
+        return kwargs
+
+    async def synthesize(self, text: str, language: Optional[str] = None, voice: Optional[str] = None,
+                         instruct: Optional[str] = None) -> bytes:
+        """The whole clip of one text."""
+        return await self.provider.synthesize(text, **self._kwargs(language, voice, instruct))
+
+    async def stream(self, text: str, language: Optional[str] = None, voice: Optional[str] = None,
+                     instruct: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Audio of one text as it arrives (one chunk for non-streaming providers)."""
+        kwargs = self._kwargs(language, voice, instruct)
+        if self.capabilities.streaming and settings.TTS_STREAMING_ENABLED:
+            chunks = self.provider.synthesize_chunks(text, **kwargs)
+        else:
+            chunks = TTSProvider.synthesize_chunks(self.provider, text, **kwargs)
+        async for chunk in chunks:
+            yield chunk
+
+
+_synthesizers: "weakref.WeakKeyDictionary[TTSProvider, TTSSynthesizer]" = weakref.WeakKeyDictionary()
+
+
+def synthesizer_for(provider: TTSProvider) -> TTSSynthesizer:
+    """The facade of a provider instance, built on first use."""
+    synthesizer = _synthesizers.get(provider)
+    if synthesizer is None:
+        synthesizer = _synthesizers[provider] = TTSSynthesizer(provider)
+    return synthesizer
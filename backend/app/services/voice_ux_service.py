@@ -1,7 +1,120 @@
-import base64
 import asyncio
-from typing import Dict, List, Optional
+import random
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from loguru import logger
+from app.core.config import settings
+from app.services.tts.scheduler import TTSPriority, tts_request
+from app.services.tts.synthesizer import synthesizer_for
+
+# Pre-defined tokens for premium feel
+BACKCHANNEL_TOKENS = ["mm-hm", "I see", "Right", "Okay", "Got it"]
+LATENCY_FILLERS = [
+    "Let me check that for you...",
+    "One moment while I pull that up...",
+    "Let me see...",
+    "Checking my records..."
+]
+BACKCHANNEL_INSTRUCT = "quick, soft, attentive"
+FILLER_INSTRUCT = "slow, thoughtful, professional"
+
+ClipSetKey = Tuple[str, str]    # (TTS provider identity, voice)
+
+
+def _provider_identity(tts_service) -> str:
+    # Two providers only share clips if they would produce the same audio
+    base_url = getattr(tts_service, "base_url", None)
+    return f"{type(tts_service).__name__}:{base_url}" if base_url else type(tts_service).__name__
+
+
+class VoiceUXClipStore:
+    """
+    Process-wide store of backchannel/filler clips, shared by every session.
+    Each (provider, voice) set is synthesized once per worker; concurrent sessions
+    asking for a voice that is still warming join the same warm-up instead of
+    issuing their own TTS requests. Clips are also kept by the TTS audio cache
+    (disk tier), so other workers and restarted ones warm without new synthesis.
+
+    Usage:
+        await voice_ux_clips.warm(tts_service, "Vivian")
+        audio = voice_ux_clips.clip(tts_service, "Vivian", "Got it")
+    """
+
+    def __init__(self, max_voices: int = 64):
+        self.max_voices = max_voices
+        self._clips: "OrderedDict[ClipSetKey, Dict[str, bytes]]" = OrderedDict()
+        self._warming: Dict[ClipSetKey, asyncio.Task] = {}
+        self.warmups = 0
+        self.joined_warmups = 0
+        self.synthesized = 0
+        self.failures = 0
+
+    def clip(self, tts_service, voice: str, text: str) -> Optional[bytes]:
+        clips = self._clips.get((_provider_identity(tts_service), voice))
+        return clips.get(text) if clips else None
+
+    def available(self, tts_service, voice: str, texts: List[str]) -> List[str]:
+        clips = self._clips.get((_provider_identity(tts_service), voice)) or {}
+        return [text for text in texts if text in clips]
+
+    async def warm(self, tts_service, voice: str):
+        """Synthesize the missing clips of a voice, at most once at a time per worker."""
+        key = (_provider_identity(tts_service), voice)
+        clips = self._clips.get(key)
+        if clips is not None:
+            self._clips.move_to_end(key)
+            if len(clips) == len(BACKCHANNEL_TOKENS) + len(LATENCY_FILLERS):
+                return
+
+        task = self._warming.get(key)
+        if task is None:
+            self.warmups += 1
+            task = asyncio.create_task(self._warm(key, tts_service, voice))
+            self._warming[key] = task
+            task.add_done_callback(lambda _: self._warming.pop(key, None))
+        else:
+            self.joined_warmups += 1
+        # A session ending mid warm-up must not cancel the work other sessions wait on
+        await asyncio.shield(task)
+
+    async def _warm(self, key: ClipSetKey, tts_service, voice: str):
+        logger.info(f"Precomputing Voice UX tokens for voice: {voice}")
+        clips = self._clips.get(key) or {}
+        tokens = [(text, BACKCHANNEL_INSTRUCT) for text in BACKCHANNEL_TOKENS]
+        tokens += [(text, FILLER_INSTRUCT) for text in LATENCY_FILLERS]
+        missing = [(text, instruct) for text, instruct in tokens if text not in clips]
+
+        with tts_request(TTSPriority.UX_CLIP):
+            tts = synthesizer_for(tts_service)
+            results = await asyncio.gather(
+                *(tts.synthesize(text, voice=voice, instruct=instruct) for text, instruct in missing),
+                return_exceptions=True,
+            )
+        for (text, _), audio in zip(missing, results):
+            if isinstance(audio, BaseException) or not audio:
+                # Left missing; the next session asking for this voice retries it
+                self.failures += 1
+                continue
+            clips[text] = audio
+            self.synthesized += 1
+
+        if clips:
+            self._clips[key] = clips
+            self._clips.move_to_end(key)
+            while len(self._clips) > self.max_voices:
+                self._clips.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "voices": len(self._clips),
+            "clips": sum(len(clips) for clips in self._clips.values()),
+            "warming": len(self._warming),
+            "warmups": self.warmups,
+            "joined_warmups": self.joined_warmups,
+            "synthesized": self.synthesized,
+            "failures": self.failures,
+        }
+
 
 class VoiceUXService:
     """
@@ -9,88 +122,56 @@ class VoiceUXService:
     - Micro-acknowledgements (Backchanneling)
     - Latency Fillers
     - Adaptive pacing markers
+
+    Clips come from the shared `voice_ux_clips` store; a session only remembers its voice.
     """
-    
-    def __init__(self, tts_service):
+
+    def __init__(self, tts_service, voice: str = "Vivian"):
         self.tts = tts_service
-        self.backchannel_cache: Dict[str, str] = {} # token -> base64 audio
-        self.filler_cache: Dict[str, str] = {}
-        
-        # Pre-defined tokens for premium feel
-        self.backchannel_tokens = ["mm-hm", "I see", "Right", "Okay", "Got it"]
-        self.latency_fillers = [
-            "Let me check that for you...",
-            "One moment while I pull that up...",
-            "Let me see...",
-            "Checking my records..."
-        ]
+        self.voice = voice
+        self.backchannel_tokens = BACKCHANNEL_TOKENS
+        self.latency_fillers = LATENCY_FILLERS
 
     async def precompute_tokens(self, voice: str = "Vivian"):
-        """Warm up the cache with standard UX tokens."""
-        logger.info(f"Precomputing Voice UX tokens for voice: {voice}")
-        
-        tasks = []
-        for token in self.backchannel_tokens + self.latency_fillers:
-            tasks.append(self._cache_token(token, voice))
-        
-        await asyncio.gather(*tasks)
-
-    async def _cache_token(self, text: str, voice: str):
-        # Apply voice instructions if supported
-        instruct = None
-        if text in self.backchannel_tokens:
-            instruct = "quick, soft, attentive"
-        else:
-            instruct = "slow, thoughtful, professional"
-
-        # Check if synthesize supports instruct
-        import inspect
-        sig = inspect.signature(self.tts.synthesize)
-        
-        if 'instruct' in sig.parameters:
-            audio_bytes = await self.tts.synthesize(text, voice=voice, instruct=instruct)
-        else:
-            audio_bytes = await self.tts.synthesize(text, voice=voice)
-            
-        if audio_bytes:
-            b64 = base64.b64encode(audio_bytes).decode('utf-8')
-            if text in self.backchannel_tokens:
-                self.backchannel_cache[text] = b64
-            else:
-                self.filler_cache[text] = b64
-
-    def get_random_backchannel(self) -> Optional[str]:
-        import random
-        token = random.choice(self.backchannel_tokens)
-        return self.backchannel_cache.get(token)
-
-    def get_random_filler(self) -> Optional[str]:
-        import random
-        token = random.choice(self.latency_fillers)
-        return self.filler_cache.get(token)
-
-    async def send_backchannel(self, websocket, token: str = None):
+        """Make sure the shared store holds this session's voice (no-op once warm)."""
+        self.voice = voice
+        await voice_ux_clips.warm(self.tts, voice)
+
+    def _pick(self, tokens: List[str]) -> Optional[str]:
+        # Prefer tokens that are ready over skipping the cue entirely
+        ready = voice_ux_clips.available(self.tts, self.voice, tokens)
+        return random.choice(ready) if ready else None
+
+    def get_random_backchannel(self) -> Optional[bytes]:
+        token = self._pick(self.backchannel_tokens)
+        return voice_ux_clips.clip(self.tts, self.voice, token) if token else None
+
+    def get_random_filler(self) -> Optional[bytes]:
+        token = self._pick(self.latency_fillers)
+        return voice_ux_clips.clip(self.tts, self.voice, token) if token else None
+
+    async def send_backchannel(self, transport, token: str = None):
         """Send a quick micro-acknowledgement."""
-        import random
         if not token:
-            token = random.choice(self.backchannel_tokens)
-        
-        audio_b64 = self.backchannel_cache.get(token)
-        if audio_b64:
-            await websocket.send_json({
-                "type": "audio", 
-                "data": audio_b64, 
-                "metadata": {"ux_type": "backchannel", "text": token}
-            })
-
-    async def send_filler(self, websocket):
+            token = self._pick(self.backchannel_tokens)
+
+        audio_bytes = voice_ux_clips.clip(self.tts, self.voice, token) if token else None
+        if audio_bytes:
+            await transport.send_audio(
+                audio_bytes,
+                metadata={"ux_type": "backchannel", "text": token}
+            )
+
+    async def send_filler(self, transport):
         """Send a latency filler to buy time."""
-        import random
-        token = random.choice(self.latency_fillers)
-        audio_b64 = self.filler_cache.get(token)
-        if audio_b64:
-            await websocket.send_json({
-                "type": "audio", 
-                "data": audio_b64, 
-                "metadata": {"ux_type": "filler", "text": token}
-            })
+        token = self._pick(self.latency_fillers)
+        audio_bytes = voice_ux_clips.clip(self.tts, self.voice, token) if token else None
+        if audio_bytes:
+            await transport.send_audio(
+                audio_bytes,
+                metadata={"ux_type": "filler", "text": token}
+            )
+
+
+# Singleton
+voice_ux_clips = VoiceUXClipStore(max_voices=settings.VOICE_UX_CLIP_MAX_VOICES)
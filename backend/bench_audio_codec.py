@@ -0,0 +1,124 @@
+"""
+Benchmark: vectorized audio codec (app/services/audio/codec.py) vs pure-Python
+per-sample loops and, where still available (Python < 3.13), the stdlib
+`audioop` C module.
+
+    python bench_audio_codec.py [--seconds 10] [--chunk-ms 20]
+
+Reports throughput as "x realtime" (seconds of audio processed per second).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.audio.codec import (
+    Resampler, Packetizer, alaw_encode, frame_bytes, pcm16_to_telephony, resample, ulaw_decode, ulaw_encode,
+)
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+
+def speech_like(seconds: float, rate: int) -> bytes:
+    """Band-limited noise with a syllable-rate envelope; close enough to speech for throughput."""
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * rate)) / rate
+    noise = np.convolve(rng.standard_normal(len(t)), np.ones(8) / 8, mode="same")
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    return (noise * envelope * 12000).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+def python_ulaw_encode(pcm: bytes) -> bytes:
+    """Per-sample G.711 μ-law, the way it is usually hand-written."""
+    out = bytearray()
+    for sample in memoryview(pcm).cast("h"):
+        sample >>= 2
+        mask = 0xFF
+        if sample < 0:
+            sample, mask = -sample, 0x7F
+        sample = min(sample, 8159) + 0x21
+        seg = max(0, sample.bit_length() - 6)
+        out.append(0x7F ^ mask if seg >= 8 else ((seg << 4) | ((sample >> (seg + 1)) & 0x0F)) ^ mask)
+    return bytes(out)
+
+
+def python_resample_linear(pcm: bytes, src: int, dst: int) -> bytes:
+    """Per-sample linear interpolation (no anti-alias filter)."""
+    samples = memoryview(pcm).cast("h")
+    step = src / dst
+    out = []
+    position = 0.0
+    while position < len(samples) - 1:
+        i = int(position)
+        frac = position - i
+        out.append(int(samples[i] * (1 - frac) + samples[i + 1] * frac))
+        position += step
+    return np.array(out, dtype="<i2").tobytes()
+
+
+def timed(fn, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, seconds_of_audio: float, elapsed: float):
+    print(f"  {name:<34} {elapsed * 1000:9.2f} ms   {seconds_of_audio / elapsed:10.0f}x realtime")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0, help="Audio duration per run")
+    parser.add_argument("--chunk-ms", type=int, default=20, help="Chunk size for the streaming runs")
+    args = parser.parse_args()
+    seconds = args.seconds
+
+    pcm_8k = speech_like(seconds, 8000)
+    pcm_24k = speech_like(seconds, 24000)
+    pcm_48k = speech_like(seconds, 48000)
+    ulaw = ulaw_encode(pcm_8k)
+
+    print(f"G.711 ({seconds:.0f} s at 8 kHz)")
+    report("numpy μ-law encode", seconds, timed(ulaw_encode, memoryview(pcm_8k)))
+    report("numpy μ-law decode", seconds, timed(ulaw_decode, ulaw))
+    report("numpy A-law encode", seconds, timed(alaw_encode, pcm_8k))
+    if audioop:
+        report("audioop lin2ulaw", seconds, timed(audioop.lin2ulaw, pcm_8k, 2))
+        report("audioop ulaw2lin", seconds, timed(audioop.ulaw2lin, ulaw, 2))
+    short = pcm_8k[: len(pcm_8k) // 10]
+    report("pure Python μ-law encode", seconds / 10, timed(python_ulaw_encode, short, repeat=1))
+
+    print(f"\nResampling ({seconds:.0f} s, one shot)")
+    report("numpy 48k -> 8k (polyphase FIR)", seconds, timed(resample, pcm_48k, 48000, 8000))
+    report("numpy 24k -> 8k", seconds, timed(resample, pcm_24k, 24000, 8000))
+    report("numpy 8k -> 16k", seconds, timed(resample, pcm_8k, 8000, 16000))
+    if audioop:
+        report("audioop ratecv 48k -> 8k (linear)", seconds, timed(audioop.ratecv, pcm_48k, 2, 1, 48000, 8000, None))
+    short = pcm_48k[: len(pcm_48k) // 10]
+    report("pure Python 48k -> 8k (linear)", seconds / 10, timed(python_resample_linear, short, 48000, 8000, repeat=1))
+
+    print(f"\nStreaming provider audio to telephony ({args.chunk_ms} ms chunks, 24 kHz -> 8 kHz μ-law)")
+    chunk = frame_bytes(24000, args.chunk_ms)
+
+    def stream():
+        resampler = Resampler(24000, 8000)
+        packetizer = Packetizer(frame_bytes(8000, 20, sample_width=1), silence=b"\xff")
+        view = memoryview(pcm_24k)
+        for start in range(0, len(view), chunk):
+            packetizer.push(pcm16_to_telephony(view[start:start + chunk], 24000, resampler))
+        packetizer.flush()
+
+    elapsed = timed(stream)
+    chunks = len(pcm_24k) // chunk
+    report("resample + encode + packetize", seconds, elapsed)
+    print(f"  {'per chunk':<34} {elapsed / chunks * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: compiled keyword trie vs the per-list substring loops it replaced
+in AgentOrchestrator (sentiment + intent + escalation + agent failure/success lists).
+
+    python bench_keyword_engine.py [--iterations 2000] [--agent-phrases 50]
+"""
+import argparse
+import random
+import time
+
+from app.orchestration.agent_orchestrator import (
+    POSITIVE_WORDS, NEGATIVE_WORDS, INTENT_KEYWORDS, ESCALATION_KEYWORDS, UTTERANCE_MATCHER,
+)
+from app.orchestration.keyword_matcher import KeywordAutomaton, tokenize
+
+
+UTTERANCES = [
+    "Hi, I was charged twice on my last invoice and I want a refund.",
+    "The app keeps showing an error when I try to login to my account.",
+    "Thanks, that was great, everything is working now.",
+    "This is the worst service, I am frustrated and I want to speak to a human.",
+    "Can you tell me about pricing for the premium plan?",
+    "Where is my package? The tracking number doesn't work.",
+    "No, that's wrong. Let me talk to your manager.",
+    "I don't know, maybe tomorrow works better for the delivery.",
+]
+
+
+def _strip(words):
+    return [w.rstrip("*") for w in words]
+
+
+def legacy_checks(text, failure_conditions, success_criteria, response):
+    """The loops as they were: lowercase per check, one substring scan per keyword."""
+    text_lower = text.lower()
+    pos = sum(1 for w in _POSITIVE if w in text_lower)
+    neg = sum(1 for w in _NEGATIVE if w in text_lower)
+
+    intent = None
+    for name, keywords in _INTENTS.items():
+        if any(kw in text_lower for kw in keywords):
+            intent = name
+            break
+
+    escalate = None
+    for condition in failure_conditions:
+        if condition.lower() in text_lower:
+            escalate = condition
+            break
+    if escalate is None:
+        for keyword in ESCALATION_KEYWORDS:
+            if keyword in text_lower:
+                escalate = keyword
+                break
+
+    reached = None
+    for criteria in success_criteria:
+        if criteria.lower() in response.lower():
+            reached = criteria
+            break
+    return pos, neg, intent, escalate, reached
+
+
+def automaton_checks(text, agent_matcher, response):
+    """One tokenization per text; the global and agent automatons share the utterance tokens."""
+    tokens = tokenize(text)
+    matches = UTTERANCE_MATCHER.scan(tokens=tokens)
+    pos = len(matches.get("positive", []))
+    neg = len(matches.get("negative", []))
+    intent = next((c.split(":", 1)[1] for c in _INTENT_CATEGORIES if c in matches), None)
+
+    failures = agent_matcher.scan(tokens=tokens, categories=["failure"]).get("failure")
+    escalate = failures[0] if failures else (matches.get("escalation") or [None])[0]
+
+    reached = (agent_matcher.scan(response, categories=["success"]).get("success") or [None])[0]
+    return pos, neg, intent, escalate, reached
+
+
+_POSITIVE = _strip(POSITIVE_WORDS)
+_NEGATIVE = _strip(NEGATIVE_WORDS)
+_INTENTS = {name: _strip(words) for name, words in INTENT_KEYWORDS.items()}
+_INTENT_CATEGORIES = [f"intent:{name}" for name in INTENT_KEYWORDS]
+
+
+def agent_phrases(count, seed=7):
+    rng = random.Random(seed)
+    vocabulary = "cancel contract lawyer legal threat sue regulator refund chargeback fraud " \
+                 "confirmed booked scheduled resolved verified address payment plan upgrade".split()
+    phrases = set()
+    while len(phrases) < count:
+        phrases.add(" ".join(rng.sample(vocabulary, rng.randint(1, 3))))
+    return sorted(phrases)
+
+
+def bench(fn, args_list, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for args in args_list:
+            fn(*args)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(args_list)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--agent-phrases", type=int, default=50, help="Size of each agent failure/success list")
+    args = parser.parse_args()
+
+    failures = agent_phrases(args.agent_phrases)
+    successes = agent_phrases(args.agent_phrases, seed=11)
+    response = "I've confirmed the refund and your account is verified. Anything else I can help with today?"
+
+    compile_start = time.perf_counter()
+    agent_matcher = KeywordAutomaton({"failure": failures, "success": successes})
+    compile_ms = (time.perf_counter() - compile_start) * 1000
+
+    legacy_us = bench(legacy_checks, [(u, failures, successes, response) for u in UTTERANCES], args.iterations)
+    automaton_us = bench(automaton_checks, [(u, agent_matcher, response) for u in UTTERANCES], args.iterations)
+
+    print(f"agent list size: {args.agent_phrases} failure + {args.agent_phrases} success phrases")
+    print(f"automaton compile (once per agent config): {compile_ms:.2f} ms")
+    print(f"legacy loops : {legacy_us:8.1f} us/utterance")
+    print(f"automaton    : {automaton_us:8.1f} us/utterance  ({legacy_us / automaton_us:.1f}x)")
+
+    # Where the two disagree it is the word-boundary rule (e.g. "no" inside "know")
+    for utterance in UTTERANCES:
+        old = legacy_checks(utterance, failures, successes, response)
+        new = automaton_checks(utterance, agent_matcher, response)
+        if old != new:
+            print(f"  differs: {utterance!r}\n    legacy={old}\n    automaton={new}")
+
+
+if __name__ == "__main__":
+    main()
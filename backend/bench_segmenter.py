@@ -0,0 +1,107 @@
+"""
+Benchmark: latency-aware SentenceSegmenter vs the punctuation-in-chunk rule it
+replaced in stream_response_with_tts. Responses are streamed token by token at
+a fixed LLM rate and a simple TTS cost model estimates time-to-first-audio:
+
+    TTFA = time the first segment is released + TTS_BASE_MS + TTS_PER_WORD_MS * words
+
+    python bench_segmenter.py [--tokens-per-second 40] [--iterations 200]
+"""
+import argparse
+import statistics
+import time
+
+from app.services.tts.segmenter import SentenceSegmenter
+from test_segmenter import CORPUS, stream_pieces
+
+TTS_BASE_MS = 150.0
+TTS_PER_WORD_MS = 25.0
+
+RESPONSES = [text for text, _ in CORPUS] + [
+    "Thanks for calling! I've pulled up your account and I can see two open invoices, "
+    "one for $49.99 from March and one for $12.50 from April. Would you like to pay both today?",
+    "Absolutely. Your appointment with Dr. Patel is confirmed for Tuesday at 3 p.m. at our Main St. office. "
+    "You'll get a text reminder the day before. Is there anything else I can help you with?",
+    "I understand how frustrating that must be, and I'm sorry for the trouble with your delivery "
+    "which was supposed to arrive yesterday but is now showing as delayed at the regional facility.",
+    "Ok. Got it. Let me check. One moment. Your order shipped on Monday via express courier.",
+]
+
+
+class LegacySegmenter:
+    """The rule as it was: flush when the chunk contains . ? ! or a newline."""
+
+    BOUNDARIES = (".", "?", "!", "\n")
+
+    def __init__(self):
+        self._buffer = ""
+
+    def push(self, chunk):
+        self._buffer += chunk
+        if any(p in chunk for p in self.BOUNDARIES) and len(self._buffer.strip()) > 5:
+            segment, self._buffer = self._buffer, ""
+            return [segment]
+        return []
+
+    def flush(self):
+        segment, self._buffer = self._buffer, ""
+        return segment if len(segment.strip()) > 2 else None
+
+
+def run(make_segmenter, text, token_ms):
+    """Returns [(release_ms, segment)] for one streamed response."""
+    segmenter = make_segmenter()
+    released = []
+    pieces = stream_pieces(text)
+    for index, piece in enumerate(pieces):
+        for segment in segmenter.push(piece):
+            released.append(((index + 1) * token_ms, segment.strip()))
+    remaining = segmenter.flush()
+    if remaining:
+        released.append((len(pieces) * token_ms, remaining.strip()))
+    return released
+
+
+def summarize(name, make_segmenter, token_ms, iterations):
+    ttfa, sizes, fragments, segments = [], [], 0, 0
+    for text in RESPONSES:
+        released = run(make_segmenter, text, token_ms)
+        first_ms, first = released[0]
+        ttfa.append(first_ms + TTS_BASE_MS + TTS_PER_WORD_MS * len(first.split()))
+        for position, (_, segment) in enumerate(released):
+            words = len(segment.split())
+            sizes.append(words)
+            fragments += position > 0 and words < 3  # A short opener is deliberate
+            segments += 1
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in RESPONSES:
+            run(make_segmenter, text, token_ms)
+    cpu_us = (time.perf_counter() - start) / (iterations * len(RESPONSES)) * 1e6
+
+    print(f"{name}")
+    print(f"  TTFA model   mean {statistics.mean(ttfa):7.0f} ms   max {max(ttfa):7.0f} ms")
+    print(f"  segments     {segments:4d}   words/segment mean {statistics.mean(sizes):5.1f}   "
+          f"min {min(sizes)}   later fragments (<3 words) {fragments}")
+    print(f"  CPU          {cpu_us:7.1f} us per response")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    token_ms = 1000.0 / args.tokens_per_second
+
+    summarize("legacy (punctuation in chunk)", LegacySegmenter, token_ms, args.iterations)
+    summarize("SentenceSegmenter (first clause early)", SentenceSegmenter, token_ms, args.iterations)
+
+    print("\nSplits on the sample responses:")
+    for text in RESPONSES[-4:]:
+        print(f"  legacy : {[s for _, s in run(LegacySegmenter, text, token_ms)]}")
+        print(f"  new    : {[s for _, s in run(SentenceSegmenter, text, token_ms)]}\n")
+
+
+if __name__ == "__main__":
+    main()
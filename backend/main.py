@@ -22,6 +22,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    # Keep per-worker agent config caches coherent with CRUD on other workers
+    import asyncio
+    from app.services.agent_config_cache import agent_config_cache
+    app.state.agent_config_listener = asyncio.create_task(agent_config_cache.listen_for_invalidations())
+
+@app.on_event("startup")
+async def warm_tts_connections():
+    # First sentence of the first call should not pay TCP/TLS setup to the TTS servers
+    from app.services.tts.http import tts_http_clients
+    from app.services.tts.deepgram_provider import DEEPGRAM_API_URL
+    endpoints = [settings.QWEN_TTS_BASE_URL]
+    if settings.DEEPGRAM_API_KEY:
+        endpoints.append(DEEPGRAM_API_URL)
+    await tts_http_clients.warm(endpoints)
+
+@app.on_event("startup")
+async def warm_voice_ux_clips():
+    # Backchannels/fillers of the common voices are ready before the first call
+    import asyncio
+    from app.api.endpoints.orchestrator import tts_service
+    from app.services.voice_ux_service import voice_ux_clips
+    voices = [v.strip() for v in settings.VOICE_UX_WARM_VOICES.split(",") if v.strip()]
+    app.state.voice_ux_warmup = asyncio.gather(
+        *(voice_ux_clips.warm(tts_service, voice) for voice in voices), return_exceptions=True
+    )
+
+@app.on_event("shutdown")
+async def drain_background_tasks():
+    # Let queued compliance audits / shadow comparisons finish instead of dying with the worker
+    from app.orchestration.task_supervisor import task_supervisor
+    await task_supervisor.drain(timeout=settings.BACKGROUND_DRAIN_TIMEOUT_SECONDS)
+
+@app.on_event("shutdown")
+async def close_tts_connections():
+    from app.services.tts.http import tts_http_clients
+    await tts_http_clients.aclose()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "OpenVoice Orchestrator"}
@@ -0,0 +1,88 @@
+"""
+Cached answers survive agent-config TTL reloads and listener reconnects, and
+are dropped by explicit invalidations (local or broadcast by another worker).
+
+    python test_response_cache_invalidation.py
+"""
+import asyncio
+import json
+
+import numpy as np
+
+from app.services.agent_config_cache import INVALIDATION_CHANNEL, AgentConfigCache, _AgentEntry
+from app.services.response_cache import ResponseCacheSettings, SemanticResponseCache
+
+
+class LocalAgentConfigCache(AgentConfigCache):
+    """Loads a placeholder entry instead of reading the database."""
+
+    def __init__(self, ttl_seconds: float):
+        super().__init__(ttl_seconds=ttl_seconds)
+        self.loads = 0
+
+    async def _load(self, db, agent_id):
+        self.loads += 1
+        entry = _AgentEntry(agent=None, weighted_versions=[], pinned_version_id=None)
+        self._agents[agent_id] = entry
+        return entry
+
+
+class RecordingPublisher:
+    """Async Redis stand-in; a sync publisher would block the event loop."""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+def cache_with_answers():
+    answers = SemanticResponseCache(max_entries=100, max_audio_bytes=1 << 20, default_ttl_seconds=86400,
+                                    default_threshold=0.92, min_words=3)
+    cache_settings = ResponseCacheSettings(similarity_threshold=0.92, ttl_seconds=86400)
+    for agent_id in ("agent-1", "agent-2"):
+        scope = SemanticResponseCache.scope_for(agent_id, None, "persona", "initial")
+        answers.store(scope, "what are your opening hours", np.ones(4, dtype=np.float32) / 2, "Nine to five.", cache_settings)
+    return answers
+
+
+def entries(answers, agent_id):
+    return sum(1 for e in answers._lru.values() if e.scope[0] == agent_id)
+
+
+async def main():
+    configs = LocalAgentConfigCache(ttl_seconds=0)  # Every lookup is a TTL reload
+    answers = cache_with_answers()
+    configs.add_invalidation_hook(answers.invalidate_agent)
+
+    print("\n--- TTL reloads keep cached answers ---")
+    for _ in range(3):
+        await configs.get_agent(None, "agent-1")
+    assert configs.loads == 3, "entries should have been reloaded"
+    assert entries(answers, "agent-1") == 1, "a TTL reload must not drop cached answers"
+    configs._drop_local(notify=False)  # What a listener (re)subscribe does
+    assert entries(answers, "agent-1") == entries(answers, "agent-2") == 1
+    print("OK")
+
+    print("\n--- Explicit and broadcast invalidations drop them ---")
+    configs.invalidate("agent-1", broadcast=False)
+    assert entries(answers, "agent-1") == 0 and entries(answers, "agent-2") == 1
+    configs._apply_broadcast(json.dumps({"agent_id": "agent-2"}))
+    assert entries(answers, "agent-2") == 0
+    configs._apply_broadcast("not json")
+    print("OK")
+
+    print("\n--- Async endpoints broadcast without blocking the event loop ---")
+    answers = cache_with_answers()
+    configs.add_invalidation_hook(answers.invalidate_agent)
+    configs._async_publisher = publisher = RecordingPublisher()
+    await configs.invalidate_async("agent-1")
+    assert entries(answers, "agent-1") == 0 and entries(answers, "agent-2") == 1
+    assert publisher.published == [(INVALIDATION_CHANNEL, {"agent_id": "agent-1"})], publisher.published
+    assert configs._publisher is None, "the blocking client must not be used"
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Caller audio ring buffer check: contents against a plain bytearray, zero-copy
+windows across the wrap point, its readers (VAD frames, utterance windows for
+re-recognition), and memory allocated while buffering compared with keeping
+every frame as its own `bytes` object.
+
+    python test_ring_buffer.py
+"""
+import io
+import random
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+from app.services.audio.codec import ulaw_encode
+from app.services.audio.ring_buffer import AudioRingBuffer
+from app.services.audio.vad import VADSettings, VoiceActivityDetector
+
+FRAME = 640  # 20 ms of 16 kHz PCM16
+
+
+def test_contents():
+    print("\n--- Contents and clamping ---")
+    rng = random.Random(7)
+    for capacity in (16, 640, 4000):
+        ring, reference = AudioRingBuffer(capacity, sample_rate=8000, sample_width=1), bytearray()
+        for _ in range(500):
+            data = rng.randbytes(rng.randint(0, capacity * 2))
+            written = ring.write(data)
+            reference += data
+            assert bytes(written) == data[-capacity:]
+            start = rng.randint(0, len(reference))
+            expected = reference[max(start, len(reference) - capacity):]
+            assert bytes(ring.window(start)) == expected, capacity
+        assert len(ring) == capacity and ring.overwritten == len(reference) - capacity
+    print("OK")
+
+
+def test_zero_copy():
+    print("\n--- Windows are views, also across the wrap point ---")
+    ring = AudioRingBuffer.for_mimetype("audio/l16", seconds=1)
+    assert AudioRingBuffer.for_mimetype("audio/webm", seconds=1) is None
+    for index in range(75):  # 1.5 s: wraps once
+        ring.write(np.full(FRAME // 2, index, dtype="<i2").tobytes())
+    recent = ring.last_ms(500)
+    samples = np.frombuffer(recent, dtype="<i2")
+    assert len(samples) == 8000 and samples[0] == 50 and samples[-1] == 74
+    assert np.shares_memory(samples, np.frombuffer(ring._storage, dtype=np.uint8).view("<i2")), "window was copied"
+    assert bytes(ring.window_ms(1000, 1020)) == np.full(FRAME // 2, 50, dtype="<i2").tobytes()
+    print(ring.stats())
+    print("OK")
+
+
+def utterance(rate: int) -> np.ndarray:
+    """1 s silence, 1 s voiced tone, 1 s silence (PCM16)."""
+    t = np.arange(rate) / rate
+    speech = (np.sin(2 * np.pi * 150 * t) * 6000).astype("<i2")
+    return np.concatenate([np.zeros(rate, "<i2"), speech, np.zeros(rate, "<i2")])
+
+
+def test_vad_reads_ring():
+    print("\n--- VAD reads whole frames from the ring, in stream time ---")
+    for mimetype, rate in (("audio/l16", 16000), ("audio/basic", 8000)):
+        pcm = utterance(rate)
+        audio = ulaw_encode(pcm) if mimetype == "audio/basic" else pcm.tobytes()
+        chunk = 334  # Not a frame multiple: partial frames wait in the ring
+        events = {}
+        for name in ("bytes", "ring"):
+            vad = VoiceActivityDetector(VADSettings(), sample_rate=rate)
+            ring = AudioRingBuffer.for_mimetype(mimetype, seconds=1)  # Wraps during the call
+            found = []
+            for start in range(0, len(audio), chunk):
+                data = audio[start:start + chunk]
+                if name == "ring":
+                    ring.write(data)
+                    found += vad.process_buffered(ring)
+                else:
+                    found += vad.process_input(data, mimetype)
+            assert not len(vad._pending) or name == "bytes"
+            events[name] = [(e.kind, e.at_ms) for e in found]
+        print(mimetype, events["ring"])
+        assert events["ring"] == events["bytes"] and len(events["ring"]) == 2, events
+    print("OK")
+
+
+def test_utterance_window():
+    print("\n--- Last utterance read back by VAD stream time, as WAV ---")
+    pcm = utterance(8000)
+    ring = AudioRingBuffer.for_mimetype("audio/basic", seconds=10)
+    vad = VoiceActivityDetector(VADSettings(), sample_rate=8000)
+    events = []
+    for start in range(0, len(pcm), 160):  # Twilio's 20 ms μ-law frames
+        ring.write(ulaw_encode(pcm[start:start + 160]))
+        events += vad.process_buffered(ring)
+    start, end = events[0].at_ms, events[1].at_ms
+    window = ring.window_ms(start, end)
+    assert len(window) == ring.offset_at(end - start)
+    with wave.open(io.BytesIO(ring.to_wav(window))) as wav:
+        assert wav.getframerate() == 8000 and wav.getsampwidth() == 2
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), "<i2")
+    # Starts on the tone (allowing for the VAD's frame resolution), then the hangover's silence
+    speech = samples[:int((2000 - start) * 8)]
+    assert np.abs(speech).max() > 4000 and not np.abs(samples[-800:]).max() > 100
+    assert ring.to_wav(ring.last_ms(1000))[44:] == ring.to_wav(ring.window_ms(2000, 3000))[44:]
+    print("OK")
+
+
+def growth_while_buffering(frames: int = 3000):
+    """Memory allocated while 60 s of caller audio arrives: per-frame `bytes` vs the ring."""
+    incoming = bytearray(FRAME)  # Stands in for the decoded websocket frame
+    ring = AudioRingBuffer.for_mimetype("audio/l16", seconds=10)
+    results = {}
+    for name in ("bytes per frame", "ring"):
+        tracemalloc.start()
+        if name == "ring":
+            for _ in range(frames):
+                ring.write(incoming)
+        else:
+            chunks = [bytes(incoming) for _ in range(frames)]  # What BufferedSTTStream used to hold
+        results[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return results
+
+
+def test_allocations():
+    print("\n--- Memory allocated while buffering 60 s of caller audio ---")
+    growth = growth_while_buffering()
+    print(", ".join(f"{name}: {peak / 1024:.0f} KiB" for name, peak in growth.items()))
+    assert growth["ring"] < 4096, "ring writes must not allocate per frame"
+    ring_buffer = AudioRingBuffer.for_mimetype("audio/l16", seconds=10)
+    frame = bytes(FRAME)
+    began = time.perf_counter()
+    for _ in range(50000):
+        ring_buffer.write(frame)
+    print(f"write: {(time.perf_counter() - began) / 50000 * 1e6:.2f} µs per 20 ms frame")
+    print("OK")
+
+
+def main():
+    test_contents()
+    test_zero_copy()
+    test_vad_reads_ring()
+    test_utterance_window()
+    test_allocations()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Segmentation corpus for the streaming TTS segmenter (app/services/tts/segmenter.py).
+Every case is streamed in LLM-sized pieces and must produce exactly the expected segments.
+
+    python test_segmenter.py
+"""
+import re
+
+from app.services.tts.segmenter import SegmenterSettings, SentenceSegmenter
+
+CORPUS = [
+    # Decimal numbers and currency are not sentence ends
+    ("Your total is $3.50. Anything else?",
+     ["Your total is $3.50.", "Anything else?"]),
+    # First clause goes out early; abbreviations and honorifics do not split
+    ("You can pay online, e.g. with a card. Dr. Smith will call you tomorrow.",
+     ["You can pay online,", "e.g. with a card.", "Dr. Smith will call you tomorrow."]),
+    # A short first sentence is fine; later one-word sentences are merged
+    ("Sure. I can help with that. Ok. Thanks for waiting, let me check.",
+     ["Sure.", "I can help with that.", "Ok. Thanks for waiting, let me check."]),
+    # Long first sentence without punctuation: cut before a conjunction
+    ("I have looked at your account and I can see that the payment from last week has not arrived yet",
+     ["I have looked at your account", "and I can see that the payment from last week has not arrived yet"]),
+    # No boundary at all: forced cut after first_segment_max_words
+    ("Please hold the line for just a moment as I transfer you over to the billing department now",
+     ["Please hold the line for just a moment as I transfer you", "over to the billing department now"]),
+    # Initials
+    ("J. R. Smith approved it. Your refund is on its way.",
+     ["J. R. Smith approved it.", "Your refund is on its way."]),
+    # German abbreviation and decimal comma
+    ("Das kostet z.B. 3,50 Euro. Ich schicke Ihnen die Rechnung.",
+     ["Das kostet z.B. 3,50 Euro.", "Ich schicke Ihnen die Rechnung."]),
+    # Spanish honorific
+    ("Claro, Sra. García, su pedido llegará mañana. ¿Algo más?",
+     ["Claro, Sra. García, su pedido llegará mañana.", "¿Algo más?"]),
+    # French
+    ("Bonjour, je vérifie votre dossier. Mme Dupont vous rappellera demain matin.",
+     ["Bonjour, je vérifie votre dossier.", "Mme Dupont vous rappellera demain matin."]),
+    # Chinese: no spaces, full-width punctuation
+    ("您好，我可以帮您查询订单。请稍等。",
+     ["您好，我可以帮您查询订单。", "请稍等。"]),
+    # "no" ends a sentence; "No." and "est." before a number are abbreviations
+    ("Sure. I checked and the answer is no. Your plan does not cover roaming.",
+     ["Sure.", "I checked and the answer is no.", "Your plan does not cover roaming."]),
+    ("Sure. Your ticket is No. 5 in the queue, est. 10 minutes. We will call you back.",
+     ["Sure.", "Your ticket is No. 5 in the queue, est. 10 minutes.", "We will call you back."]),
+    # Lists on separate lines
+    ("Here are your options:\n1. Upgrade\n2. Cancel",
+     ["Here are your options:", "1. Upgrade", "2. Cancel"]),
+]
+
+
+def stream_pieces(text: str):
+    """Roughly LLM-token-sized pieces, keeping the whitespace."""
+    return re.findall(r"\s*\S{1,4}|\s+", text)
+
+
+def segment(text: str, settings: SegmenterSettings = None):
+    segmenter = SentenceSegmenter(settings)
+    segments = []
+    for piece in stream_pieces(text):
+        segments.extend(segmenter.push(piece))
+    remaining = segmenter.flush()
+    if remaining:
+        segments.append(remaining)
+    return segments
+
+
+def main():
+    failures = 0
+    for text, expected in CORPUS:
+        got = segment(text)
+        status = "OK  " if got == expected else "FAIL"
+        failures += got != expected
+        print(f"{status} {text!r}")
+        if got != expected:
+            print(f"     expected {expected}\n     got      {got}")
+
+    # Per-agent settings
+    settings = SegmenterSettings.from_config({"tts_segmenter": {"first_clause_words": 2, "unknown": 1}})
+    got = segment("Sure thing, I will check that for you.", settings)
+    assert got == ["Sure thing,", "I will check that for you."], got
+
+    # Bad per-agent values are ignored or clamped instead of failing call setup
+    settings = SegmenterSettings.from_config({"tts_segmenter": {
+        "first_clause_words": None, "first_segment_max_words": "many", "min_segment_words": -3, "max_segment_chars": "150",
+    }})
+    assert settings == SegmenterSettings(min_segment_words=1, max_segment_chars=150), settings
+    assert SegmenterSettings.from_config({"tts_segmenter": [1, 2]}) == SegmenterSettings()
+
+    # Nothing is lost or reordered
+    for text, _ in CORPUS:
+        assert "".join(segment(text)).replace(" ", "").replace("\n", "") == text.replace(" ", "").replace("\n", "")
+
+    print(f"\n{len(CORPUS) - failures}/{len(CORPUS)} corpus cases passed")
+    assert not failures
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ import asyncio
 import os
 import sys
 from loguru import logger
-from sqlalchemy.orm import Session
 from app.core import database
 from app.models.agent import Agent
 from app.orchestration.agent_orchestrator import AgentOrchestrator, AgentContext, ConfidenceScores
@@ -13,18 +12,21 @@ from app.schemas.policy import ConversationPolicy
 
 async def test_smart_conversation():
     # Setup
-    db = next(database.get_db())
+    async with database.AsyncSessionLocal() as db:
+        await run_smart_conversation(db)
+
+async def run_smart_conversation(db):
     llm = EnterpriseLLM()
     knowledge_service = KnowledgeService(db)
     
     # Pick the TechDiagnostic Agent
     agent_id = "39dc4a1b-cf11-4a59-a596-ecba4ad31ca7"
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = await db.get(Agent, agent_id)
     if not agent:
         print("Agent not found!")
         return
 
-    orchestrator = AgentOrchestrator(db)
+    orchestrator = AgentOrchestrator()
     context = AgentContext(
         session_id="test_session_smart",
         caller_id="test_user",
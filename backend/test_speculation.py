@@ -0,0 +1,151 @@
+"""
+Speculative generation check: stable partials start the LLM early, the final
+transcript commits or discards it, and the head start shows up as a faster
+first token. Uses a mock LLM stream (no API keys needed).
+
+    python test_speculation.py
+"""
+import asyncio
+import time
+
+from app.orchestration.speculation import (
+    Speculation,
+    SpeculationMetrics,
+    SpeculationSettings,
+    Speculator,
+    utterance_similarity,
+)
+
+RAG_S = 0.08
+FIRST_TOKEN_S = 0.35
+TOKEN_S = 0.01
+ANSWER = "We are open from nine to five , Monday to Friday .".split()
+
+
+async def retrieve(text):
+    await asyncio.sleep(RAG_S)
+    return [{"content": "Opening hours: 9-17 Mon-Fri"}]
+
+
+async def llm_stream(text):
+    await asyncio.sleep(FIRST_TOKEN_S)
+    for word in ANSWER:
+        yield word + " "
+        await asyncio.sleep(TOKEN_S)
+
+
+def generate(text, chunks):
+    return f"persona + {len(chunks)} facts", llm_stream(text)
+
+
+def make_speculator(**overrides):
+    settings = SpeculationSettings.from_config({"speculation": {"enabled": "true", "stable_ms": 100, **overrides}})
+    metrics = SpeculationMetrics()
+    speculator = Speculator(
+        settings,
+        start=lambda text: Speculation(text, "key", retrieve=retrieve, generate=generate),
+        metrics=metrics,
+    )
+    return speculator, metrics
+
+
+async def first_token_after_final(speculator, final, prompt="persona + 1 facts"):
+    """Time from the final transcript to the first LLM chunk, as the turn would see it."""
+    began = time.perf_counter()
+    speculation = speculator.take(final, "key")
+    stream = None
+    if speculation:
+        await speculation.knowledge()
+        stream = speculation.claim(prompt)
+    if stream is None:
+        await retrieve(final)
+        stream = llm_stream(final)
+    text = []
+    first = None
+    async for piece in stream:
+        first = first or time.perf_counter() - began
+        text.append(piece)
+    speculator.release(speculation)
+    return first * 1000, "".join(text).split()
+
+
+async def speak(speculator, partials, gap_s=0.05, trailing_s=0.4):
+    for partial in partials:
+        speculator.on_partial(partial)
+        await asyncio.sleep(gap_s)
+    await asyncio.sleep(trailing_s)  # Caller stops; endpointing delay before the final
+
+
+def test_settings():
+    print("\n--- Invalid per-agent settings keep their defaults ---")
+    settings = SpeculationSettings.from_config({"speculation": {"enabled": "yes", "stable_ms": None, "match_threshold": 7}})
+    assert settings == SpeculationSettings(enabled=True, match_threshold=1.0), settings
+    print("OK")
+
+
+def test_similarity():
+    print("\n--- Tolerance ---")
+    assert utterance_similarity("What are your opening hours", "what are your opening hours?") == 1.0
+    assert utterance_similarity("what are your opening", "what are your opening hours") < 0.9
+    assert utterance_similarity("when do you open on saturdays and sundays please",
+                                "when do you open on saturday and sundays please") >= 0.85
+    print("OK")
+
+
+async def test_hit():
+    print("\n--- Stable partial -> committed speculation ---")
+    speculator, metrics = make_speculator()
+    await speak(speculator, ["what are", "what are your opening", "what are your opening hours"])
+    first_ms, words = await first_token_after_final(speculator, "What are your opening hours?")
+    baseline, _ = await first_token_after_final(make_speculator()[0], "What are your opening hours?")
+    print(f"first token: {first_ms:.0f} ms speculative vs {baseline:.0f} ms cold; {metrics.to_dict()}")
+    assert words == ANSWER
+    assert metrics.hits == 1 and metrics.wasted_tokens == 0 and metrics.committed_tokens == len(ANSWER)
+    assert baseline - first_ms > 300, "speculation should hide most of RAG + first token"
+    print("OK")
+
+
+async def test_miss():
+    print("\n--- Final differs -> discarded, turn runs cold ---")
+    speculator, metrics = make_speculator()
+    await speak(speculator, ["what are your opening hours"], trailing_s=0.5)
+    _, words = await first_token_after_final(speculator, "what are your opening hours in Berlin on holidays")
+    print(metrics.to_dict())
+    assert words == ANSWER and metrics.misses == 1 and metrics.hits == 0
+    assert metrics.wasted_tokens > 0, "tokens generated for the discarded partial must be counted"
+    print("OK")
+
+
+async def test_restart_and_prompt_mismatch():
+    print("\n--- Changed partial restarts; different system prompt is not committed ---")
+    speculator, metrics = make_speculator()
+    await speak(speculator, ["can I book a table"], trailing_s=0.45)
+    await speak(speculator, ["can I book a table for two"], trailing_s=0.2)
+    assert metrics.started == 2 and metrics.restarts == 1, metrics.to_dict()
+    _, words = await first_token_after_final(speculator, "can I book a table for two", prompt="another agent")
+    print(metrics.to_dict())
+    assert words == ANSWER and metrics.hits == 0 and metrics.misses == 1
+    print("OK")
+
+
+async def test_unstable_and_short():
+    print("\n--- Short or constantly changing partials never speculate ---")
+    speculator, metrics = make_speculator()
+    await speak(speculator, ["hi there"], trailing_s=0.3)
+    await speak(speculator, [" ".join(["word"] * n) for n in range(3, 12)], gap_s=0.05, trailing_s=0)
+    speculator.cancel()
+    assert metrics.started == 0, metrics.to_dict()
+    print("OK")
+
+
+async def main():
+    test_settings()
+    test_similarity()
+    await test_hit()
+    await test_miss()
+    await test_restart_and_prompt_mismatch()
+    await test_unstable_and_short()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
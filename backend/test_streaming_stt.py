@@ -0,0 +1,135 @@
+"""
+Streaming STT check with local recognizers (no Deepgram key needed).
+
+A streaming mock recognizes each frame as it arrives; a batch stand-in only
+starts once the utterance is complete, the way `websocket_endpoint` used to
+work. Both go through StreamingTranscriber, as the orchestrator does.
+
+    python test_streaming_stt.py
+"""
+import asyncio
+import time
+
+from app.services.stt.base import BufferedSTTStream, STTProvider, TranscriptionResult
+from app.services.stt.mock_provider import MOCK_TRANSCRIPT, MockSTT, MockSTTStream
+from app.services.stt.streaming import StreamingTranscriber
+
+FRAMES = 10
+FRAME_INTERVAL = 0.02      # Caller audio arrives in real time
+FRAME = b"\x00" * 640      # 20 ms of 16 kHz PCM16
+RECOGNITION_PER_FRAME = 0.005
+BATCH_RECOGNITION = FRAMES * 0.03
+
+
+class LocalStreamingSTT(MockSTT):
+    async def open_stream(self, language: str = "en-US", mimetype: str = "audio/webm"):
+        return MockSTTStream(recognition_delay=RECOGNITION_PER_FRAME)
+
+
+class LocalBatchSTT(STTProvider):
+    async def transcribe(self, audio_bytes: bytes, language: str = "en-US", mimetype: str = "audio/wav") -> TranscriptionResult:
+        await asyncio.sleep(BATCH_RECOGNITION)
+        return TranscriptionResult(f"heard {len(audio_bytes)} bytes")
+
+
+async def speak(provider: STTProvider, utterances: int = 1):
+    """Stream utterances into a transcriber; returns (partials, finals, end-of-speech -> final latencies)."""
+    partials, finals, latencies = [], [], []
+    ended_at = []
+    got_final = asyncio.Event()
+
+    async def on_partial(hypothesis):
+        partials.append(hypothesis)
+
+    async def on_final(hypothesis):
+        latencies.append((time.perf_counter() - ended_at[len(finals)]) * 1000)
+        finals.append(hypothesis)
+        if len(finals) == utterances:
+            got_final.set()
+
+    transcriber = StreamingTranscriber(provider, "en-US", on_partial=on_partial, on_final=on_final)
+    for _ in range(utterances):
+        for index in range(FRAMES):
+            await asyncio.sleep(FRAME_INTERVAL)
+            last = index == FRAMES - 1
+            if last:
+                ended_at.append(time.perf_counter())
+            await transcriber.push(FRAME, mimetype="audio/l16", end_of_utterance=last)
+    await asyncio.wait_for(got_final.wait(), timeout=5)
+    await transcriber.close()
+    return partials, finals, latencies
+
+
+async def test_partials_and_final():
+    print("\n--- Partials while speaking, final on end of utterance ---")
+    partials, finals, latencies = await speak(LocalStreamingSTT())
+    print(f"{len(partials)} partials, last: {partials[-1].text!r}")
+    print(f"final: {finals[0].text!r} (confidence {finals[0].confidence})")
+    assert len(partials) == FRAMES
+    assert all(len(a.text) <= len(b.text) for a, b in zip(partials, partials[1:])), "partials should grow"
+    assert [f.text for f in finals] == [MOCK_TRANSCRIPT]
+    assert finals[0].is_final and finals[0].confidence is not None
+    print("OK")
+
+
+async def test_latency_vs_batch():
+    print("\n--- End of speech -> final hypothesis ---")
+    _, _, streaming = await speak(LocalStreamingSTT())
+    _, finals, batch = await speak(LocalBatchSTT())
+    print(f"streaming recognizer: {streaming[0]:.0f} ms")
+    print(f"batch (whole utterance): {batch[0]:.0f} ms")
+    assert finals[0].text == f"heard {FRAMES * len(FRAME)} bytes", "batch fallback lost audio"
+    assert streaming[0] < batch[0] / 2
+    print("OK")
+
+
+async def test_batch_fallback_order():
+    print("\n--- Batch fallback keeps utterance order ---")
+    partials, finals, _ = await speak(LocalBatchSTT(), utterances=3)
+    assert not partials, "batch providers have no partials"
+    assert len(finals) == 3
+    print("OK")
+
+
+class HangingBatchSTT(STTProvider):
+    async def transcribe(self, audio_bytes: bytes, language: str = "en-US", mimetype: str = "audio/wav") -> TranscriptionResult:
+        await asyncio.sleep(3600)
+
+
+async def collect(stream):
+    return [hypothesis async for hypothesis in stream]
+
+
+async def test_batch_close_keeps_last_final():
+    print("\n--- Hanging up right after the last utterance keeps it in the transcript ---")
+    history = []
+
+    async def on_final(hypothesis):
+        raise AssertionError("the session has stopped taking turns")
+
+    transcriber = StreamingTranscriber(LocalBatchSTT(), "en-US", on_partial=on_final, on_final=on_final)
+    await transcriber.push(FRAME, mimetype="audio/l16", end_of_utterance=True)
+    # What the session does on disconnect, before the call is logged
+    history.extend({"role": "user", "content": h.text} for h in await transcriber.close())
+    assert history == [{"role": "user", "content": f"heard {len(FRAME)} bytes"}], history
+
+    stream = await HangingBatchSTT().open_stream(mimetype="audio/l16")
+    assert isinstance(stream, BufferedSTTStream)
+    stream.close_timeout_s = 0.05
+    reader = asyncio.create_task(collect(stream))
+    await stream.send(FRAME)
+    await stream.finalize()
+    await stream.close()
+    assert await asyncio.wait_for(reader, timeout=1) == [], "a stuck recognition must not hold close()"
+    print("OK")
+
+
+async def main():
+    await test_partials_and_final()
+    await test_latency_vs_batch()
+    await test_batch_fallback_order()
+    await test_batch_close_keeps_last_final()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Streaming TTS check against a local stand-in TTS server (no GPU/Qwen needed).
+
+The stand-in answers POST /tts/custom_voice with a chunked response, one chunk
+every CHUNK_DELAY seconds, like a server that streams audio while it synthesizes.
+
+    python test_streaming_tts.py
+"""
+import asyncio
+import time
+
+from app.core.config import settings
+
+settings.TTS_CACHE_ENABLED = False  # Measure the provider, not the cache
+
+from app.orchestration.speech_pipeline import SpeechPipeline
+from app.services.tts.qwen_provider import QwenTTS
+
+CHUNKS = 8
+CHUNK_DELAY = 0.05
+CHUNK = b"\x01" * 3200  # 100 ms of 16 kHz PCM16
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.1 server: drain the request, then stream a chunked body."""
+    headers = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in headers.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: audio/wav\r\nTransfer-Encoding: chunked\r\n\r\n")
+    for _ in range(CHUNKS):
+        await asyncio.sleep(CHUNK_DELAY)
+        writer.write(b"%x\r\n%s\r\n" % (len(CHUNK), CHUNK))
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+
+async def test_first_chunk(tts: QwenTTS):
+    print("\n--- First chunk vs whole clip ---")
+    start = time.perf_counter()
+    first_ms = None
+    audio = b""
+    async for chunk in tts.synthesize_chunks("Hello there, how can I help you today?"):
+        if first_ms is None:
+            first_ms = (time.perf_counter() - start) * 1000
+        audio += chunk
+    total_ms = (time.perf_counter() - start) * 1000
+    print(f"first chunk: {first_ms:.0f} ms, full clip: {total_ms:.0f} ms, {len(audio)} bytes")
+    assert audio == CHUNK * CHUNKS, "streamed audio differs from the served clip"
+    assert first_ms < total_ms / 2, "first chunk was not forwarded early"
+
+    whole = await tts.synthesize("Hello there, how can I help you today?")
+    assert whole == audio, "synthesize() and synthesize_chunks() disagree"
+    print("OK")
+
+
+async def test_pipeline_order(tts: QwenTTS):
+    print("\n--- SpeechPipeline chunk order and end flags ---")
+    sent = []
+
+    async def send_audio(chunk: bytes, end: bool):
+        sent.append((len(chunk), end))
+
+    async with SpeechPipeline(tts.synthesize_chunks, send_audio, max_concurrent_synthesis=2) as pipeline:
+        for sentence in ["First sentence.", "Second sentence.", "Third sentence."]:
+            await pipeline.submit(sentence)
+
+    # Chunk boundaries depend on the network; per segment: audio chunks, then one empty end marker
+    segments, current = [], 0
+    for size, end in sent:
+        if end:
+            assert size == 0, "end marker carries audio"
+            segments.append(current)
+            current = 0
+        else:
+            assert size > 0, "empty audio chunk forwarded"
+            current += size
+    print(f"{len(sent)} sends, {len(segments)} segment ends")
+    assert segments == [len(CHUNK) * CHUNKS] * 3, segments
+    print("OK")
+
+
+async def test_cancel_while_full():
+    print("\n--- Barge-in while submit() waits on a full pipeline ---")
+    running = set()
+
+    async def synthesize(text: str):
+        running.add(text)
+        try:
+            await asyncio.sleep(3600)  # A slow TTS request
+            yield b""
+        finally:
+            running.discard(text)
+
+    async def send_audio(chunk: bytes, end: bool):
+        pass
+
+    pipeline = SpeechPipeline(synthesize, send_audio, max_pending=1, max_concurrent_synthesis=4)
+
+    async def turn():
+        for n in range(4):
+            await pipeline.submit(f"Sentence {n}.")
+
+    task = asyncio.create_task(turn())
+    await asyncio.sleep(0.05)
+    assert not task.done(), "submit() should block once the pipeline is full"
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await pipeline.cancel()
+    await asyncio.sleep(0)
+    assert not running, f"synthesis still running after barge-in: {running}"
+    print("OK")
+
+
+async def main():
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    tts = QwenTTS(base_url=f"http://127.0.0.1:{port}")
+    async with server:
+        await test_first_chunk(tts)
+        await test_pipeline_order(tts)
+        await test_cancel_while_full()
+        await tts.client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Structured STT results: Deepgram word scores, language and timing reach the
+final hypothesis, and line-noise transcripts are told apart from clean ones
+(those turns get a scripted clarification instead of an LLM generation).
+
+    python test_stt_confidence.py
+"""
+import asyncio
+import json
+
+from app.core.config import settings
+from app.services.stt.base import TranscriptionResult, WordConfidence
+from app.services.stt.deepgram_provider import DeepgramSTTStream
+from app.services.stt.mock_provider import MockSTT
+
+
+class LiveConnection:
+    """In-memory stand-in for Deepgram's live websocket: replays canned Results messages."""
+
+    def __init__(self, messages):
+        self.messages = [json.dumps(m) for m in messages]
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(data)
+
+    async def close(self):
+        pass
+
+    def __aiter__(self):
+        return self._replay()
+
+    async def _replay(self):
+        for message in self.messages:
+            yield message
+
+
+def results(words, start, is_final=True, speech_final=False, detected_language=None):
+    channel = {"alternatives": [{
+        "transcript": " ".join(w for w, _ in words),
+        "confidence": min(c for _, c in words),
+        "words": [{"word": w.lower(), "punctuated_word": w, "confidence": c, "start": start + i * 0.4, "end": start + i * 0.4 + 0.3}
+                  for i, (w, c) in enumerate(words)],
+    }]}
+    if detected_language:
+        channel["detected_language"] = detected_language
+    return {"type": "Results", "is_final": is_final, "speech_final": speech_final, "start": start,
+            "duration": len(words) * 0.4, "channel": channel}
+
+
+async def test_deepgram_final():
+    print("\n--- Deepgram live results -> structured final ---")
+    connection = LiveConnection([
+        results([("I", 0.6), ("want", 0.5)], start=12.0, is_final=False),
+        results([("I", 0.98), ("want", 0.97), ("to", 0.99)], start=12.0),
+        results([("cancel", 0.93), ("my", 0.96), ("order.", 0.9)], start=13.2, speech_final=True),
+    ])
+    stream = DeepgramSTTStream(connection, language="en-US")
+    hypotheses = [h async for h in stream]
+    final = hypotheses[-1]
+    assert [h.is_final for h in hypotheses] == [False, True], hypotheses
+    result = final.result
+    print(result)
+    assert result.text == "I want to cancel my order." and result.confidence == 0.9
+    assert [w.word for w in result.words] == ["I", "want", "to", "cancel", "my", "order."]
+    assert result.words[0].start == 0.0 and abs(result.words[3].start - 1.2) < 1e-9, "word times are utterance-relative"
+    assert result.language == "en-US" and abs(result.duration - 2.4) < 1e-9
+    await stream.close()
+    print("OK")
+
+
+def test_unreliable():
+    print("\n--- Clean speech vs line noise ---")
+    thresholds = (settings.STT_MIN_CONFIDENCE, settings.STT_MIN_WORD_CONFIDENCE)
+    words = lambda *scores: [WordConfidence(f"w{i}", s) for i, s in enumerate(scores)]
+    cases = {
+        "clean": (TranscriptionResult("cancel my order", 0.93, words(0.98, 0.9, 0.93)), False),
+        "low utterance score": (TranscriptionResult("uh and the", 0.31), True),
+        "mostly noise words": (TranscriptionResult("cancel huh fth mm", 0.62, words(0.95, 0.2, 0.15, 0.3)), True),
+        "one mumbled word": (TranscriptionResult("cancel my uh order", 0.7, words(0.95, 0.9, 0.3, 0.92)), False),
+        "words only": (TranscriptionResult("mm hmm", None, words(0.2, 0.25)), True),
+        "unscored provider": (TranscriptionResult("cancel my order"), False),
+        "empty": (TranscriptionResult("  ", 0.99), True),
+    }
+    for name, (result, expected) in cases.items():
+        verdict = result.is_unreliable(*thresholds)
+        print(f"{name}: score={result.score}, unreliable={verdict}")
+        assert verdict == expected, name
+    print("OK")
+
+
+async def test_mock_batch():
+    print("\n--- Batch providers return the same structure ---")
+    result = await MockSTT().transcribe(b"", language="de-DE")
+    assert result.language == "de-DE" and result.words and result.score == result.confidence
+    assert not result.is_unreliable(settings.STT_MIN_CONFIDENCE, settings.STT_MIN_WORD_CONFIDENCE)
+    print("OK")
+
+
+async def main():
+    await test_deepgram_final()
+    test_unreliable()
+    await test_mock_batch()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
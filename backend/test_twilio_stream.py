@@ -0,0 +1,164 @@
+"""
+Twilio native media path check: jitter buffer, μ-law in, paced μ-law out, barge-in.
+Runs TwilioMediaTransport against an in-memory websocket that speaks the
+Twilio Media Streams event format (no Twilio account needed).
+
+    python test_twilio_stream.py
+"""
+import asyncio
+import base64
+import json
+import time
+
+import numpy as np
+
+from app.services.audio.codec import pcm16_to_wav
+from app.services.audio.jitter import JitterBuffer
+from app.services.audio.twilio_transport import TwilioMediaTransport
+
+FRAME = 160  # 20 ms of 8 kHz μ-law
+
+
+class TwilioSocket:
+    """Queue-backed stand-in for the Starlette websocket Twilio connects to."""
+
+    client_state = "CONNECTED"
+
+    def __init__(self):
+        self.inbound: asyncio.Queue = asyncio.Queue()
+        self.sent = []
+
+    def event(self, **payload):
+        self.inbound.put_nowait({"type": "websocket.receive", "text": json.dumps(payload)})
+
+    async def receive(self):
+        return await self.inbound.get()
+
+    async def send_json(self, payload):
+        self.sent.append((time.perf_counter(), payload))
+
+    async def close(self, code=1000, reason=None):
+        self.client_state = "DISCONNECTED"
+
+    def events(self, name):
+        return [(at, p) for at, p in self.sent if p["event"] == name]
+
+
+def test_jitter_buffer():
+    print("\n--- Jitter buffer ---")
+    jitter = JitterBuffer(depth=2)
+    frame = lambda n: bytes([n]) * FRAME
+    out = jitter.push(0, frame(0)) + jitter.push(40, frame(2)) + jitter.push(20, frame(1))
+    assert out == [frame(0), frame(1), frame(2)], "reordered frames not released in order"
+    # Frame at 60 ms never arrives: concealed once two later frames wait
+    assert jitter.push(80, frame(4)) == []
+    out = jitter.push(100, frame(5))
+    assert out == [b"\xff" * FRAME, frame(4), frame(5)], out
+    assert jitter.push(60, frame(3)) == [], "late frame must be dropped"
+    print(jitter.stats())
+    assert jitter.stats()["concealed_ms"] == 20 and jitter.stats()["late_frames"] == 1
+    print("OK")
+
+
+async def start_stream():
+    socket = TwilioSocket()
+    transport = TwilioMediaTransport(socket, playout_lead_ms=100)
+    socket.event(event="connected", protocol="Call")
+    socket.event(event="start", streamSid="MZ1", start={"streamSid": "MZ1", "callSid": "CA1",
+                                                        "customParameters": {"caller_id": "+15550001111"}})
+    await transport.wait_for_start()
+    return socket, transport
+
+
+async def test_inbound():
+    print("\n--- Inbound media events ---")
+    socket, transport = await start_stream()
+    assert transport.parameters["caller_id"] == "+15550001111"
+    for index in range(3):
+        payload = base64.b64encode(bytes([index]) * FRAME).decode()
+        socket.event(event="media", streamSid="MZ1", media={"track": "inbound", "timestamp": str(index * 20), "payload": payload})
+    messages = [await transport.receive_message() for _ in range(3)]
+    assert all(m["mimetype"] == "audio/basic" and len(m["audio_bytes"]) == FRAME for m in messages)
+    socket.event(event="stop", streamSid="MZ1")
+    try:
+        await transport.receive_message()
+        raise AssertionError("stop must end the session")
+    except Exception as e:
+        assert type(e).__name__ == "WebSocketDisconnect"
+    print("OK")
+
+
+def clip(seconds: float, rate: int = 24000) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    return pcm16_to_wav((np.sin(2 * np.pi * 300 * t) * 8000).astype("<i2").tobytes(), rate)
+
+
+async def test_paced_output():
+    print("\n--- TTS clip -> paced 20 ms μ-law frames + mark ---")
+    socket, transport = await start_stream()
+    audio = clip(1.0)
+    began = time.perf_counter()
+    for start in range(0, len(audio), 4096):  # Streamed like a chunked TTS response
+        await transport.send_audio(audio[start:start + 4096], end=False)
+    await transport.send_audio(b"", end=True)
+    while not socket.events("mark"):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - began
+    media = socket.events("media")
+    sizes = {len(base64.b64decode(p["media"]["payload"])) for _, p in media}
+    print(f"{len(media)} frames in {elapsed * 1000:.0f} ms, marks pending {transport.pending_marks}")
+    assert sizes == {FRAME}, sizes
+    assert 50 <= len(media) <= 52, len(media)
+    assert 0.8 < elapsed < 1.1, "frames should be paced at playback speed, ~100 ms ahead"
+    socket.event(event="mark", streamSid="MZ1", mark={"name": "clip-1"})
+    await transport.receive_message()
+    assert not transport.pending_marks
+    await transport.close()
+    print("OK")
+
+
+async def test_barge_in():
+    print("\n--- Barge-in: clear and drop queued frames ---")
+    socket, transport = await start_stream()
+    await transport.send_audio(clip(2.0), end=True)
+    await asyncio.sleep(0.3)
+    await transport.interrupt()
+    sent_at_clear = len(socket.events("media"))
+    await asyncio.sleep(0.3)
+    assert socket.events("clear"), "clear not sent"
+    assert len(socket.events("media")) == sent_at_clear, "frames kept flowing after barge-in"
+    print(f"{sent_at_clear} of ~100 frames sent before clear")
+    await transport.send_audio(clip(0.2), end=True)
+    await asyncio.sleep(0.3)
+    assert len(socket.events("media")) > sent_at_clear, "next response must play after a clear"
+    await transport.close()
+    print("OK")
+
+
+async def test_hangup_stops_pacer():
+    print("\n--- Caller hangs up: the pacer does not outlive the call ---")
+    socket, transport = await start_stream()
+    await transport.send_audio(clip(0.1), end=True)
+    while not socket.events("mark"):
+        await asyncio.sleep(0.01)
+    pacer = transport._pacer
+    assert not pacer.done(), "pacer idles on its queue between clips"
+    socket.client_state = "DISCONNECTED"  # Twilio closed the socket; close() is skipped
+    transport.stop()
+    await asyncio.sleep(0)
+    assert pacer.cancelled()
+    await transport.send_audio(clip(0.1), end=True)
+    assert transport._pacer is pacer, "no new pacer after stop()"
+    print("OK")
+
+
+async def main():
+    test_jitter_buffer()
+    await test_inbound()
+    await test_paced_output()
+    await test_barge_in()
+    await test_hangup_stops_pacer()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Server-side VAD check on synthetic caller audio (voiced harmonics over a noise bed).
+
+    python test_vad.py
+"""
+import time
+
+import numpy as np
+
+from app.services.audio.codec import ulaw_encode
+from app.services.audio.vad import VADEventType, VADSettings, VoiceActivityDetector
+
+RATE = 16000
+rng = np.random.default_rng(3)
+
+
+def noise(ms: float, dbfs: float = -55.0) -> np.ndarray:
+    return rng.standard_normal(int(RATE * ms / 1000)) * 32768 * 10 ** (dbfs / 20)
+
+
+def voiced(ms: float, dbfs: float = -20.0, pitch: float = 140.0) -> np.ndarray:
+    """Harmonic stack with a syllable-rate envelope, roughly like a vowel-heavy utterance."""
+    t = np.arange(int(RATE * ms / 1000)) / RATE
+    wave = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 12))
+    wave *= 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 3 * t))
+    wave /= np.sqrt(np.mean(wave ** 2))
+    return wave * 32768 * 10 ** (dbfs / 20) + noise(ms)
+
+
+def pcm(*parts: np.ndarray) -> bytes:
+    return np.concatenate(parts).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+def run(audio: bytes, chunk_ms: float = 20, settings: VADSettings = None, mimetype: str = "audio/l16"):
+    vad = VoiceActivityDetector.for_mimetype(settings or VADSettings(), mimetype)
+    width = 2 if mimetype == "audio/l16" else 1
+    chunk = int(vad.sample_rate * chunk_ms / 1000) * width
+    events = []
+    for start in range(0, len(audio), chunk):
+        events += vad.process_input(audio[start:start + chunk], mimetype)
+    return [(e.kind, e.at_ms, e.speech_ms) for e in events]
+
+
+def check(name, events, expected, tolerance_ms=60):
+    kinds = [kind for kind, _, _ in events]
+    assert kinds == [kind for kind, _ in expected], f"{name}: {events}"
+    for (_, at, _), (_, want) in zip(events, expected):
+        assert abs(at - want) <= tolerance_ms, f"{name}: event at {at} ms, expected ~{want} ms"
+    print(f"{name}: {[(k.name, round(at)) for k, at, _ in events]} OK")
+
+
+def main():
+    start, end = VADEventType.SPEECH_START, VADEventType.SPEECH_END
+    hangover = VADSettings().end_silence_ms
+
+    utterance = pcm(noise(1000), voiced(1200), noise(800))
+    check("single utterance", run(utterance), [(start, 1000), (end, 2200 + hangover)])
+
+    check("short pause kept in utterance", run(pcm(noise(500), voiced(600), noise(200), voiced(600), noise(700))),
+          [(start, 500), (end, 1900 + hangover)])
+
+    check("click ignored", run(pcm(noise(500), voiced(60, dbfs=-10), noise(500))), [])
+
+    check("loud broadband noise ignored", run(pcm(noise(300), noise(1500, dbfs=-30), noise(300))), [])
+
+    check("two utterances", run(pcm(noise(400), voiced(800), noise(900), voiced(500), noise(600))),
+          [(start, 400), (end, 1200 + hangover), (start, 2100), (end, 2600 + hangover)])
+
+    longer = VADSettings.from_config({"vad": {"end_silence_ms": "800", "unknown": 1}})
+    check("per-agent hangover", run(utterance, settings=longer), [(start, 1000), (end, 2200 + 800)])
+
+    broken = VADSettings.from_config({"vad": {"end_silence_ms": None, "frame_ms": 0, "max_zcr": "high", "enabled": "maybe"}})
+    assert broken == VADSettings(frame_ms=5), broken
+    print("invalid per-agent values ignored or clamped: OK")
+
+    reference = run(utterance)
+    for chunk_ms in (7, 33, 3000):
+        assert run(utterance, chunk_ms=chunk_ms) == reference, f"chunking changed events ({chunk_ms} ms)"
+    print("chunk size independent: OK")
+
+    # Telephony: 8 kHz μ-law
+    narrowband = np.concatenate([noise(1000), voiced(1200), noise(800)])[::2].clip(-32768, 32767).astype("<i2")
+    check("8 kHz μ-law", run(ulaw_encode(narrowband), mimetype="audio/basic"), [(start, 1000), (end, 2200 + hangover)])
+
+    seconds = 60
+    long_audio = pcm(*[np.concatenate([noise(700), voiced(1300)]) for _ in range(seconds // 2)])
+    began = time.perf_counter()
+    run(long_audio)
+    elapsed = time.perf_counter() - began
+    print(f"throughput (20 ms chunks): {seconds / elapsed:.0f}x realtime")
+
+
+if __name__ == "__main__":
+    main()